@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from .harness import BenchmarkHarness
+from .scenarios import SCENARIOS
+
+
+def _format_bytes(value: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{value} B"
+        value /= 1024
+
+
+def _print_report(result) -> None:
+    print(f"\n== {result.name} ({result.wall_seconds * 1000:.1f} ms wall)")
+    print(f"{'stage':<36}{'count':>7}{'total ms':>12}{'mean ms':>12}{'p95 ms':>12}{'max ms':>12}")
+    for stage, stats in result.stages.items():
+        print(
+            f"{stage:<36}{stats['count']:>7}{stats['total_ms']:>12.2f}"
+            f"{stats['mean_ms']:>12.2f}{stats['p95_ms']:>12.2f}{stats['max_ms']:>12.2f}"
+        )
+    print(f"peak traced memory   : {_format_bytes(result.peak_traced_bytes)}")
+    print(f"max RSS              : {_format_bytes(result.max_rss_bytes)}")
+    print(f"artifact bytes saved : {_format_bytes(result.artifact_bytes_saved)}")
+    print(f"artifact bytes loaded: {_format_bytes(result.artifact_bytes_loaded)}")
+    print(f"artifact calls       : {result.artifact_calls}")
+    print(f"model calls          : {result.model_calls}")
+    print(f"model request bytes  : {_format_bytes(result.model_request_bytes)}")
+
+    usage = result.session_usage.get("total")
+    if usage:
+        print(
+            f"session tokens       : {usage['input_tokens']} in, "
+            f"{usage['output_tokens']} out, {usage['thinking_tokens']} thinking"
+        )
+
+    phases = result.session_routing.get("phases")
+    if phases:
+        print(f"routed phases        : {phases}")
+
+
+async def _run(names, model_latency: float, artifact_store: str):
+    harness = BenchmarkHarness(model_latency=model_latency, artifact_store=artifact_store)
+    return [await harness.run_scenario(SCENARIOS[name]()) for name in names]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Offline end-to-end benchmarks for recipe_agent.",
+    )
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        metavar="scenario",
+        help=f"Scenarios to run (default: all). One of: {', '.join(SCENARIOS)}.",
+    )
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Simulated seconds per model call.")
+    parser.add_argument(
+        "--artifact-store",
+        choices=("memory", "local"),
+        default="memory",
+        help="Artifact service backing the runner: ADK's in-memory one or the content-addressed LocalArtifactService.",
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = asyncio.run(_run(names, args.model_latency, args.artifact_store))
+
+    for result in results:
+        _print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([result.as_dict() for result in results], f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
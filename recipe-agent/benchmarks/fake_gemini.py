@@ -0,0 +1,146 @@
+"""
+A local stand-in for the Gemini REST endpoint.
+
+Answers `generateContent` and `streamGenerateContent` requests after a fixed
+latency and behaves like a quota-limited backend: while more than `capacity`
+requests are in flight, new ones are rejected with 429 RESOURCE_EXHAUSTED.
+Point the agent at it with `MODEL_BASE_URL`.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+def _response_body(text: str) -> Dict:
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+        }],
+        "usageMetadata": {
+            "promptTokenCount": 10,
+            "candidatesTokenCount": 5,
+            "totalTokenCount": 15,
+        },
+    }
+
+
+_QUOTA_ERROR = {
+    "error": {
+        "code": 429,
+        "message": "Resource has been exhausted (e.g. check quota).",
+        "status": "RESOURCE_EXHAUSTED",
+    }
+}
+
+
+class FakeGeminiServer:
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        capacity: int = 8,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.capacity = capacity
+
+        self.requests = 0
+        self.throttled = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+
+                with server._lock:
+                    server.requests += 1
+                    if server._in_flight >= server.capacity:
+                        server.throttled += 1
+                        admitted = False
+                    else:
+                        server._in_flight += 1
+                        server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                        admitted = True
+
+                if not admitted:
+                    self._send_json(429, _QUOTA_ERROR)
+                    return
+
+                try:
+                    time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+                body = _response_body("Fake response.")
+
+                if ":streamGenerateContent" in self.path:
+                    payload = f"data: {json.dumps(body)}\r\n\r\n".encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+
+                self._send_json(200, body)
+
+        return Handler
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "max_in_flight": self.max_in_flight,
+                "connections": self.connections,
+            }
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
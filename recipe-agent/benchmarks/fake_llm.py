@@ -0,0 +1,126 @@
+import asyncio
+import contextvars
+import logging
+from typing import AsyncGenerator, Callable, Dict, List, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+ScriptedResponse = Union[LlmResponse, Callable[[LlmRequest], LlmResponse]]
+
+# Scripts bound to the current task by `ScriptedLlm.use_script`, by model.
+_context_scripts: contextvars.ContextVar[Dict[int, List[ScriptedResponse]]] = (
+    contextvars.ContextVar("scripted_llm_scripts", default={})
+)
+
+
+def text_response(text: str) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+    )
+
+
+def function_call_response(name: str, args: dict) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+        ),
+    )
+
+
+def request_payload_bytes(llm_request: LlmRequest) -> int:
+    total = 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.inline_data and part.inline_data.data:
+                total += len(part.inline_data.data)
+            elif part.text:
+                total += len(part.text.encode("utf-8"))
+    return total
+
+
+def estimate_usage(
+    llm_request: LlmRequest,
+    llm_response: LlmResponse
+) -> types.GenerateContentResponseUsageMetadata:
+    # Roughly four characters per text token and a flat 258 tokens per
+    # inline attachment, which is what Gemini charges for a small image.
+    prompt_tokens = 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.inline_data:
+                prompt_tokens += 258
+            elif part.text:
+                prompt_tokens += len(part.text) // 4 + 1
+
+    output_tokens = 0
+    for part in (llm_response.content.parts if llm_response.content else []):
+        output_tokens += len(part.text or "") // 4 + 1
+
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=output_tokens,
+        total_token_count=prompt_tokens + output_tokens,
+    )
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Deterministic stand-in for Gemini that replays scripted responses.
+
+    Responses are consumed in order, one per model call; a callable entry is
+    given the `LlmRequest` so it can refer to artifact IDs created earlier in
+    the run. Once the script is exhausted the model keeps answering with a
+    short text reply. `latency` simulates time spent waiting on the model.
+
+    Concurrent sessions sharing one model each bind their own script with
+    `use_script`, which takes precedence over `script` in the current task
+    and the tasks it spawns.
+    """
+
+    script: List[ScriptedResponse] = []
+    latency: float = 0.0
+    calls: int = 0
+    request_bytes: int = 0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"scripted-.*"]
+
+    def use_script(self, responses: List[ScriptedResponse]) -> None:
+        _context_scripts.set({
+            **_context_scripts.get(),
+            id(self): list(responses),
+        })
+
+    async def generate_content_async(
+        self,
+        llm_request: LlmRequest,
+        stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        self.request_bytes += request_payload_bytes(llm_request)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        script = _context_scripts.get().get(id(self), self.script)
+
+        if script:
+            response = script.pop(0)
+        else:
+            response = text_response("Noted.")
+
+        if callable(response):
+            response = response(llm_request)
+
+        if response.usage_metadata is None:
+            response = response.model_copy(
+                update={"usage_metadata": estimate_usage(llm_request, response)}
+            )
+
+        yield response
@@ -0,0 +1,311 @@
+import os
+import tempfile
+
+# Benchmarks never talk to Gemini; give the agent module the configuration it
+# expects and keep caches away from the developer's real ones.
+os.environ.setdefault("ROOT_AGENT_MODEL", "gemini-2.5-flash")
+os.environ.setdefault("WEB_SEARCH_AGENT_MODEL", "gemini-2.5-flash")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault(
+    "SEARCH_CACHE_PATH",
+    os.path.join(tempfile.mkdtemp(prefix="recipe-bench-"), "search.sqlite3")
+)
+
+import functools
+import resource
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.artifacts import BaseArtifactService, InMemoryArtifactService
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from recipe_agent import agent as recipe_agent_module
+from recipe_agent.artifact_store import LocalArtifactService
+
+from .fake_llm import ScriptedLlm, ScriptedResponse
+
+
+APP_NAME = "recipe_agent_benchmark"
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for stage, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            result[stage] = {
+                "count": len(samples),
+                "total_ms": sum(samples) * 1000,
+                "mean_ms": statistics.fmean(samples) * 1000,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return result
+
+
+class CountingArtifactService(BaseArtifactService):
+    """
+    Artifact service wrapper that counts calls and bytes moved.
+
+    Delegates to `inner`, an `InMemoryArtifactService` unless another
+    service is given.
+    """
+
+    def __init__(self, inner: Optional[BaseArtifactService] = None):
+        self.inner = inner or InMemoryArtifactService()
+        self.bytes_saved = 0
+        self.bytes_loaded = 0
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, call: str) -> None:
+        self.calls[call] = self.calls.get(call, 0) + 1
+
+    async def save_artifact(self, **kwargs):
+        artifact = kwargs["artifact"]
+        if artifact.inline_data and artifact.inline_data.data:
+            self.bytes_saved += len(artifact.inline_data.data)
+        self._count("save")
+        return await self.inner.save_artifact(**kwargs)
+
+    async def load_artifact(self, **kwargs):
+        artifact = await self.inner.load_artifact(**kwargs)
+        if artifact and artifact.inline_data and artifact.inline_data.data:
+            self.bytes_loaded += len(artifact.inline_data.data)
+        self._count("load")
+        return artifact
+
+    async def list_artifact_keys(self, **kwargs):
+        self._count("list")
+        return await self.inner.list_artifact_keys(**kwargs)
+
+    async def save_artifact_file(self, **kwargs):
+        self.bytes_saved += os.path.getsize(kwargs["path"])
+        self._count("save")
+        return await self.inner.save_artifact_file(**kwargs)
+
+    def __getattr__(self, name):
+        # Exposes optional extensions of the wrapped service, such as
+        # `LocalArtifactService.spool_path`.
+        return getattr(self.inner, name)
+
+    async def delete_artifact(self, **kwargs):
+        return await self.inner.delete_artifact(**kwargs)
+
+    async def list_versions(self, **kwargs):
+        return await self.inner.list_versions(**kwargs)
+
+    async def list_artifact_versions(self, **kwargs):
+        return await self.inner.list_artifact_versions(**kwargs)
+
+    async def get_artifact_version(self, **kwargs):
+        return await self.inner.get_artifact_version(**kwargs)
+
+
+class ToolTimingPlugin(BasePlugin):
+    def __init__(self, timer: StageTimer):
+        super().__init__(name="benchmark_tool_timing")
+        self.timer = timer
+        self._started: Dict[str, float] = {}
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._started[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        started = self._started.pop(tool_context.function_call_id, None)
+        if started is not None:
+            self.timer.record(f"tool:{tool.name}", time.perf_counter() - started)
+        return None
+
+
+def _timed_callback(callback: Callable, stage: str, timer: StageTimer) -> Callable:
+    @functools.wraps(callback)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await callback(*args, **kwargs)
+        finally:
+            timer.record(stage, time.perf_counter() - started)
+
+    return wrapper
+
+
+@dataclass
+class Turn:
+    """One user message plus the model responses scripted for it."""
+
+    text: str
+    images: List[bytes] = field(default_factory=list)
+    root_responses: List[ScriptedResponse] = field(default_factory=list)
+    search_responses: List[ScriptedResponse] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    turns: List[Turn]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    wall_seconds: float
+    stages: Dict[str, Dict[str, float]]
+    peak_traced_bytes: int
+    max_rss_bytes: int
+    artifact_bytes_saved: int
+    artifact_bytes_loaded: int
+    artifact_calls: Dict[str, int]
+    model_calls: int
+    model_request_bytes: int
+    session_usage: Dict[str, Any] = field(default_factory=dict)
+    session_routing: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class BenchmarkHarness:
+    """
+    Drives `root_agent` through an ADK `Runner` without network access.
+
+    Both agents' models are swapped for `ScriptedLlm` instances and the
+    agent's model callbacks are wrapped with timers. The swap mutates the
+    module-level agents, so a harness is meant to own its process.
+    """
+
+    def __init__(self, model_latency: float = 0.0, artifact_store: str = "memory"):
+        self.timer = StageTimer()
+        self.artifact_store = artifact_store
+        self.root_model = ScriptedLlm(model=os.environ["ROOT_AGENT_MODEL"], latency=model_latency)
+        self.search_model = ScriptedLlm(model=os.environ["WEB_SEARCH_AGENT_MODEL"], latency=model_latency)
+
+        root_agent = recipe_agent_module.root_agent
+        web_search_agent = recipe_agent_module.web_search_agent
+
+        root_agent.model = self.root_model
+        web_search_agent.model = self.search_model
+
+        self._wrap_callbacks(root_agent, "before_model_callback", "callback:before_model")
+        self._wrap_callbacks(root_agent, "after_model_callback", "callback:after_model")
+
+        self.root_agent = root_agent
+
+    def _wrap_callbacks(self, agent, attribute: str, stage: str) -> None:
+        callbacks = getattr(agent, attribute)
+        if not callbacks:
+            return
+
+        if isinstance(callbacks, list):
+            wrapped = [_timed_callback(callback, stage, self.timer) for callback in callbacks]
+        else:
+            wrapped = _timed_callback(callbacks, stage, self.timer)
+
+        setattr(agent, attribute, wrapped)
+
+    def reset(self) -> None:
+        self.timer.samples.clear()
+        self.root_model.calls = 0
+        self.root_model.request_bytes = 0
+        self.search_model.calls = 0
+        self.search_model.request_bytes = 0
+
+    def make_artifact_service(self) -> CountingArtifactService:
+        if self.artifact_store == "local":
+            return CountingArtifactService(
+                LocalArtifactService(tempfile.mkdtemp(prefix="recipe-bench-artifacts-"))
+            )
+        return CountingArtifactService()
+
+    def make_runner(self, artifact_service: Optional[BaseArtifactService] = None) -> Runner:
+        return Runner(
+            app_name=APP_NAME,
+            agent=self.root_agent,
+            session_service=InMemorySessionService(),
+            artifact_service=artifact_service or self.make_artifact_service(),
+            plugins=[ToolTimingPlugin(self.timer)],
+        )
+
+    async def run_turn(
+        self,
+        runner: Runner,
+        user_id: str,
+        session_id: str,
+        turn: Turn,
+        on_event: Optional[Callable[[Any], None]] = None,
+    ) -> int:
+        parts = [types.Part(text=turn.text)]
+        for index, image in enumerate(turn.images):
+            parts.append(types.Part(inline_data=types.Blob(
+                data=image,
+                mime_type="image/jpeg",
+                display_name=f"upload_{index}.jpeg",
+            )))
+
+        events = 0
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=types.Content(role="user", parts=parts),
+        ):
+            events += 1
+            if on_event is not None:
+                on_event(event)
+        return events
+
+    async def run_scenario(self, scenario: Scenario) -> ScenarioResult:
+        self.reset()
+        artifact_service = self.make_artifact_service()
+        runner = self.make_runner(artifact_service)
+        session = await runner.session_service.create_session(app_name=APP_NAME, user_id="bench")
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            for turn in scenario.turns:
+                self.root_model.script = list(turn.root_responses)
+                self.search_model.script = list(turn.search_responses)
+
+                turn_started = time.perf_counter()
+                await self.run_turn(runner, session.user_id, session.id, turn)
+                self.timer.record("turn", time.perf_counter() - turn_started)
+        finally:
+            wall_seconds = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            session = await runner.session_service.get_session(
+                app_name=APP_NAME,
+                user_id=session.user_id,
+                session_id=session.id,
+            )
+            await runner.close()
+
+        return ScenarioResult(
+            name=scenario.name,
+            wall_seconds=wall_seconds,
+            stages=self.timer.summary(),
+            peak_traced_bytes=peak,
+            max_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            artifact_bytes_saved=artifact_service.bytes_saved,
+            artifact_bytes_loaded=artifact_service.bytes_loaded,
+            artifact_calls=dict(artifact_service.calls),
+            model_calls=self.root_model.calls + self.search_model.calls,
+            model_request_bytes=self.root_model.request_bytes + self.search_model.request_bytes,
+            session_usage=session.state.get("usage", {}) if session else {},
+            session_routing=session.state.get("model_routing", {}) if session else {},
+        )
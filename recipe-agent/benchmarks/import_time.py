@@ -0,0 +1,168 @@
+"""
+Cold-start import benchmark for the recipe_agent package.
+
+Runs `python -X importtime -c "import recipe_agent"` in fresh interpreters,
+reports the slowest modules and how much of the import is spent in
+recipe_agent itself, and fails when that overhead crosses a threshold or a
+module that should only load on first use is imported eagerly.
+
+    python -m benchmarks.import_time [--repeat N] [--threshold-ms MS]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+# Third-party imports that recipe_agent cannot avoid: ADK itself.
+BASELINE_IMPORT = "import google.adk.agents.llm_agent, google.adk.models.google_llm"
+
+# Modules that must not be loaded by a bare `import recipe_agent`.
+DEFAULT_FORBIDDEN = ("reportlab", "opentelemetry.sdk", "recipe_agent.documents")
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+@dataclass
+class ImportSample:
+    total_us: int
+    self_us: Dict[str, int]
+
+
+def _run_importtime(statement: str) -> ImportSample:
+    env = dict(os.environ)
+    env.setdefault("ROOT_AGENT_MODEL", "gemini-2.5-flash")
+    env.setdefault("WEB_SEARCH_AGENT_MODEL", "gemini-2.5-flash")
+    env.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    self_us = {}
+    total_us = 0
+
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+
+        self_time, cumulative, indent, module = match.groups()
+        self_us[module] = int(self_time)
+
+        if len(indent) == 1:
+            total_us += int(cumulative)
+
+    return ImportSample(total_us, self_us)
+
+
+def _best(samples: List[ImportSample]) -> ImportSample:
+    return min(samples, key=lambda sample: sample.total_us)
+
+
+def measure(repeat: int) -> Dict[str, object]:
+    package = _best([_run_importtime("import recipe_agent") for _ in range(repeat)])
+    baseline = _best([_run_importtime(BASELINE_IMPORT) for _ in range(repeat)])
+
+    by_package = defaultdict(int)
+    for module, self_time in package.self_us.items():
+        by_package[module.split(".")[0]] += self_time
+
+    own_modules = {
+        module: self_time
+        for module, self_time in package.self_us.items()
+        if module.startswith("recipe_agent")
+    }
+
+    return {
+        "total_ms": package.total_us / 1000,
+        "baseline_ms": baseline.total_us / 1000,
+        "overhead_ms": (package.total_us - baseline.total_us) / 1000,
+        "own_ms": sum(own_modules.values()) / 1000,
+        "modules": sorted(package.self_us),
+        "top_packages": sorted(
+            ((name, us / 1000) for name, us in by_package.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:15],
+        "own_modules": sorted(
+            ((name, us / 1000) for name, us in own_modules.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        ),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.import_time",
+        description="Cold-start import time of the recipe_agent package.",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement; the fastest run is kept.")
+    parser.add_argument(
+        "--threshold-ms",
+        type=float,
+        default=150.0,
+        help="Fail when importing recipe_agent takes this much longer than importing ADK alone.",
+    )
+    parser.add_argument(
+        "--forbid",
+        action="append",
+        default=None,
+        help=f"Module prefix that must not be imported eagerly (default: {', '.join(DEFAULT_FORBIDDEN)}).",
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    result = measure(args.repeat)
+    forbidden = tuple(args.forbid or DEFAULT_FORBIDDEN)
+    eager = [
+        prefix for prefix in forbidden
+        if any(
+            module == prefix or module.startswith(prefix + ".")
+            for module in result["modules"]
+        )
+    ]
+
+    print(f"import recipe_agent : {result['total_ms']:.1f} ms")
+    print(f"ADK baseline        : {result['baseline_ms']:.1f} ms")
+    print(f"overhead            : {result['overhead_ms']:.1f} ms (threshold {args.threshold_ms:g} ms)")
+    print(f"recipe_agent modules: {result['own_ms']:.1f} ms self time")
+
+    print("\nslowest top-level packages (self time):")
+    for name, ms in result["top_packages"]:
+        print(f"  {name:<32}{ms:>10.1f} ms")
+
+    print("\nrecipe_agent modules (self time):")
+    for name, ms in result["own_modules"]:
+        print(f"  {name:<32}{ms:>10.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({**result, "eager_forbidden": eager}, f, indent=2)
+
+    failed = False
+
+    if eager:
+        print(f"\nFAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+
+    if result["overhead_ms"] > args.threshold_ms:
+        print(f"\nFAIL: import overhead {result['overhead_ms']:.1f} ms exceeds {args.threshold_ms:g} ms")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
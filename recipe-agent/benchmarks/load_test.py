@@ -0,0 +1,485 @@
+"""
+Concurrent load test for capacity planning.
+
+Drives many scripted recipe sessions through one `root_agent` runner, the
+way a single server worker would serve them, with the models replaced by
+`ScriptedLlm` and in-memory session and artifact services. Each session
+uploads a photo, answers clarifying questions, generates the recipe
+document and asks a follow-up. Sessions start at a configurable arrival
+rate and run concurrently.
+
+Reports throughput, turn latency percentiles (overall and per turn kind),
+tool calls that returned an error, event-loop lag, the slowest callback and
+tool stages, and process RSS over time. A session fails when a turn raises
+or any of its tool calls returns `{"status": "error"}` (for instance a busy
+renderer); the command exits non-zero if any session failed.
+
+    python -m benchmarks.load_test --sessions 50 --arrival-rate 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from .fake_llm import text_response
+from .harness import APP_NAME, BenchmarkHarness, Turn
+from .scenarios import generate_document_call, make_image
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples) or [0.0]
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process now, or its peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def session_turns(
+    image: bytes,
+    clarifications: int = 2,
+    output_format: str = "pdf",
+) -> List[Tuple[str, Turn]]:
+    """The turns of one load-test session, each labelled with its kind."""
+    turns = [(
+        "upload",
+        Turn(
+            text="Can you give me the recipe for this dish?",
+            images=[image],
+            root_responses=[text_response("Any allergies or dietary preferences?")],
+        ),
+    )]
+
+    for i in range(clarifications):
+        turns.append((
+            "clarify",
+            Turn(
+                text=f"Answer {i + 1}: no nuts, and I prefer less salt.",
+                root_responses=[text_response("Got it. Anything else before I write it up?")],
+            ),
+        ))
+
+    turns.append((
+        "document",
+        Turn(
+            text="That's all, please generate the document.",
+            root_responses=[
+                generate_document_call(output_format=output_format),
+                text_response("Here is your recipe."),
+            ],
+        ),
+    ))
+    turns.append((
+        "follow_up",
+        Turn(
+            text="Thanks! How long does it keep in the fridge?",
+            root_responses=[text_response("Up to two days in an airtight container.")],
+        ),
+    ))
+
+    return turns
+
+
+@dataclass
+class LoadTestResult:
+    sessions: int
+    failed_sessions: int
+    wall_seconds: float
+    turns: int
+    turn_latency: Dict[str, float]
+    turn_latency_by_kind: Dict[str, Dict[str, float]]
+    session_latency: Dict[str, float]
+    loop_lag: Dict[str, float]
+    stages: Dict[str, Dict[str, float]]
+    rss_timeline: List[Dict[str, Any]]
+    peak_rss_bytes: int
+    peak_child_rss_bytes: int
+    tool_errors_by_kind: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def tool_errors(self) -> int:
+        return sum(
+            count
+            for tools in self.tool_errors_by_kind.values()
+            for count in tools.values()
+        )
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def sessions_per_second(self) -> float:
+        completed = self.sessions - self.failed_sessions
+        return completed / self.wall_seconds if self.wall_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **self.__dict__,
+            "turns_per_second": self.turns_per_second,
+            "sessions_per_second": self.sessions_per_second,
+            "tool_errors": self.tool_errors,
+        }
+
+
+class LoadTest:
+    """
+    Starts `sessions` sessions on one shared runner and samples the event
+    loop and memory while they run.
+
+    Arrivals are spaced `1 / arrival_rate` seconds apart, or drawn from an
+    exponential distribution with `poisson`; an arrival rate of 0 starts
+    every session at once. Event-loop lag is how late a timer that should
+    fire every `lag_interval` seconds actually fires, which is the delay
+    every other coroutine on the worker sees at that moment.
+    """
+
+    def __init__(
+        self,
+        harness: BenchmarkHarness,
+        sessions: int,
+        arrival_rate: float,
+        poisson: bool,
+        clarifications: int,
+        images: List[bytes],
+        output_format: str = "pdf",
+        sample_interval: float = 1.0,
+        lag_interval: float = 0.05,
+    ):
+        self.harness = harness
+        self.sessions = sessions
+        self.arrival_rate = arrival_rate
+        self.poisson = poisson
+        self.clarifications = clarifications
+        self.images = images
+        self.output_format = output_format
+        self.sample_interval = sample_interval
+        self.lag_interval = lag_interval
+
+        self.turn_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.session_latencies: List[float] = []
+        self.loop_lags: List[float] = []
+        self.rss_timeline: List[Dict[str, Any]] = []
+        self.tool_errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: List[str] = []
+
+        self._active = 0
+        self._completed_turns = 0
+        self._started = 0.0
+
+    def _record_tool_errors(self, index: int, kind: str, event) -> int:
+        errors = 0
+
+        for response in event.get_function_responses():
+            result = response.response or {}
+            if result.get("status") != "error":
+                continue
+
+            errors += 1
+            self.tool_errors[kind][response.name] += 1
+            self.errors.append(
+                f"session {index}, {kind}: {response.name}: {result.get('message', '')}"
+            )
+
+        return errors
+
+    async def _run_session(self, runner, index: int) -> bool:
+        self._active += 1
+        started = time.perf_counter()
+        tool_errors = 0
+
+        try:
+            session = await runner.session_service.create_session(
+                app_name=APP_NAME,
+                user_id=f"load-{index}",
+            )
+
+            turns = session_turns(
+                self.images[index % len(self.images)],
+                clarifications=self.clarifications,
+                output_format=self.output_format,
+            )
+
+            for kind, turn in turns:
+                # Each session replays its own script; the scripts are bound
+                # to this task, so sessions do not consume each other's.
+                self.harness.root_model.use_script(turn.root_responses)
+                self.harness.search_model.use_script(turn.search_responses)
+
+                def on_event(event, kind=kind) -> None:
+                    nonlocal tool_errors
+                    tool_errors += self._record_tool_errors(index, kind, event)
+
+                turn_started = time.perf_counter()
+                await self.harness.run_turn(
+                    runner,
+                    session.user_id,
+                    session.id,
+                    turn,
+                    on_event=on_event,
+                )
+                self.turn_latencies[kind].append(time.perf_counter() - turn_started)
+                self._completed_turns += 1
+
+            self.session_latencies.append(time.perf_counter() - started)
+            return tool_errors == 0
+
+        except Exception as e:
+            logger.exception("Load test session %d failed.", index)
+            self.errors.append(f"session {index}: {type(e).__name__}: {e}")
+            return False
+
+        finally:
+            self._active -= 1
+
+    async def _sample_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lags.append(max(0.0, loop.time() - expected))
+
+    async def _sample_rss(self) -> None:
+        while True:
+            self.rss_timeline.append({
+                "t_s": round(time.perf_counter() - self._started, 2),
+                "rss_bytes": current_rss_bytes(),
+                "active_sessions": self._active,
+                "completed_turns": self._completed_turns,
+            })
+            await asyncio.sleep(self.sample_interval)
+
+    def _next_arrival(self) -> float:
+        if not self.arrival_rate:
+            return 0.0
+        if self.poisson:
+            return random.expovariate(self.arrival_rate)
+        return 1 / self.arrival_rate
+
+    async def run(self) -> LoadTestResult:
+        self.harness.reset()
+        runner = self.harness.make_runner()
+
+        self._started = time.perf_counter()
+        samplers = [
+            asyncio.create_task(self._sample_loop_lag()),
+            asyncio.create_task(self._sample_rss()),
+        ]
+
+        try:
+            tasks = []
+            for index in range(self.sessions):
+                tasks.append(asyncio.create_task(self._run_session(runner, index)))
+
+                delay = self._next_arrival()
+                if delay and index + 1 < self.sessions:
+                    await asyncio.sleep(delay)
+
+            outcomes = await asyncio.gather(*tasks)
+            wall_seconds = time.perf_counter() - self._started
+
+        finally:
+            for sampler in samplers:
+                sampler.cancel()
+            await asyncio.gather(*samplers, return_exceptions=True)
+            await runner.close()
+
+        self.rss_timeline.append({
+            "t_s": round(wall_seconds, 2),
+            "rss_bytes": current_rss_bytes(),
+            "active_sessions": self._active,
+            "completed_turns": self._completed_turns,
+        })
+
+        all_turns = [
+            latency
+            for latencies in self.turn_latencies.values()
+            for latency in latencies
+        ]
+
+        return LoadTestResult(
+            sessions=self.sessions,
+            failed_sessions=outcomes.count(False),
+            wall_seconds=wall_seconds,
+            turns=len(all_turns),
+            turn_latency=_latency_summary(all_turns),
+            turn_latency_by_kind={
+                kind: _latency_summary(latencies)
+                for kind, latencies in self.turn_latencies.items()
+            },
+            session_latency=_latency_summary(self.session_latencies),
+            loop_lag=_latency_summary(self.loop_lags),
+            stages=self.harness.timer.summary(),
+            rss_timeline=self.rss_timeline,
+            peak_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            peak_child_rss_bytes=resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024,
+            tool_errors_by_kind={
+                kind: dict(tools) for kind, tools in self.tool_errors.items()
+            },
+            errors=self.errors,
+        )
+
+
+def _format_mb(value: int) -> str:
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def _print_latency_row(label: str, stats: Dict[str, float]) -> None:
+    print(
+        f"{label:<36}{stats['count']:>7}{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}"
+        f"{stats['p99_ms']:>11.1f}{stats['max_ms']:>11.1f}"
+    )
+
+
+def _print_report(result: LoadTestResult, max_timeline_rows: int = 20) -> None:
+    print(
+        f"\n== load test: {result.sessions} sessions "
+        f"({result.failed_sessions} failed), {result.wall_seconds:.2f} s wall"
+    )
+    print(
+        f"throughput           : {result.turns_per_second:.2f} turns/s, "
+        f"{result.sessions_per_second:.2f} sessions/s"
+    )
+    print(f"tool errors          : {result.tool_errors}")
+    for kind, tools in result.tool_errors_by_kind.items():
+        for tool, count in tools.items():
+            print(f"  turn:{kind:<18}: {tool} x{count}")
+
+    print(f"\n{'latency':<36}{'count':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    _print_latency_row("turn", result.turn_latency)
+    for kind, stats in result.turn_latency_by_kind.items():
+        _print_latency_row(f"  turn:{kind}", stats)
+    _print_latency_row("session", result.session_latency)
+    _print_latency_row("event loop lag", result.loop_lag)
+
+    slowest = sorted(result.stages.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+    print(f"\n{'stage':<36}{'count':>7}{'total ms':>12}{'mean ms':>11}{'p95 ms':>11}")
+    for stage, stats in slowest[:8]:
+        print(
+            f"{stage:<36}{stats['count']:>7}{stats['total_ms']:>12.1f}"
+            f"{stats['mean_ms']:>11.1f}{stats['p95_ms']:>11.1f}"
+        )
+
+    timeline = result.rss_timeline
+    step = max(1, len(timeline) // max_timeline_rows)
+    rows = timeline[::step]
+    if rows[-1] is not timeline[-1]:
+        rows.append(timeline[-1])
+
+    print(f"\n{'t (s)':>8}{'RSS':>12}{'active':>8}{'turns':>8}")
+    for sample in rows:
+        print(
+            f"{sample['t_s']:>8.1f}{_format_mb(sample['rss_bytes']):>12}"
+            f"{sample['active_sessions']:>8}{sample['completed_turns']:>8}"
+        )
+
+    print(f"\npeak RSS             : {_format_mb(result.peak_rss_bytes)}")
+    print(f"peak child RSS       : {_format_mb(result.peak_child_rss_bytes)}")
+
+    for error in result.errors[:5]:
+        print(f"error                : {error}")
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+async def _run(args) -> LoadTestResult:
+    harness = BenchmarkHarness(
+        model_latency=args.model_latency,
+        artifact_store=args.artifact_store,
+    )
+
+    # Generated up front so that encoding test photos is not measured.
+    images = [
+        make_image(*args.image_size, seed=seed)
+        for seed in range(min(args.distinct_images, args.sessions))
+    ]
+
+    return await LoadTest(
+        harness,
+        sessions=args.sessions,
+        arrival_rate=args.arrival_rate,
+        poisson=args.poisson,
+        clarifications=args.clarifications,
+        images=images,
+        output_format=args.output_format,
+        sample_interval=args.sample_interval,
+    ).run()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load_test",
+        description="Concurrent offline load test of recipe_agent sessions.",
+    )
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions to run.")
+    parser.add_argument(
+        "--arrival-rate",
+        type=float,
+        default=2.0,
+        help="New sessions per second (0 starts them all at once).",
+    )
+    parser.add_argument("--poisson", action="store_true", help="Draw arrival gaps from an exponential distribution.")
+    parser.add_argument("--clarifications", type=int, default=2, help="Clarification turns per session.")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Simulated seconds per model call.")
+    parser.add_argument("--image-size", type=_parse_size, default=(2400, 1800), help="Uploaded photo size, WIDTHxHEIGHT.")
+    parser.add_argument("--distinct-images", type=int, default=8, help="Different photos to rotate between sessions.")
+    parser.add_argument("--output-format", default="pdf", help="Format of the generated document.")
+    parser.add_argument(
+        "--artifact-store",
+        choices=("memory", "local"),
+        default="memory",
+        help="Artifact service backing the runner: ADK's in-memory one or the content-addressed LocalArtifactService.",
+    )
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between RSS samples.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for Poisson arrivals.")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(args.seed)
+
+    result = asyncio.run(_run(args))
+    _print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result.as_dict(), f, indent=2)
+
+    return 1 if result.failed_sessions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Burst benchmark for the shared model client and its adaptive limiter.
+
+Fires a burst of concurrent `RecipeGemini` requests at a local
+`FakeGeminiServer` whose quota is smaller than the burst, and reports the
+latency percentiles, how many requests the backend throttled, how many
+connections were opened and the limiter's final state.
+
+    python -m benchmarks.model_pool [--requests N] [--capacity C] [--no-limit]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from .fake_gemini import FakeGeminiServer
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _burst(model, requests: int) -> Dict[str, object]:
+    from google.adk.models import LlmRequest
+    from google.genai import types
+
+    latencies = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        llm_request = LlmRequest(
+            model=model.model,
+            contents=[types.Content(role="user", parts=[types.Part(text=f"Request {i}")])],
+            config=types.GenerateContentConfig(),
+        )
+
+        started = time.perf_counter()
+        try:
+            async for _ in model.generate_content_async(llm_request):
+                pass
+            latencies.append(time.perf_counter() - started)
+
+        except Exception:
+            failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+
+    ordered = sorted(latencies) or [0.0]
+    return {
+        "wall_s": wall,
+        "succeeded": len(latencies),
+        "failed": failures,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.model_pool",
+        description="Burst load against a local fake Gemini endpoint.",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Concurrent requests in the burst.")
+    parser.add_argument("--capacity", type=int, default=16, help="Requests the fake backend serves at once before returning 429.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake backend latency in seconds.")
+    parser.add_argument(
+        "--no-limit",
+        action="store_true",
+        help="Disable the adaptive limit (retries still back off), to compare against unbounded concurrency.",
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    server = FakeGeminiServer(latency=args.latency, capacity=args.capacity).start()
+
+    # Configuration is read at import time, so it is set before the agent
+    # package is imported.
+    os.environ["MODEL_BASE_URL"] = server.base_url
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ["CONTEXT_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("MODEL_BACKOFF_BASE_SECONDS", "0.2")
+    os.environ.setdefault("MODEL_BACKOFF_MAX_SECONDS", "2")
+    os.environ.setdefault("MODEL_MAX_ATTEMPTS", "6")
+
+    from recipe_agent import model_pool
+    from recipe_agent.models import RecipeGemini
+
+    model = RecipeGemini(model="gemini-2.5-flash", use_interactions_api=False)
+
+    if args.no_limit:
+        # RecipeGemini always goes through the process-wide limiter, so the
+        # unbounded comparison swaps in one with a fixed, burst-sized limit.
+        model_pool._limiter = model_pool.AdaptiveConcurrencyLimiter(
+            initial_limit=args.requests,
+            min_limit=args.requests,
+            max_limit=args.requests,
+        )
+
+    limiter = model_pool.get_model_limiter()
+
+    try:
+        result = asyncio.run(_burst(model, args.requests))
+
+    finally:
+        server.stop()
+
+    result["backend"] = server.stats()
+    result["limiter"] = limiter.stats()
+
+    print(f"requests             : {args.requests} ({result['succeeded']} ok, {result['failed']} failed)")
+    print(f"wall                 : {result['wall_s'] * 1000:.0f} ms")
+    print(
+        f"latency              : p50 {result['p50_ms']:.0f} ms, p95 {result['p95_ms']:.0f} ms, "
+        f"p99 {result['p99_ms']:.0f} ms"
+    )
+    print(f"backend              : {result['backend']}")
+    print(f"limiter              : {result['limiter']}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
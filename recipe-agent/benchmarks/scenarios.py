@@ -0,0 +1,158 @@
+import io
+import re
+from typing import Dict, List
+
+from google.adk.models import LlmRequest, LlmResponse
+from PIL import Image
+
+from .fake_llm import function_call_response, text_response
+from .harness import Scenario, Turn
+
+
+_ARTIFACT_ID_PATTERN = re.compile(r"artifact ID : (user_uploaded_img_\S+)", re.IGNORECASE)
+
+
+def make_image(width: int = 3000, height: int = 2000, seed: int = 0) -> bytes:
+    """A photo-like JPEG: a colour gradient with noise, so it compresses realistically."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40 + seed % 20)
+    image = Image.merge("RGB", (gradient, noise, gradient.rotate(90, expand=False)))
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=92)
+    return output.getvalue()
+
+
+def latest_uploaded_artifact_id(llm_request: LlmRequest) -> str:
+    artifact_id = "missing"
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            match = _ARTIFACT_ID_PATTERN.search(part.text or "")
+            if match:
+                artifact_id = match.group(1)
+    return artifact_id
+
+
+def generate_document_call(
+    recipe_name: str = "Benchmark Bruschetta",
+    output_format: str = "pdf",
+):
+    def respond(llm_request: LlmRequest) -> LlmResponse:
+        return function_call_response("generate_recipe_document", {
+            "recipe_name": recipe_name,
+            "description": " ".join(["A rustic Italian starter."] * 40),
+            "prep_time": "15 minutes",
+            "serves": "4",
+            "cook_time": "10 minutes",
+            "ingredients": [f"{i + 1} tbsp ingredient {i}" for i in range(14)],
+            "method": [" ".join([f"Step {i + 1} detail."] * 12) for i in range(10)],
+            "recipe_image_artifact_id": latest_uploaded_artifact_id(llm_request),
+            "output_format": output_format,
+        })
+
+    return respond
+
+
+def callback_processing(turns: int = 20, image_size=(1600, 1200)) -> Scenario:
+    return Scenario(
+        name="callback_processing",
+        description="Every turn uploads a photo; measures before_model_callback growth.",
+        turns=[
+            Turn(
+                text=f"Here is another photo, number {i}.",
+                images=[make_image(*image_size, seed=i)],
+                root_responses=[text_response("That looks delicious.")],
+            )
+            for i in range(turns)
+        ],
+    )
+
+
+def pdf_render(image_size=(4000, 3000), output_format: str = "pdf") -> Scenario:
+    return Scenario(
+        name="pdf_render" if output_format == "pdf" else f"{output_format}_render",
+        description=f"Upload a large photo, generate the {output_format} document, then ask a follow-up.",
+        turns=[
+            Turn(
+                text="Can you give me the recipe for this dish?",
+                images=[make_image(*image_size)],
+                root_responses=[text_response("Any allergies?")],
+            ),
+            Turn(
+                text="No allergies, please generate the document.",
+                root_responses=[
+                    generate_document_call(output_format=output_format),
+                    text_response("Here is your recipe."),
+                ],
+            ),
+            Turn(
+                text="Thanks! Can I make it vegan?",
+                root_responses=[text_response("Yes, swap the cheese.")],
+            ),
+        ],
+    )
+
+
+def research() -> Scenario:
+    queries = [
+        "authentic bruschetta method",
+        "dairy-free substitute for parmesan",
+        "Massimo Bottura bruschetta style",
+    ]
+    return Scenario(
+        name="research",
+        description="One single web search delegation, then a batched search.",
+        turns=[
+            Turn(
+                text="How is bruschetta traditionally prepared?",
+                root_responses=[
+                    function_call_response("web_search_agent", {"request": queries[0]}),
+                    text_response("Traditionally it is grilled bread rubbed with garlic."),
+                ],
+                search_responses=[text_response("Grill bread, rub garlic, add oil and salt.")],
+            ),
+            Turn(
+                text="Make it dairy-free in the style of a famous chef.",
+                root_responses=[
+                    function_call_response("batch_web_search", {"queries": queries}),
+                    text_response("Here is what I found."),
+                ],
+                search_responses=[
+                    text_response(f"Result for {query}.\nUse good olive oil.")
+                    for query in queries
+                ],
+            ),
+        ],
+    )
+
+
+def image_heavy_long_session(turns: int = 40, image_every: int = 4) -> Scenario:
+    session_turns: List[Turn] = []
+    for i in range(turns):
+        if i == turns // 2:
+            session_turns.append(Turn(
+                text="Please generate the PDF now.",
+                root_responses=[generate_document_call(), text_response("Done.")],
+            ))
+            continue
+
+        session_turns.append(Turn(
+            text=f"Turn {i}: what about this one?" if i % image_every == 0 else f"Turn {i}: sounds good.",
+            images=[make_image(2400, 1800, seed=i)] if i % image_every == 0 else [],
+            root_responses=[text_response("Great, tell me more.")],
+        ))
+
+    return Scenario(
+        name="image_heavy_long_session",
+        description="A long session with periodic uploads and a PDF half-way.",
+        turns=session_turns,
+    )
+
+
+SCENARIOS: Dict[str, callable] = {
+    "callback_processing": callback_processing,
+    "pdf_render": pdf_render,
+    "html_render": lambda: pdf_render(output_format="html"),
+    "research": research,
+    "image_heavy_long_session": image_heavy_long_session,
+}
@@ -0,0 +1,258 @@
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai.types import Content, Part
+
+from .compaction import CompactionPolicy, DEFAULT_COMPACTION_POLICY
+from .config import BUDGET_COMPACTION_KEEP_RECENT_TURNS
+from .config import BUDGET_COMPACTION_MAX_INLINE_BYTES, BUDGET_FALLBACK_MODEL
+from .config import USAGE_INLINE_BYTES_BUDGET, USAGE_TOKEN_BUDGET
+from .config import USAGE_TOKEN_LIMIT
+from .tracing import measure_contents
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+USAGE_STATE_KEY = "usage"
+
+USAGE_COUNTERS = (
+    "requests",
+    "input_tokens",
+    "cached_tokens",
+    "output_tokens",
+    "thinking_tokens",
+    "inline_bytes",
+    "text_bytes",
+)
+
+
+@dataclass(frozen=True)
+class UsageBudget:
+    """
+    Per-session limits on model usage. A value of 0 disables the limit.
+
+    Exceeding `tokens` or `inline_bytes` puts the session in budget mode:
+    history is compacted with `compaction` and, if `fallback_model` is set,
+    requests go to that model instead. Exceeding `token_limit` stops the
+    session from calling the model at all.
+    """
+
+    tokens: int = 0
+    inline_bytes: int = 0
+    token_limit: int = 0
+    fallback_model: str = ""
+    compaction: CompactionPolicy = DEFAULT_COMPACTION_POLICY
+
+
+DEFAULT_USAGE_BUDGET = UsageBudget(
+    tokens=USAGE_TOKEN_BUDGET,
+    inline_bytes=USAGE_INLINE_BYTES_BUDGET,
+    token_limit=USAGE_TOKEN_LIMIT,
+    fallback_model=BUDGET_FALLBACK_MODEL,
+    compaction=CompactionPolicy(
+        enabled=True,
+        keep_recent_turns=BUDGET_COMPACTION_KEEP_RECENT_TURNS,
+        max_inline_bytes=BUDGET_COMPACTION_MAX_INLINE_BYTES,
+    ),
+)
+
+
+def get_usage(callback_context: CallbackContext) -> Dict[str, Any]:
+    """
+    Returns the session's usage record.
+
+    The record holds running `total` counters for the session, the same
+    counters per agent under `agents`, and `over_budget` / `over_limit`
+    flags set by `after_model_callback`.
+    """
+    return _usage_record(callback_context.state.get(USAGE_STATE_KEY))
+
+
+def _usage_record(usage: Dict[str, Any] | None) -> Dict[str, Any]:
+    usage = usage or {}
+
+    return {
+        "total": {**dict.fromkeys(USAGE_COUNTERS, 0), **usage.get("total", {})},
+        "agents": dict(usage.get("agents", {})),
+        "over_budget": usage.get("over_budget", False),
+        "over_limit": usage.get("over_limit", False),
+    }
+
+
+def _add_usage(
+    callback_context: CallbackContext,
+    budget: UsageBudget = DEFAULT_USAGE_BUDGET,
+    **counters: int
+) -> Dict[str, Any]:
+    usage = get_usage(callback_context)
+    agent_usage = {
+        **dict.fromkeys(USAGE_COUNTERS, 0),
+        **usage["agents"].get(callback_context.agent_name, {}),
+    }
+
+    for counter, value in counters.items():
+        usage["total"][counter] += value or 0
+        agent_usage[counter] += value or 0
+
+    usage["agents"][callback_context.agent_name] = agent_usage
+
+    _apply_budget_flags(usage, budget)
+    callback_context.state[USAGE_STATE_KEY] = usage
+    return usage
+
+
+def _apply_budget_flags(usage: Dict[str, Any], budget: UsageBudget) -> None:
+    total = usage["total"]
+    tokens = total["input_tokens"] + total["output_tokens"] + total["thinking_tokens"]
+
+    usage["over_budget"] = (
+        (budget.tokens > 0 and tokens > budget.tokens)
+        or (budget.inline_bytes > 0 and total["inline_bytes"] > budget.inline_bytes)
+    )
+    usage["over_limit"] = budget.token_limit > 0 and tokens > budget.token_limit
+
+
+def merge_branch_usage(
+    callback_context: CallbackContext,
+    base: Dict[str, Any] | None,
+    branches: Iterable[Dict[str, Any] | None],
+    budget: UsageBudget = DEFAULT_USAGE_BUDGET
+) -> Dict[str, Any]:
+    """
+    Adds the usage recorded by concurrent branches, such as parallel
+    `AgentTool` runs, to the session's usage.
+
+    Every branch must have started from the usage record `base`. The
+    session's usage becomes `base` plus what each branch added on top of it,
+    replacing whatever the branches wrote to the session state themselves,
+    so branches that finish last do not overwrite the others.
+    """
+    base = _usage_record(base)
+    usage = _usage_record(base)
+
+    for branch in branches:
+        branch = _usage_record(branch)
+
+        for counter in USAGE_COUNTERS:
+            usage["total"][counter] += branch["total"][counter] - base["total"][counter]
+
+        for agent_name, agent_counters in branch["agents"].items():
+            base_counters = base["agents"].get(agent_name, {})
+            merged = {
+                **dict.fromkeys(USAGE_COUNTERS, 0),
+                **usage["agents"].get(agent_name, {}),
+            }
+
+            for counter in USAGE_COUNTERS:
+                merged[counter] += (
+                    agent_counters.get(counter, 0) - base_counters.get(counter, 0)
+                )
+
+            usage["agents"][agent_name] = merged
+
+    _apply_budget_flags(usage, budget)
+    callback_context.state[USAGE_STATE_KEY] = usage
+    return usage
+
+
+def record_request(
+    callback_context: CallbackContext,
+    inline_bytes: int,
+    text_bytes: int
+) -> None:
+    """Adds one model request and the bytes it sends to the session's usage."""
+    _add_usage(
+        callback_context,
+        requests=1,
+        inline_bytes=inline_bytes,
+        text_bytes=text_bytes,
+    )
+
+
+def apply_budget(
+    llm_request: LlmRequest,
+    callback_context: CallbackContext,
+    budget: UsageBudget = DEFAULT_USAGE_BUDGET
+) -> LlmResponse | CompactionPolicy:
+    """
+    Applies the session's budget to an outgoing request.
+
+    Returns a canned response when the session is over its hard token limit,
+    which stops the model call. Otherwise switches the request to the
+    fallback model if the session is over budget, and returns the compaction
+    policy to use for its history.
+    """
+    usage = get_usage(callback_context)
+
+    if usage["over_limit"]:
+        logger.warning(
+            "Session %s exceeded its token limit, model call skipped.",
+            callback_context.session.id,
+        )
+        return LlmResponse(
+            content=Content(
+                role="model",
+                parts=[Part(text=(
+                    "This conversation has reached its usage limit. "
+                    "Please start a new session to continue."
+                ))],
+            )
+        )
+
+    if not usage["over_budget"]:
+        return DEFAULT_COMPACTION_POLICY
+
+    if budget.fallback_model and llm_request.model != budget.fallback_model:
+        logger.info(
+            "Session %s is over budget, using %s instead of %s.",
+            callback_context.session.id,
+            budget.fallback_model,
+            llm_request.model,
+        )
+        llm_request.model = budget.fallback_model
+
+    return budget.compaction
+
+
+async def after_model_callback(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse
+) -> LlmResponse | None:
+    usage_metadata = llm_response.usage_metadata
+
+    if llm_response.partial or usage_metadata is None:
+        return None
+
+    usage = _add_usage(
+        callback_context,
+        input_tokens=usage_metadata.prompt_token_count,
+        cached_tokens=usage_metadata.cached_content_token_count,
+        output_tokens=usage_metadata.candidates_token_count,
+        thinking_tokens=usage_metadata.thoughts_token_count,
+    )
+
+    logger.debug("Session usage: %s", usage["total"])
+    return None
+
+
+async def before_model_callback(
+    llm_request: LlmRequest,
+    callback_context: CallbackContext
+) -> LlmResponse | None:
+    """
+    Accounting-only `before_model_callback` for agents whose history does not
+    need rewriting, such as the web search agent.
+    """
+    budget_result = apply_budget(llm_request, callback_context)
+
+    if isinstance(budget_result, LlmResponse):
+        return budget_result
+
+    inline_bytes, text_bytes = measure_contents(llm_request.contents)
+    record_request(callback_context, inline_bytes, text_bytes)
+    return None
@@ -1,55 +1,69 @@
-import os
 import logging
 import warnings
-from dotenv import load_dotenv
 
-from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
-from google.adk.planners import BuiltInPlanner
-from google.adk.tools import google_search
-from google.adk.tools.agent_tool import AgentTool
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.planners.built_in_planner import BuiltInPlanner
+from google.adk.tools.google_search_tool import google_search
 
 from google.genai import types
 
+from .accounting import after_model_callback
+from .accounting import before_model_callback as accounting_callback
 from .callbacks import before_model_callback
 from .config import GEMINI_SAFETY_CONFIGURATIONS
+from .config import ROOT_AGENT_MAX_TOKENS, ROOT_AGENT_MODEL, ROOT_AGENT_SEED
+from .config import ROOT_AGENT_TEMPERATURE, ROOT_AGENT_THINKING_BUDGET
+from .config import WEB_SEARCH_AGENT_MODEL
+from .models import RecipeGemini
 from .prompts import GLOBAL_INSTRUCTIONS
 from .prompts import ROOT_AGENT_INSTRUCTION, ROOT_AGENT_DESCRIPTION
 from .prompts import WEB_SEARCH_AGENT_DESCRIPTION, WEB_SEARCH_AGENT_INSTRUCTION
-from .tools import generate_recipe_document
+from .config import SEARCH_BATCH_MAX_CONCURRENCY, SEARCH_BATCH_MAX_QUERIES
+from .config import SEARCH_BATCH_TIMEOUT_SECONDS
+from .search import BatchWebSearchTool, CachedAgentTool
+from .tools import generate_cookbook_document, generate_recipe_document
+from .tools import get_document_status, reload_artifacts
 
 
-load_dotenv()
 warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
 logger = logging.getLogger(__name__)
 
 
 web_search_agent = LlmAgent(
     name="web_search_agent",
-    model=Gemini(
-        model=os.getenv("WEB_SEARCH_AGENT_MODEL"),
+    model=RecipeGemini(
+        model=WEB_SEARCH_AGENT_MODEL,
         use_interactions_api=False,
-        retry_options=types.HttpRetryOptions(initial_delay=1, attempts=2),
     ),
     description=WEB_SEARCH_AGENT_DESCRIPTION,
     instruction=WEB_SEARCH_AGENT_INSTRUCTION,
-    tools=[google_search]
+    tools=[google_search],
+    before_model_callback=accounting_callback,
+    after_model_callback=after_model_callback,
+)
+
+web_search_tool = CachedAgentTool(agent=web_search_agent)
+
+batch_web_search_tool = BatchWebSearchTool(
+    web_search_tool,
+    max_concurrency=SEARCH_BATCH_MAX_CONCURRENCY,
+    timeout=SEARCH_BATCH_TIMEOUT_SECONDS,
+    max_queries=SEARCH_BATCH_MAX_QUERIES,
 )
 
 root_agent = LlmAgent(
     name="recipe_agent",
-    model=Gemini(
-        model=os.getenv("ROOT_AGENT_MODEL"),
+    model=RecipeGemini(
+        model=ROOT_AGENT_MODEL,
         use_interactions_api=False,
-        retry_options=types.HttpRetryOptions(initial_delay=1, attempts=2),
     ),
     description=ROOT_AGENT_DESCRIPTION,
     instruction=ROOT_AGENT_INSTRUCTION,
     include_contents="default",
     generate_content_config=types.GenerateContentConfig(
-        temperature=os.getenv("ROOT_AGENT_TEMPERATURE"),
-        max_output_tokens=os.getenv("ROOT_AGENT_MAX_TOKENS"),
-        seed=os.getenv("ROOT_AGENT_SEED"),
+        temperature=ROOT_AGENT_TEMPERATURE,
+        max_output_tokens=ROOT_AGENT_MAX_TOKENS,
+        seed=ROOT_AGENT_SEED,
         safety_settings=GEMINI_SAFETY_CONFIGURATIONS,
     ),
     disallow_transfer_to_peers=False,
@@ -57,13 +71,18 @@ root_agent = LlmAgent(
     planner=BuiltInPlanner(
         thinking_config=types.ThinkingConfig(
             include_thoughts=True,
-            thinking_budget=os.getenv("ROOT_AGENT_THINKING_BUDGET"),
+            thinking_budget=ROOT_AGENT_THINKING_BUDGET,
         )
     ),
     global_instruction=GLOBAL_INSTRUCTIONS,
     tools=[
-        AgentTool(agent=web_search_agent),
-        generate_recipe_document
+        web_search_tool,
+        batch_web_search_tool,
+        generate_recipe_document,
+        generate_cookbook_document,
+        get_document_status,
+        reload_artifacts,
     ],
     before_model_callback=before_model_callback,
+    after_model_callback=after_model_callback,
 )
@@ -0,0 +1,552 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.adk.artifacts.base_artifact_service import ArtifactVersion
+from google.adk.artifacts.base_artifact_service import BaseArtifactService
+from google.genai import types
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+# Session column value of user-scoped artifacts.
+_USER_SCOPE = ""
+
+
+def _scope(filename: str, session_id: Optional[str]) -> str:
+    if session_id is None or filename.startswith("user:"):
+        return _USER_SCOPE
+    return session_id
+
+
+def _read_blob(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class LocalArtifactService(BaseArtifactService):
+    """
+    Content-addressed artifact service for single-node deployments.
+
+    Payloads are stored once on disk under their SHA-256 digest, however
+    many sessions, users or versions save them. A SQLite table maps every
+    (app, user, session, filename, version) to a digest, and each blob counts
+    the versions that reference it, so deleting an artifact frees a blob
+    once no other version uses it.
+
+    When the blobs take more than `max_bytes`, the least recently used ones
+    are evicted. The versions that referenced them are kept but marked as
+    purged: loading one returns None and logs a warning, rather than falling
+    back to an older version, and an artifact whose latest version was
+    purged is no longer listed. Version numbers keep increasing past purged
+    versions, so a version number never names two different payloads.
+    `evictions` counts evicted blobs, so that callers caching artifact
+    listings can tell when a listing may be stale.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+
+        self.evictions = 0
+
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.join(self.root_dir, "blobs"), exist_ok=True)
+
+            connection = sqlite3.connect(
+                os.path.join(self.root_dir, "artifacts.sqlite3"),
+                check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    ref_count INTEGER NOT NULL,
+                    last_access_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS blobs_last_access_at
+                ON blobs (last_access_at)
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artifact_versions (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    mime_type TEXT,
+                    is_text INTEGER NOT NULL,
+                    custom_metadata TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    purged_at REAL,
+                    PRIMARY KEY (app_name, user_id, session_id, filename, version)
+                )
+                """
+            )
+            columns = {
+                name for (_, name, *_) in connection.execute(
+                    "PRAGMA table_info(artifact_versions)"
+                )
+            }
+            if "purged_at" not in columns:
+                # Stores created before evicted versions were kept.
+                connection.execute(
+                    "ALTER TABLE artifact_versions ADD COLUMN purged_at REAL"
+                )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS artifact_versions_digest
+                ON artifact_versions (digest)
+                """
+            )
+            connection.commit()
+            self._connection = connection
+
+        return self._connection
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root_dir, "blobs", digest[:2], digest)
+
+    def _write_blob(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove_blob(self, connection: sqlite3.Connection, digest: str) -> None:
+        connection.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _release(self, connection: sqlite3.Connection, digests: List[str]) -> None:
+        for digest in digests:
+            connection.execute(
+                "UPDATE blobs SET ref_count = ref_count - 1 WHERE digest = ?",
+                (digest,)
+            )
+
+        for (digest,) in connection.execute(
+            "SELECT digest FROM blobs WHERE ref_count <= 0"
+        ).fetchall():
+            self._remove_blob(connection, digest)
+
+    def _evict(self, connection: sqlite3.Connection, keep_digest: str) -> None:
+        total = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+        while total > self.max_bytes:
+            row = connection.execute(
+                "SELECT digest, size FROM blobs WHERE digest != ? "
+                "ORDER BY last_access_at LIMIT 1",
+                (keep_digest,)
+            ).fetchone()
+
+            if row is None:
+                break
+
+            digest, size = row
+            connection.execute(
+                "UPDATE artifact_versions SET purged_at = ? "
+                "WHERE digest = ? AND purged_at IS NULL",
+                (time.time(), digest)
+            )
+            self._remove_blob(connection, digest)
+
+            total -= size
+            self.evictions += 1
+            logger.info("Evicted artifact blob %s (%d bytes).", digest, size)
+
+    def _save(
+        self,
+        key: Tuple[str, str, str, str],
+        digest: str,
+        size: int,
+        place_blob: Callable[[str], None],
+        mime_type: str | None,
+        is_text: bool,
+        custom_metadata: Dict[str, Any],
+    ) -> int:
+        # `place_blob(path)` creates the blob file when it is not stored yet.
+        now = time.time()
+
+        with self._lock:
+            connection = self._connect()
+
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                place_blob(path)
+
+            # Purged versions count too, so numbers are never reused.
+            version = connection.execute(
+                "SELECT COALESCE(MAX(version) + 1, 0) FROM artifact_versions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ? "
+                "AND filename = ?",
+                key
+            ).fetchone()[0]
+
+            connection.execute(
+                "INSERT INTO blobs (digest, size, ref_count, last_access_at) "
+                "VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (digest) DO UPDATE SET "
+                "ref_count = ref_count + 1, last_access_at = excluded.last_access_at",
+                (digest, size, now)
+            )
+            connection.execute(
+                "INSERT INTO artifact_versions (app_name, user_id, session_id, "
+                "filename, version, digest, mime_type, is_text, "
+                "custom_metadata, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    *key, version, digest, mime_type, int(is_text),
+                    json.dumps(custom_metadata), now,
+                )
+            )
+
+            self._evict(connection, keep_digest=digest)
+            connection.commit()
+
+        return version
+
+    def _save_bytes(
+        self,
+        key: Tuple[str, str, str, str],
+        data: bytes,
+        mime_type: str | None,
+        is_text: bool,
+        custom_metadata: Dict[str, Any],
+    ) -> int:
+        return self._save(
+            key,
+            hashlib.sha256(data).hexdigest(),
+            len(data),
+            lambda path: self._write_blob(path, data),
+            mime_type,
+            is_text,
+            custom_metadata,
+        )
+
+    def _save_file(
+        self,
+        key: Tuple[str, str, str, str],
+        source_path: str,
+        mime_type: str | None,
+        custom_metadata: Dict[str, Any],
+    ) -> int:
+        with open(source_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        try:
+            return self._save(
+                key,
+                digest,
+                os.path.getsize(source_path),
+                lambda path: os.replace(source_path, path),
+                mime_type,
+                False,
+                custom_metadata,
+            )
+        finally:
+            # Left behind when the blob was already stored.
+            if os.path.exists(source_path):
+                os.remove(source_path)
+
+    def _version_rows(
+        self,
+        key: Tuple[str, str, str, str],
+        version: Optional[int] = None
+    ) -> List[Tuple]:
+        query = (
+            "SELECT version, digest, mime_type, is_text, custom_metadata, "
+            "created_at, purged_at FROM artifact_versions "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ? "
+            "AND filename = ?"
+        )
+        params = key
+
+        if version is not None:
+            query += " AND version = ?"
+            params = (*key, version)
+
+        with self._lock:
+            return self._connect().execute(
+                query + " ORDER BY version", params
+            ).fetchall()
+
+    def _load(
+        self,
+        key: Tuple[str, str, str, str],
+        version: Optional[int]
+    ) -> types.Part | None:
+        rows = self._version_rows(key, version)
+        if not rows:
+            return None
+
+        version, digest, mime_type, is_text, _, _, purged_at = rows[-1]
+
+        if purged_at is not None:
+            logger.warning(
+                "Artifact %s version %d was evicted from the store.",
+                key[3],
+                version,
+            )
+            return None
+
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "UPDATE blobs SET last_access_at = ? WHERE digest = ?",
+                (time.time(), digest)
+            )
+            connection.commit()
+
+        try:
+            data = _read_blob(self._blob_path(digest))
+        except FileNotFoundError:
+            # Evicted between the lookup and the read.
+            return None
+
+        if is_text:
+            return types.Part(text=data.decode("utf-8"))
+        return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+    def _delete(self, key: Tuple[str, str, str, str]) -> None:
+        with self._lock:
+            connection = self._connect()
+            digests = [
+                digest for (digest,) in connection.execute(
+                    "SELECT digest FROM artifact_versions "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ? "
+                    "AND filename = ? AND purged_at IS NULL",
+                    key
+                ).fetchall()
+            ]
+            connection.execute(
+                "DELETE FROM artifact_versions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ? "
+                "AND filename = ?",
+                key
+            )
+            self._release(connection, digests)
+            connection.commit()
+
+    def _list_keys(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: Optional[str]
+    ) -> List[str]:
+        scopes = {_USER_SCOPE, session_id or _USER_SCOPE}
+
+        # Only artifacts whose latest version can still be loaded.
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT filename FROM artifact_versions "
+                "WHERE app_name = ? AND user_id = ? "
+                f"AND session_id IN ({', '.join('?' * len(scopes))}) "
+                "GROUP BY session_id, filename "
+                "HAVING MAX(version) = MAX(CASE WHEN purged_at IS NULL "
+                "THEN version END)",
+                (app_name, user_id, *scopes)
+            ).fetchall()
+
+        return sorted(filename for (filename,) in rows)
+
+    def _to_artifact_version(self, row: Tuple) -> ArtifactVersion:
+        version, digest, mime_type, _, custom_metadata, created_at, _ = row
+
+        return ArtifactVersion(
+            version=version,
+            canonical_uri=f"file://{os.path.abspath(self._blob_path(digest))}",
+            custom_metadata=json.loads(custom_metadata),
+            create_time=created_at,
+            mime_type=mime_type,
+        )
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: types.Part,
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[dict[str, Any]] = None,
+    ) -> int:
+        if artifact.inline_data is not None:
+            data = artifact.inline_data.data or b""
+            mime_type = artifact.inline_data.mime_type
+            is_text = False
+
+        elif artifact.text is not None:
+            data = artifact.text.encode("utf-8")
+            mime_type = "text/plain"
+            is_text = True
+
+        else:
+            raise ValueError(
+                "LocalArtifactService only stores inline_data and text artifacts."
+            )
+
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+
+        return await asyncio.to_thread(
+            self._save_bytes, key, data, mime_type, is_text, custom_metadata or {}
+        )
+
+    def spool_path(self) -> str:
+        """
+        Returns a new, empty file for `save_artifact_file`. It lives on the
+        same filesystem as the blobs, so saving it is a rename.
+        """
+        spool_dir = os.path.join(self.root_dir, "spool")
+        os.makedirs(spool_dir, exist_ok=True)
+
+        fd, path = tempfile.mkstemp(dir=spool_dir, suffix=".tmp")
+        os.close(fd)
+        return path
+
+    async def save_artifact_file(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        path: str,
+        mime_type: str,
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[dict[str, Any]] = None,
+    ) -> int:
+        """
+        Saves the file at `path` as an artifact without reading it into
+        memory. The file is moved into the store, or removed if its content
+        is already stored, so `path` no longer exists afterwards.
+        """
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+
+        return await asyncio.to_thread(
+            self._save_file, key, path, mime_type, custom_metadata or {}
+        )
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+        return await asyncio.to_thread(self._load, key, version)
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> list[str]:
+        return await asyncio.to_thread(
+            self._list_keys, app_name, user_id, session_id
+        )
+
+    async def delete_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> None:
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+        await asyncio.to_thread(self._delete, key)
+
+    async def list_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> list[int]:
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+        rows = await asyncio.to_thread(self._version_rows, key)
+
+        return [row[0] for row in rows if row[6] is None]
+
+    async def list_artifact_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> list[ArtifactVersion]:
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+        rows = await asyncio.to_thread(self._version_rows, key)
+
+        return [self._to_artifact_version(row) for row in rows if row[6] is None]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[ArtifactVersion]:
+        key = (app_name, user_id, _scope(filename, session_id), filename)
+        rows = await asyncio.to_thread(self._version_rows, key, version)
+
+        if not rows or rows[-1][6] is not None:
+            return None
+        return self._to_artifact_version(rows[-1])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            connection = self._connect()
+            blobs, stored_bytes = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            versions, logical_bytes = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(blobs.size), 0) "
+                "FROM artifact_versions JOIN blobs USING (digest) "
+                "WHERE purged_at IS NULL"
+            ).fetchone()
+
+        return {
+            "blobs": blobs,
+            "stored_bytes": stored_bytes,
+            "versions": versions,
+            "logical_bytes": logical_bytes,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,219 @@
+import logging
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Set
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai.types import Part
+
+from .config import ARTIFACT_INDEX_MAX_SESSIONS
+from .session_cache import SessionCache
+from .tracing import set_attributes, span
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ArtifactIndex:
+    # None until the first lookup lists the session's artifacts.
+    filenames: Set[str] | None = None
+    # The artifact service's eviction count when `filenames` was listed.
+    evictions: int = 0
+
+
+_artifact_indexes = SessionCache(
+    _ArtifactIndex,
+    max_sessions=ARTIFACT_INDEX_MAX_SESSIONS
+)
+
+
+async def artifact_exists(
+    callback_context: CallbackContext,
+    filename: str
+) -> bool:
+    index = _artifact_indexes.get(callback_context)
+
+    # Services that evict artifacts on their own (see `LocalArtifactService`)
+    # count the evictions; any new one may have removed a listed artifact.
+    service = callback_context._invocation_context.artifact_service
+    evictions = getattr(service, "evictions", 0)
+
+    if index.filenames is None or index.evictions != evictions:
+        with span("artifact.list") as current_span:
+            index.filenames = set(await callback_context.list_artifacts())
+            index.evictions = evictions
+            set_attributes(current_span, artifact_count=len(index.filenames))
+
+    return filename in index.filenames
+
+
+async def load_artifact(
+    callback_context: CallbackContext,
+    filename: str
+) -> Part | None:
+    from .render_jobs import get_render_job
+
+    # A document still being rendered in the background is loaded once it
+    # is ready; a failed render reads as a missing artifact.
+    await get_render_job(callback_context, filename, timeout=None)
+
+    with span("artifact.load", filename=filename) as current_span:
+        artifact = await callback_context.load_artifact(filename=filename)
+
+        set_attributes(
+            current_span,
+            found=artifact is not None,
+            bytes=_artifact_size(artifact),
+        )
+
+    return artifact
+
+
+async def save_artifact(
+    callback_context: CallbackContext,
+    filename: str,
+    artifact: Part
+) -> int:
+    with span(
+        "artifact.save",
+        filename=filename,
+        bytes=_artifact_size(artifact)
+    ) as current_span:
+        version = await callback_context.save_artifact(
+            filename=filename,
+            artifact=artifact
+        )
+        set_attributes(current_span, version=version)
+
+    index = _artifact_indexes.get(callback_context)
+    if index.filenames is not None:
+        index.filenames.add(filename)
+
+    return version
+
+
+class SessionArtifacts:
+    """
+    Saves artifacts into one session straight through the artifact service.
+
+    The service and the session's IDs are captured when it is created, so it
+    stays usable after the tool call that created it has returned, which a
+    `ToolContext` does not: anything it records on its event after that is
+    never persisted. Saved versions are collected in `saved`, and deleted
+    artifacts in `deleted`, for `record_saved_artifacts` to report on the
+    event of a live tool call.
+    """
+
+    def __init__(self, callback_context: CallbackContext):
+        invocation_context = callback_context._invocation_context
+
+        self.artifact_service = invocation_context.artifact_service
+        self.app_name = invocation_context.app_name
+        self.user_id = invocation_context.user_id
+        self.session_id = invocation_context.session.id
+        self.saved: Dict[str, int] = {}
+        self.deleted: Set[str] = set()
+
+    def _key(self) -> Dict[str, Any]:
+        return {
+            "app_name": self.app_name,
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+        }
+
+    async def load(self, filename: str) -> Part | None:
+        with span("artifact.load", filename=filename) as current_span:
+            artifact = await self.artifact_service.load_artifact(
+                filename=filename,
+                **self._key()
+            )
+            set_attributes(
+                current_span,
+                found=artifact is not None,
+                bytes=_artifact_size(artifact),
+            )
+
+        return artifact
+
+    async def save(self, filename: str, artifact: Part) -> int:
+        with span(
+            "artifact.save",
+            filename=filename,
+            bytes=_artifact_size(artifact)
+        ) as current_span:
+            version = await self.artifact_service.save_artifact(
+                filename=filename,
+                artifact=artifact,
+                **self._key()
+            )
+            set_attributes(current_span, version=version)
+
+        self.saved[filename] = version
+        return version
+
+    async def delete(self, filename: str) -> None:
+        with span("artifact.delete", filename=filename):
+            await self.artifact_service.delete_artifact(
+                filename=filename,
+                **self._key()
+            )
+
+        self.saved.pop(filename, None)
+        self.deleted.add(filename)
+
+    def spool_path(self) -> str | None:
+        """
+        Returns a new file to write an artifact into for `save_file`, or None
+        when the artifact service only accepts in-memory parts.
+        """
+        spool_path = getattr(self.artifact_service, "spool_path", None)
+
+        return spool_path() if spool_path is not None else None
+
+    async def save_file(self, filename: str, path: str, mime_type: str) -> int:
+        """
+        Saves the file at `path`, obtained from `spool_path`, as an artifact
+        without reading it into memory.
+        """
+        with span(
+            "artifact.save",
+            filename=filename,
+            bytes=os.path.getsize(path),
+            streamed=True
+        ) as current_span:
+            version = await self.artifact_service.save_artifact_file(
+                filename=filename,
+                path=path,
+                mime_type=mime_type,
+                **self._key()
+            )
+            set_attributes(current_span, version=version)
+
+        self.saved[filename] = version
+        return version
+
+
+def record_saved_artifacts(
+    callback_context: CallbackContext,
+    saved: Dict[str, int],
+    deleted: Iterable[str] = ()
+) -> None:
+    """
+    Reports artifacts saved through `SessionArtifacts` on the current event,
+    as `CallbackContext.save_artifact` does for its own saves, and forgets
+    the ones it deleted.
+    """
+    callback_context._event_actions.artifact_delta.update(saved)
+
+    index = _artifact_indexes.get(callback_context)
+    if index.filenames is not None:
+        index.filenames.difference_update(deleted)
+        index.filenames.update(saved)
+
+
+def _artifact_size(artifact: Part | None) -> int:
+    if artifact is not None and artifact.inline_data and artifact.inline_data.data:
+        return len(artifact.inline_data.data)
+    return 0
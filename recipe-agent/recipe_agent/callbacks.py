@@ -2,22 +2,95 @@ import os
 import hashlib
 import logging
 import warnings
-from dotenv import load_dotenv
-from typing import List
+from dataclasses import dataclass, field
+from typing import Hashable, List
 
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmResponse, LlmRequest
-from google.genai.types import Part
+from google.genai.types import Content, Part
+
+from .accounting import apply_budget, record_request
+from .artifacts import artifact_exists, load_artifact, save_artifact
+from .compaction import Attachment, CompactionPolicy
+from .compaction import flatten_items, select_inline_attachments
+from .config import CALLBACK_CACHE_MAX_SESSIONS
+from .config import PDF_CONTEXT_MODE, PDF_DIGEST_THUMBNAIL
+from .digest import digest_artifact_id, thumbnail_artifact_id
+from .image_dedup import DEFAULT_IMAGE_DEDUP_POLICY, find_duplicate
+from .image_dedup import image_fingerprint, remember_image
+from .image_normalization import normalize_image_part
+from .routing import is_user_turn, route_request
+from .session_cache import SessionCache
+from .tracing import measure_contents, set_attributes, span
 
-load_dotenv()
 warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _ProcessedContent:
+    fingerprint: Hashable
+    parts: List[Part | Attachment]
+
+
+@dataclass
+class _SessionHistory:
+    # Rewritten contents, index-aligned with `llm_request.contents`. Its
+    # length is the watermark up to which the history has been processed.
+    contents: List[_ProcessedContent] = field(default_factory=list)
+
+
+_session_histories = SessionCache(
+    _SessionHistory,
+    max_sessions=CALLBACK_CACHE_MAX_SESSIONS
+)
+
+
+def _part_fingerprint(part: Part) -> Hashable:
+    # Identity of a part, used to recognise history that was already
+    # processed. Photos from the same camera share their headers, so inline
+    # payloads are hashed in full; SHA-256 takes about a millisecond per MB.
+    if part.inline_data:
+        return (
+            "inline_data",
+            part.inline_data.mime_type,
+            part.inline_data.display_name,
+            hashlib.sha256(part.inline_data.data or b"").digest(),
+        )
+
+    if part.function_response:
+        return (
+            "function_response",
+            part.function_response.id,
+            part.function_response.name,
+            hash(repr(part.function_response.response)),
+        )
+
+    if part.function_call:
+        return (
+            "function_call",
+            part.function_call.id,
+            part.function_call.name,
+            hash(repr(part.function_call.args)),
+        )
+
+    if part.text is not None:
+        return ("text", part.thought, hash(part.text))
+
+    return ("other", hash(part.model_dump_json(exclude_none=True)))
+
+
+def _content_fingerprint(content: Content) -> Hashable:
+    return (
+        content.role,
+        tuple(_part_fingerprint(part) for part in content.parts),
+    )
+
+
 async def _process_inline_data_part(
     part: Part,
     callback_context: CallbackContext
-) -> List[Part]:
+) -> List[Part | Attachment]:
     filename = part.inline_data.display_name or "uploaded_image"
     image_data = part.inline_data.data
 
@@ -27,12 +100,43 @@ async def _process_inline_data_part(
     mime_type = part.inline_data.mime_type
     extension = mime_type.split("/")[-1]
 
-    artifact_id = f"user_uploaded_img_{content_hash}.{extension}"
+    dedup_policy = DEFAULT_IMAGE_DEDUP_POLICY
+    artifact_id = (
+        f"{dedup_policy.artifact_prefix}"
+        f"user_uploaded_img_{content_hash}.{extension}"
+    )
+
+    if not await artifact_exists(callback_context, artifact_id):
+        fingerprint = None
+        duplicate_id = None
 
-    if artifact_id not in await callback_context.list_artifacts():
-        await callback_context.save_artifact(
-            filename=artifact_id,
-            artifact=part
+        if dedup_policy.enabled:
+            fingerprint = await image_fingerprint(image_data)
+
+        if fingerprint is not None:
+            duplicate_id = find_duplicate(callback_context, fingerprint)
+
+        if duplicate_id and await artifact_exists(callback_context, duplicate_id):
+            # The same picture under another name or encoding. Reusing its
+            # artifact ID lets compaction keep a single copy inline.
+            artifact_id = duplicate_id
+
+        else:
+            await save_artifact(
+                callback_context,
+                filename=artifact_id,
+                artifact=part
+            )
+
+            if fingerprint is not None:
+                remember_image(callback_context, artifact_id, fingerprint)
+
+    if artifact_id not in callback_context.state.get("artifact_descriptions", {}):
+        _describe_artifact(
+            callback_context,
+            artifact_id,
+            f"Image uploaded by the user ({mime_type}, "
+            f"{len(image_data) // 1024} KB)."
         )
 
     artifact_description = f"""
@@ -40,58 +144,282 @@ async def _process_inline_data_part(
     Below is the content of artifact ID : {artifact_id}
     """
 
-    return [Part(text=artifact_description), part]
+    # The artifact keeps the original for the PDF renderer; the model gets
+    # the downscaled variant.
+    return [
+        Attachment(
+            artifact_id,
+            Part(text=artifact_description),
+            await normalize_image_part(part)
+        )
+    ]
+
+
+async def _attachment_payload(artifact: Part) -> Part:
+    # HTML, Markdown and JSON documents go to the model as plain text.
+    mime_type = artifact.inline_data.mime_type if artifact.inline_data else None
+
+    if mime_type and (mime_type.startswith("text/") or mime_type.endswith("json")):
+        return Part(text=artifact.inline_data.data.decode("utf-8"))
+
+    return await normalize_image_part(artifact)
 
 
 async def _process_function_response_part(
     part: Part, 
     callback_context: CallbackContext
-) -> List[Part]:
+) -> List[Part | Attachment]:
     function_response_part = part.function_response.response
-    artifact_id = function_response_part.get("tool_response_artifact_id")
+    artifact_id = (
+        function_response_part.get("generated_file_artifact_id")
+        or function_response_part.get("tool_response_artifact_id")
+    )
 
-    if not artifact_id:
+    # Deferred renders are attached once `get_document_status` reports them
+    # ready, so that this turn does not wait for them.
+    if not artifact_id or function_response_part.get("status") == "pending":
         return [part]
 
-    artifact = await callback_context.load_artifact(filename=artifact_id)
+    if PDF_CONTEXT_MODE == "digest":
+        return await _process_document_digest(
+            part,
+            artifact_id,
+            callback_context
+        )
+
+    artifact = await load_artifact(callback_context, artifact_id)
+
+    if artifact is None:
+        return [part]
 
     artifact_description = f"""
     [Tool Response Artifact]
     Below is the content of artifact ID : {artifact_id}
     """
 
-    return [part, Part(text=artifact_description), artifact]
+    return [
+        part,
+        Attachment(
+            artifact_id,
+            Part(text=artifact_description),
+            await _attachment_payload(artifact)
+        )
+    ]
+
+
+async def _process_document_digest(
+    part: Part,
+    artifact_id: str,
+    callback_context: CallbackContext
+) -> List[Part | Attachment]:
+    digest = await load_artifact(
+        callback_context,
+        digest_artifact_id(artifact_id)
+    )
+
+    if digest is None or not digest.inline_data:
+        return [part]
+
+    artifact_description = f"""
+    [Tool Response Artifact Digest]
+    Below is a digest of artifact ID : {artifact_id}
+    Call `reload_artifacts` with this artifact ID if you need the full document.
+    """
+
+    processed_parts = [
+        part,
+        Part(text=artifact_description),
+        Part(text=digest.inline_data.data.decode("utf-8")),
+    ]
+
+    if PDF_DIGEST_THUMBNAIL:
+        thumbnail_id = thumbnail_artifact_id(artifact_id)
+        thumbnail = await load_artifact(callback_context, thumbnail_id)
+
+        if thumbnail is not None:
+            thumbnail_description = f"""
+            [Tool Response Artifact Thumbnail]
+            Below is a low resolution preview of artifact ID : {artifact_id}
+            """
+            processed_parts.append(
+                Attachment(
+                    thumbnail_id,
+                    Part(text=thumbnail_description),
+                    thumbnail
+                )
+            )
+
+    return processed_parts
+
+
+async def _process_reload_response_part(
+    part: Part,
+    callback_context: CallbackContext
+) -> List[Part | Attachment]:
+    function_response_part = part.function_response.response
+    processed_parts = [part]
+
+    for artifact_id in function_response_part.get("reloaded_artifact_ids", []):
+        artifact = await load_artifact(callback_context, artifact_id)
+
+        if artifact is None:
+            continue
+
+        artifact_description = f"""
+        [Reloaded Artifact]
+        Below is the content of artifact ID : {artifact_id}
+        """
+
+        processed_parts.append(
+            Attachment(
+                artifact_id,
+                Part(text=artifact_description),
+                await _attachment_payload(artifact)
+            )
+        )
+
+    return processed_parts
+
+
+def _describe_artifact(
+    callback_context: CallbackContext,
+    artifact_id: str,
+    description: str
+) -> None:
+    descriptions = callback_context.state.get("artifact_descriptions", {})
+
+    callback_context.state["artifact_descriptions"] = {
+        **descriptions,
+        artifact_id: description,
+    }
+
+
+_FUNCTION_RESPONSE_PROCESSORS = {
+    "generate_recipe_document": _process_function_response_part,
+    "generate_cookbook_document": _process_function_response_part,
+    "get_document_status": _process_function_response_part,
+    "reload_artifacts": _process_reload_response_part,
+}
+
+
+async def _process_part(
+    part: Part,
+    callback_context: CallbackContext
+) -> List[Part | Attachment]:
+    if part.inline_data:
+        processor = _process_inline_data_part
+
+    elif part.function_response:
+        processor = _FUNCTION_RESPONSE_PROCESSORS.get(
+            part.function_response.name
+        )
+
+    else:
+        processor = None
+
+    if processor is None:
+        return [part]
+
+    with span(
+        f"callback.{processor.__name__.lstrip('_')}",
+        input_bytes=len(part.inline_data.data or b"") if part.inline_data else 0,
+    ) as current_span:
+        processed_parts = await processor(part, callback_context)
+
+        set_attributes(
+            current_span,
+            output_parts=len(processed_parts),
+            attachments=sum(
+                isinstance(item, Attachment) for item in processed_parts
+            ),
+        )
+
+    return processed_parts
 
 
 async def before_model_callback(
     llm_request: LlmRequest,
     callback_context: CallbackContext
 ) -> LlmResponse | None:
-    for content in llm_request.contents:
+    with span(
+        "callback.before_model",
+        agent=callback_context.agent_name,
+        contents=len(llm_request.contents),
+    ) as current_span:
+        phase = route_request(llm_request, callback_context)
+        set_attributes(current_span, phase=phase)
+
+        budget_result = apply_budget(llm_request, callback_context)
+
+        if isinstance(budget_result, LlmResponse):
+            set_attributes(current_span, over_limit=True)
+            return budget_result
+
+        await _rewrite_history(llm_request, callback_context, budget_result)
+
+        inline_bytes, text_bytes = measure_contents(llm_request.contents)
+        record_request(callback_context, inline_bytes, text_bytes)
+
+        set_attributes(
+            current_span,
+            model=llm_request.model,
+            inline_bytes=inline_bytes,
+            text_bytes=text_bytes,
+        )
+
+
+async def _rewrite_history(
+    llm_request: LlmRequest,
+    callback_context: CallbackContext,
+    compaction_policy: CompactionPolicy
+) -> None:
+    history = _session_histories.get(callback_context)
+
+    user_turns = sum(
+        1 for content in llm_request.contents if is_user_turn(content)
+    )
+    processed_history = []
+
+    for content_idx, content in enumerate(llm_request.contents):
+        if is_user_turn(content):
+            user_turns -= 1
+
         if not content.parts: continue
 
-        modified_parts = []
-        for idx, part in enumerate(content.parts):
-            if part.inline_data:
-                processed_parts = await _process_inline_data_part(
-                    part,
-                    callback_context
+        fingerprint = _content_fingerprint(content)
+
+        if content_idx < len(history.contents):
+            processed_content = history.contents[content_idx]
+
+            if processed_content.fingerprint == fingerprint:
+                processed_history.append(
+                    (content, user_turns, processed_content.parts)
                 )
+                continue
+
+            # The history diverged (e.g. it was rewritten or rewound), so
+            # nothing past this point can be reused.
+            del history.contents[content_idx:]
+
+        modified_parts = []
+        for part in content.parts:
+            modified_parts.extend(await _process_part(part, callback_context))
+
+        processed_history.append((content, user_turns, modified_parts))
 
-            elif part.function_response:
-                if part.function_response.name in [
-                    "generate_recipe_document"
-                ]:
-                    processed_parts = await _process_function_response_part(
-                        part,
-                        callback_context
-                    )
-                else:
-                    processed_parts = [part]
+        while len(history.contents) < content_idx:
+            # Placeholders for empty contents, which are never reused.
+            history.contents.append(_ProcessedContent(None, []))
 
-            else:
-                processed_parts = [part]
+        history.contents.append(
+            _ProcessedContent(fingerprint, modified_parts)
+        )
 
-            modified_parts.extend(processed_parts)
+    keep = select_inline_attachments(
+        [(turn_age, items) for _, turn_age, items in processed_history],
+        compaction_policy
+    )
+    descriptions = callback_context.state.get("artifact_descriptions", {})
 
-        content.parts = modified_parts
+    for content, _, items in processed_history:
+        content.parts = flatten_items(items, keep, descriptions)
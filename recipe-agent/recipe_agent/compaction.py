@@ -0,0 +1,125 @@
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+from google.genai.types import Part
+
+from .config import COMPACTION_ENABLED, COMPACTION_KEEP_RECENT_TURNS
+from .config import COMPACTION_MAX_INLINE_BYTES
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Attachment:
+    """An artifact attached to the model input: a text header plus its payload."""
+
+    artifact_id: str
+    header: Part
+    payload: Part
+
+    @property
+    def size(self) -> int:
+        if self.payload.inline_data and self.payload.inline_data.data:
+            return len(self.payload.inline_data.data)
+        if self.payload.text:
+            return len(self.payload.text.encode("utf-8"))
+        return 0
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    enabled: bool = True
+    keep_recent_turns: int = 3
+    max_inline_bytes: int = 8 * 1024 * 1024
+
+
+DEFAULT_COMPACTION_POLICY = CompactionPolicy(
+    enabled=COMPACTION_ENABLED,
+    keep_recent_turns=COMPACTION_KEEP_RECENT_TURNS,
+    max_inline_bytes=COMPACTION_MAX_INLINE_BYTES,
+)
+
+
+def select_inline_attachments(
+    history: Sequence[Tuple[int, Sequence[object]]],
+    policy: CompactionPolicy,
+) -> Set[int]:
+    """
+    Decides which attachments keep their payload in the model input.
+
+    Args:
+        history (Sequence[Tuple[int, Sequence[object]]]): One entry per
+            content, oldest first, holding the content's turn age (0 for the
+            current user turn) and its processed parts and attachments.
+        policy (CompactionPolicy): The compaction policy to apply.
+
+    Returns:
+        Set[int]: The `id()` of every attachment to keep inline. Attachments
+        in the current turn are always kept; older ones are kept newest first
+        while they are within `keep_recent_turns` and the byte budget, and
+        only the most recent copy of a given artifact is kept.
+    """
+    keep = set()
+    kept_artifact_ids = set()
+    remaining_bytes = policy.max_inline_bytes
+
+    for turn_age, items in reversed(history):
+        for item in reversed(items):
+            if not isinstance(item, Attachment):
+                continue
+
+            if policy.enabled:
+                if item.artifact_id in kept_artifact_ids:
+                    continue
+
+                if turn_age > 0 and (
+                    turn_age >= policy.keep_recent_turns
+                    or item.size > remaining_bytes
+                ):
+                    continue
+
+            keep.add(id(item))
+            kept_artifact_ids.add(item.artifact_id)
+            remaining_bytes -= item.size
+
+    return keep
+
+
+def artifact_stub(artifact_id: str, description: str | None) -> Part:
+    artifact_description = f"""
+    [Artifact Reference]
+    Artifact ID : {artifact_id}
+    Summary : {description or "No description available."}
+    The content of this artifact was removed from the context to save space.
+    Call `reload_artifacts` with this artifact ID if you need to see it again.
+    """
+
+    return Part(text=artifact_description)
+
+
+def flatten_items(
+    items: Sequence[object],
+    keep: Set[int],
+    descriptions: Dict[str, str],
+) -> List[Part]:
+    parts = []
+
+    for item in items:
+        if not isinstance(item, Attachment):
+            parts.append(item)
+
+        elif id(item) in keep:
+            parts.extend([item.header, item.payload])
+
+        else:
+            parts.append(
+                artifact_stub(
+                    item.artifact_id,
+                    descriptions.get(item.artifact_id)
+                )
+            )
+
+    return parts
@@ -1,3 +1,4 @@
+import os
 import logging
 import warnings
 from dotenv import load_dotenv
@@ -9,6 +10,27 @@ warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
 logger = logging.getLogger(__name__)
 
 
+ROOT_AGENT_MODEL = os.getenv("ROOT_AGENT_MODEL")
+ROOT_AGENT_MAX_TOKENS = os.getenv("ROOT_AGENT_MAX_TOKENS")
+ROOT_AGENT_TEMPERATURE = os.getenv("ROOT_AGENT_TEMPERATURE")
+ROOT_AGENT_SEED = os.getenv("ROOT_AGENT_SEED")
+ROOT_AGENT_THINKING_BUDGET = os.getenv("ROOT_AGENT_THINKING_BUDGET")
+
+WEB_SEARCH_AGENT_MODEL = os.getenv("WEB_SEARCH_AGENT_MODEL")
+
+MODEL_BASE_URL = os.getenv("MODEL_BASE_URL", "")
+MODEL_MAX_CONNECTIONS = int(os.getenv("MODEL_MAX_CONNECTIONS", "64"))
+MODEL_KEEPALIVE_SECONDS = float(os.getenv("MODEL_KEEPALIVE_SECONDS", "30"))
+MODEL_TIMEOUT_SECONDS = float(os.getenv("MODEL_TIMEOUT_SECONDS", "0"))
+MODEL_CONCURRENCY_INITIAL = int(os.getenv("MODEL_CONCURRENCY_INITIAL", "8"))
+MODEL_CONCURRENCY_MIN = int(os.getenv("MODEL_CONCURRENCY_MIN", "1"))
+MODEL_CONCURRENCY_MAX = int(os.getenv("MODEL_CONCURRENCY_MAX", "64"))
+MODEL_LATENCY_TARGET_SECONDS = float(os.getenv("MODEL_LATENCY_TARGET_SECONDS", "10"))
+MODEL_MAX_ATTEMPTS = int(os.getenv("MODEL_MAX_ATTEMPTS", "4"))
+MODEL_BACKOFF_BASE_SECONDS = float(os.getenv("MODEL_BACKOFF_BASE_SECONDS", "1"))
+MODEL_BACKOFF_MAX_SECONDS = float(os.getenv("MODEL_BACKOFF_MAX_SECONDS", "20"))
+
+
 GEMINI_SAFETY_CONFIGURATIONS = [
     types.SafetySetting(
         category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
@@ -27,3 +49,84 @@ GEMINI_SAFETY_CONFIGURATIONS = [
         threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
     ),
 ]
+
+
+RENDER_EXECUTOR_KIND = os.getenv("RENDER_EXECUTOR_KIND", "process")
+RENDER_MAX_WORKERS = int(os.getenv("RENDER_MAX_WORKERS", "2"))
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", "8"))
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+RENDER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("RENDER_QUEUE_TIMEOUT_SECONDS", "60"))
+RENDER_PROCESS_START_METHOD = os.getenv("RENDER_PROCESS_START_METHOD", "spawn")
+RENDER_STREAM_TO_FILE = os.getenv("RENDER_STREAM_TO_FILE", "0") == "1"
+RENDER_DEFERRED = os.getenv("RENDER_DEFERRED", "0") == "1"
+
+PDF_IMAGE_DPI = int(os.getenv("PDF_IMAGE_DPI", "150"))
+PDF_IMAGE_JPEG_QUALITY = int(os.getenv("PDF_IMAGE_JPEG_QUALITY", "80"))
+PDF_DEFAULT_TEMPLATE = os.getenv("PDF_DEFAULT_TEMPLATE", "hero_side_image")
+
+DOCUMENT_DEFAULT_FORMAT = os.getenv("DOCUMENT_DEFAULT_FORMAT", "pdf")
+DOCUMENT_IMAGE_URL_TEMPLATE = os.getenv("DOCUMENT_IMAGE_URL_TEMPLATE", "{artifact_id}")
+
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "64"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "")
+RENDER_CACHE_DISK_MAX_BYTES = int(os.getenv("RENDER_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+CALLBACK_CACHE_MAX_SESSIONS = int(os.getenv("CALLBACK_CACHE_MAX_SESSIONS", "256"))
+ARTIFACT_INDEX_MAX_SESSIONS = int(os.getenv("ARTIFACT_INDEX_MAX_SESSIONS", "1024"))
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "1") == "1"
+COMPACTION_KEEP_RECENT_TURNS = int(os.getenv("COMPACTION_KEEP_RECENT_TURNS", "3"))
+COMPACTION_MAX_INLINE_BYTES = int(os.getenv("COMPACTION_MAX_INLINE_BYTES", str(8 * 1024 * 1024)))
+
+IMAGE_DEDUP_ENABLED = os.getenv("IMAGE_DEDUP_ENABLED", "0") == "1"
+IMAGE_DEDUP_SCOPE = os.getenv("IMAGE_DEDUP_SCOPE", "user")
+IMAGE_DEDUP_MAX_DISTANCE = int(os.getenv("IMAGE_DEDUP_MAX_DISTANCE", "6"))
+IMAGE_DEDUP_MAX_ENTRIES = int(os.getenv("IMAGE_DEDUP_MAX_ENTRIES", "256"))
+
+MODEL_IMAGE_NORMALIZE = os.getenv("MODEL_IMAGE_NORMALIZE", "1") == "1"
+MODEL_IMAGE_MAX_EDGE = int(os.getenv("MODEL_IMAGE_MAX_EDGE", "1536"))
+MODEL_IMAGE_FORMAT = os.getenv("MODEL_IMAGE_FORMAT", "jpeg")
+MODEL_IMAGE_QUALITY = int(os.getenv("MODEL_IMAGE_QUALITY", "85"))
+MODEL_IMAGE_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_IMAGE_CACHE_MAX_ENTRIES", "256"))
+
+PDF_CONTEXT_MODE = os.getenv("PDF_CONTEXT_MODE", "digest")
+PDF_DIGEST_THUMBNAIL = os.getenv("PDF_DIGEST_THUMBNAIL", "1") == "1"
+PDF_DIGEST_THUMBNAIL_MAX_EDGE = int(os.getenv("PDF_DIGEST_THUMBNAIL_MAX_EDGE", "256"))
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "1") == "1"
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".adk/search_cache.sqlite3")
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+SEARCH_BATCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_BATCH_MAX_CONCURRENCY", "3"))
+SEARCH_BATCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_BATCH_TIMEOUT_SECONDS", "45"))
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "5"))
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "")
+TRACE_FILE = os.getenv("TRACE_FILE", ".adk/traces.jsonl")
+
+USAGE_TOKEN_BUDGET = int(os.getenv("USAGE_TOKEN_BUDGET", "0"))
+USAGE_INLINE_BYTES_BUDGET = int(os.getenv("USAGE_INLINE_BYTES_BUDGET", "0"))
+USAGE_TOKEN_LIMIT = int(os.getenv("USAGE_TOKEN_LIMIT", "0"))
+BUDGET_FALLBACK_MODEL = os.getenv("BUDGET_FALLBACK_MODEL", "")
+BUDGET_COMPACTION_KEEP_RECENT_TURNS = int(os.getenv("BUDGET_COMPACTION_KEEP_RECENT_TURNS", "1"))
+BUDGET_COMPACTION_MAX_INLINE_BYTES = int(os.getenv("BUDGET_COMPACTION_MAX_INLINE_BYTES", str(1024 * 1024)))
+
+CONTEXT_CACHE_ENABLED = os.getenv("CONTEXT_CACHE_ENABLED", "1") == "1"
+CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "3600"))
+CONTEXT_CACHE_REFRESH_SECONDS = float(os.getenv("CONTEXT_CACHE_REFRESH_SECONDS", "300"))
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("CONTEXT_CACHE_MAX_ENTRIES", "16"))
+
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+ROUTER_FAST_MODEL = os.getenv("ROUTER_FAST_MODEL", "")
+ROUTER_FAST_THINKING_BUDGET = (
+    int(os.environ["ROUTER_FAST_THINKING_BUDGET"])
+    if os.getenv("ROUTER_FAST_THINKING_BUDGET") else None
+)
+ROUTER_MAX_CLARIFICATION_TURNS = int(os.getenv("ROUTER_MAX_CLARIFICATION_TURNS", "4"))
+ROUTER_MAX_CLARIFICATION_CHARS = int(os.getenv("ROUTER_MAX_CLARIFICATION_CHARS", "400"))
+
+COOKBOOK_MAX_RECIPES = int(os.getenv("COOKBOOK_MAX_RECIPES", "14"))
@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import warnings
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from .config import CONTEXT_CACHE_MAX_ENTRIES, CONTEXT_CACHE_MIN_TOKENS
+from .config import CONTEXT_CACHE_REFRESH_SECONDS, CONTEXT_CACHE_TTL_SECONDS
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+# Requests that use a cached content must not repeat what the cache holds.
+_CACHED_CONFIG_FIELDS = ("system_instruction", "tools", "tool_config")
+
+
+@dataclass
+class _CacheEntry:
+    # None marks a prefix that could not be cached, so it is not retried
+    # until `expires_at`.
+    name: str | None
+    expires_at: float
+
+
+def _prefix_key(model: str, config: types.GenerateContentConfig) -> str:
+    prefix = {
+        "model": model,
+        "system_instruction": _dump(config.system_instruction),
+        "tools": [_dump(tool) for tool in config.tools or []],
+        "tool_config": _dump(config.tool_config),
+    }
+    encoded = json.dumps(prefix, sort_keys=True, default=str).encode("utf-8")
+
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _prefix_slot(model: str, config: types.GenerateContentConfig) -> Tuple[str, ...]:
+    # Identifies the agent a prefix belongs to without its prompt text, so a
+    # changed prompt can be recognised as replacing an earlier one.
+    tool_names = []
+    for tool in config.tools or []:
+        if getattr(tool, "function_declarations", None):
+            tool_names.extend(f.name for f in tool.function_declarations)
+        else:
+            # Built-in tools such as google_search are named by their field.
+            tool_names.extend(_dump(tool))
+
+    return (model, *sorted(tool_names))
+
+
+def _dump(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def _estimate_tokens(config: types.GenerateContentConfig) -> int:
+    instruction = config.system_instruction
+
+    if isinstance(instruction, types.Content):
+        text = "".join(part.text or "" for part in instruction.parts or [])
+    else:
+        text = str(instruction or "")
+
+    return len(text) // 4
+
+
+class ContextCacheManager:
+    """
+    Serves each agent's static request prefix from Gemini context caching.
+
+    The prefix is the system instruction together with the tool declarations
+    and tool config, since a request that uses a cached content may not set
+    any of them. Cached contents are keyed on the model name and a hash of
+    the prefix, so a changed prompt simply maps to a new cache. The cache it
+    replaces (same model and tools) is forgotten right away, and the least
+    recently used ones once more than `max_entries` prefixes are in use;
+    forgotten caches are not deleted, since requests still in flight may be
+    using them, but left to expire with their TTL. Caches are created with a
+    `ttl_seconds` lifetime and renewed when a request arrives within
+    `refresh_seconds` of their expiry.
+
+    Creating or renewing a cache only holds a lock for its own prefix key.
+    Requests for other prefixes never wait on it, and requests for the same
+    prefix keep using the current cache while it is being renewed.
+
+    `client` is anything exposing the `google.genai.Client.aio.caches`
+    interface, which makes the manager easy to exercise against a stub.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl_seconds: float = 3600,
+        refresh_seconds: float = 300,
+        min_tokens: int = 1024,
+        max_entries: int = 16,
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._slots: Dict[Tuple[str, ...], str] = {}
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+
+    async def apply(self, llm_request: LlmRequest) -> Tuple[str, Dict[str, Any]] | None:
+        """
+        Points `llm_request` at the cached content for its prefix.
+
+        Returns None when the request is left untouched. Otherwise strips the
+        cached fields from the request config and returns the prefix key with
+        their original values, for `restore` to undo the change.
+        """
+        config = llm_request.config
+        model = llm_request.model
+
+        if (
+            config is None
+            or not model
+            or config.cached_content
+            or llm_request.cache_config
+            or _estimate_tokens(config) < self.min_tokens
+        ):
+            return None
+
+        key = _prefix_key(model, config)
+        name = await self._get_cache_name(key, model, config)
+
+        if name is None:
+            return None
+
+        original = {field: getattr(config, field) for field in _CACHED_CONFIG_FIELDS}
+
+        for field in _CACHED_CONFIG_FIELDS:
+            setattr(config, field, None)
+        config.cached_content = name
+
+        return key, original
+
+    def restore(
+        self,
+        llm_request: LlmRequest,
+        applied: Tuple[str, Dict[str, Any]]
+    ) -> None:
+        """Undoes `apply` and forgets the cached content it used."""
+        key, original = applied
+
+        for field, value in original.items():
+            setattr(llm_request.config, field, value)
+        llm_request.config.cached_content = None
+
+        self._entries.pop(key, None)
+
+    async def _get_cache_name(
+        self,
+        key: str,
+        model: str,
+        config: types.GenerateContentConfig
+    ) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at - time.time() > self.refresh_seconds:
+            self._entries.move_to_end(key)
+            return entry.name
+
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+
+        if (
+            lock.locked()
+            and entry is not None
+            and entry.name is not None
+            and entry.expires_at > time.time()
+        ):
+            # Another request is renewing this cache, which is still valid.
+            return entry.name
+
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at - time.time() > self.refresh_seconds:
+                self._entries.move_to_end(key)
+                return entry.name
+
+            if entry is not None and entry.name is not None:
+                entry = await self._renew(entry)
+
+            if entry is None or entry.name is None:
+                entry = await self._create(key, model, config)
+
+            self._store(key, model, config, entry)
+            return entry.name
+
+    def _store(
+        self,
+        key: str,
+        model: str,
+        config: types.GenerateContentConfig,
+        entry: _CacheEntry
+    ) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        slot = _prefix_slot(model, config)
+        replaced_key = self._slots.get(slot)
+        self._slots[slot] = key
+
+        if replaced_key is not None and replaced_key != key:
+            self._entries.pop(replaced_key, None)
+
+        self._evict()
+
+    async def _create(
+        self,
+        key: str,
+        model: str,
+        config: types.GenerateContentConfig
+    ) -> _CacheEntry:
+        try:
+            cached_content = await self.client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"recipe_agent_{key[:16]}",
+                    system_instruction=config.system_instruction,
+                    tools=config.tools,
+                    tool_config=config.tool_config,
+                    ttl=f"{int(self.ttl_seconds)}s",
+                ),
+            )
+
+        except Exception as e:
+            # Typically a prefix below the model's minimum cacheable size.
+            # Requests go out uncached until the negative entry expires.
+            logger.warning("Failed to create context cache for %s: %s", model, e)
+            return _CacheEntry(None, time.time() + self.ttl_seconds)
+
+        logger.info("Created context cache %s for %s.", cached_content.name, model)
+        return _CacheEntry(cached_content.name, self._expiry(cached_content))
+
+    async def _renew(self, entry: _CacheEntry) -> _CacheEntry | None:
+        try:
+            cached_content = await self.client.aio.caches.update(
+                name=entry.name,
+                config=types.UpdateCachedContentConfig(
+                    ttl=f"{int(self.ttl_seconds)}s"
+                ),
+            )
+
+        except Exception as e:
+            logger.info("Failed to renew context cache %s: %s", entry.name, e)
+            return None
+
+        return _CacheEntry(entry.name, self._expiry(cached_content))
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        for key in list(self._key_locks):
+            if key not in self._entries and not self._key_locks[key].locked():
+                del self._key_locks[key]
+
+    async def _delete(self, entry: _CacheEntry) -> None:
+        if entry.name is None:
+            return
+
+        try:
+            await self.client.aio.caches.delete(name=entry.name)
+        except Exception as e:
+            logger.info("Failed to delete context cache %s: %s", entry.name, e)
+
+    def _expiry(self, cached_content: types.CachedContent) -> float:
+        if cached_content.expire_time is not None:
+            return cached_content.expire_time.timestamp()
+        return time.time() + self.ttl_seconds
+
+    async def close(self) -> None:
+        """Deletes every cached content this manager still serves."""
+        while self._entries:
+            _, entry = self._entries.popitem()
+            await self._delete(entry)
+
+
+_context_cache_managers: "weakref.WeakKeyDictionary[Any, ContextCacheManager]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_context_cache_manager(client: Any) -> ContextCacheManager:
+    """
+    Returns the manager for `client`, creating it on first use.
+
+    The manager only holds a weak proxy to its client, so both are dropped
+    once the client goes away, e.g. with the event loop it was created for.
+    """
+    manager = _context_cache_managers.get(client)
+
+    if manager is None:
+        manager = ContextCacheManager(
+            weakref.proxy(client),
+            ttl_seconds=CONTEXT_CACHE_TTL_SECONDS,
+            refresh_seconds=CONTEXT_CACHE_REFRESH_SECONDS,
+            min_tokens=CONTEXT_CACHE_MIN_TOKENS,
+            max_entries=CONTEXT_CACHE_MAX_ENTRIES,
+        )
+        _context_cache_managers[client] = manager
+
+    return manager
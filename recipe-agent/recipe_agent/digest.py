@@ -0,0 +1,109 @@
+import logging
+import mmap
+import re
+import warnings
+from typing import Any, Dict, List
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+_PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page\b")
+
+
+def digest_artifact_id(artifact_id: str) -> str:
+    return f"{artifact_id}.digest.md"
+
+
+def thumbnail_artifact_id(artifact_id: str) -> str:
+    return f"{artifact_id}.thumbnail.jpeg"
+
+
+def count_pdf_pages(pdf_bytes: bytes) -> int:
+    return len(_PDF_PAGE_PATTERN.findall(pdf_bytes))
+
+
+def count_pdf_file_pages(path: str) -> int:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return count_pdf_pages(mapped)
+
+
+def build_recipe_digest(
+    artifact_id: str,
+    recipe: Dict[str, Any],
+    page_count: int | None,
+    document_format: str = "PDF",
+) -> str:
+    """
+    Builds a compact Markdown stand-in for a generated recipe document.
+
+    The digest is built from the structured fields the document was rendered
+    from, so it carries the same content as the PDF at a fraction of the
+    size and without any document parsing on the model side.
+
+    Args:
+        artifact_id (str): Artifact ID of the generated document.
+        recipe (Dict[str, Any]): The recipe fields passed to the renderer.
+        page_count (int | None): Number of pages in the generated document,
+            or None for formats without pages.
+        document_format (str): Label of the document format (e.g. "HTML").
+
+    Returns:
+        str: The Markdown digest.
+    """
+    ingredients = "\n".join(f"- {item}" for item in recipe["ingredients"])
+    method = "\n".join(
+        f"{i}. {step}" for i, step in enumerate(recipe["method"], start=1)
+    )
+
+    pages = f", {page_count} page(s)" if page_count is not None else ""
+
+    return (
+        f"# {recipe['recipe_name']}\n\n"
+        f"Document: {artifact_id} ({document_format}{pages})\n\n"
+        f"Preparation Time: {recipe['prep_time']} | "
+        f"Serves: {recipe['serves']} | "
+        f"Cooking Time: {recipe['cook_time']}\n\n"
+        f"## Description\n\n{recipe['description']}\n\n"
+        f"## Ingredients\n\n{ingredients}\n\n"
+        f"## Preparation Steps\n\n{method}\n"
+    )
+
+
+def build_cookbook_digest(
+    artifact_id: str,
+    title: str,
+    recipes: List[Dict[str, Any]],
+    page_count: int,
+) -> str:
+    """
+    Builds a compact Markdown stand-in for a generated cookbook document.
+
+    Only the contents and each recipe's key facts are included; the full
+    recipes are in the document itself and can be reloaded if needed.
+
+    Args:
+        artifact_id (str): Artifact ID of the generated PDF document.
+        title (str): The cookbook title.
+        recipes (List[Dict[str, Any]]): The recipe fields passed to the
+            renderer, in document order.
+        page_count (int): Number of pages in the generated PDF document.
+
+    Returns:
+        str: The Markdown digest.
+    """
+    contents = "\n".join(
+        f"{i}. **{recipe['recipe_name']}** - "
+        f"Preparation Time: {recipe['prep_time']} | "
+        f"Serves: {recipe['serves']} | "
+        f"Cooking Time: {recipe['cook_time']}"
+        for i, recipe in enumerate(recipes, start=1)
+    )
+
+    return (
+        f"# {title}\n\n"
+        f"Document: {artifact_id} (PDF, {page_count} page(s), "
+        f"{len(recipes)} recipe(s))\n\n"
+        f"## Contents\n\n{contents}\n"
+    )
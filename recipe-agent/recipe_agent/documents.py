@@ -0,0 +1,506 @@
+import copy
+import functools
+import logging
+import os
+import warnings
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Dict, List
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable, PageBreak, SimpleDocTemplate, Spacer
+from reportlab.platypus import Paragraph, Table, TableStyle
+from reportlab.platypus.tableofcontents import TableOfContents
+
+from .images import prepare_pdf_image
+from .templates import DEFAULT_TEMPLATE, DISCLAIMER_TEXT, DOCUMENT_TEMPLATES
+from .templates import DocumentTemplate, TextStyle
+from .tracing import set_attributes, span
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+WARNING_BG = colors.Color(1, 0.97, 0.80, alpha=0.9)
+
+SECTION_HEADINGS = ("Description", "Ingredients", "Preparation Steps")
+
+
+class SharedImage(Flowable):
+    """
+    Draws a decoded image at a fixed width.
+
+    Every placement built from the same `ImageReader` resolves to the same
+    XObject in the PDF, so the image is decoded and embedded only once no
+    matter how many times it appears in the layout.
+    """
+
+    def __init__(self, reader: ImageReader, width: float):
+        super().__init__()
+        image_width, image_height = reader.getSize()
+
+        self.reader = reader
+        self.hAlign = "CENTER"
+        self.drawWidth = width
+        self.drawHeight = width * image_height / image_width
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        self.canv.drawImage(
+            self.reader,
+            0,
+            0,
+            self.drawWidth,
+            self.drawHeight,
+            mask="auto"
+        )
+
+
+@dataclass
+class CompiledTemplate:
+    """
+    The ReportLab objects of a `DocumentTemplate`, built once per process.
+
+    Styles and table styles are only read while a document is laid out, so
+    every document shares them. The static paragraphs (section headings and
+    the disclaimer) are parsed once here and handed out as shallow copies,
+    because a flowable records its size on itself while it is laid out.
+    """
+
+    template: DocumentTemplate
+    page_margin: float
+    content_width: float
+    title: ParagraphStyle
+    meta: ParagraphStyle
+    body: ParagraphStyle
+    cookbook_title: ParagraphStyle
+    contents_heading: ParagraphStyle
+    toc: ParagraphStyle
+    meta_table_style: TableStyle
+    ingredients_table_style: TableStyle
+    side_by_side_table_style: TableStyle
+    disclaimer_table_style: TableStyle
+    section_headings: Dict[str, Paragraph]
+    disclaimer: Paragraph
+
+    @property
+    def image_width(self) -> float:
+        """Widest placement of the recipe image, in points."""
+        template = self.template
+        return self.content_width * max(
+            template.hero_image_width,
+            template.side_image_width
+        )
+
+    def heading(self, text: str) -> Paragraph:
+        return copy.copy(self.section_headings[text])
+
+
+def _paragraph_style(name: str, style: TextStyle, **overrides) -> ParagraphStyle:
+    attributes = {
+        "fontName": style.font_name,
+        "fontSize": style.font_size,
+        "leading": style.leading,
+        "alignment": TA_CENTER if style.centered else TA_LEFT,
+        "spaceAfter": style.space_after,
+        "textColor": colors.black,
+    }
+    return ParagraphStyle(name, **{**attributes, **overrides})
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(name: str) -> CompiledTemplate:
+    """
+    Compiles the named template on first use and returns the cached result
+    afterwards. Raises KeyError for an unknown template.
+    """
+    template = DOCUMENT_TEMPLATES[name]
+    page_margin = template.page_margin * cm
+
+    section = _paragraph_style(f"{name}_section", template.section)
+
+    disclaimer_table_style = [
+        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+        ("LEFTPADDING", (0, 0), (-1, -1), 12),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
+        ("TOPPADDING", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+    ]
+    if template.disclaimer_background:
+        disclaimer_table_style.insert(
+            0, ("BACKGROUND", (0, 0), (-1, -1), WARNING_BG)
+        )
+
+    logger.debug("Compiled document template %s.", name)
+
+    return CompiledTemplate(
+        template=template,
+        page_margin=page_margin,
+        content_width=A4[0] - 2 * page_margin,
+        title=_paragraph_style(f"{name}_title", template.title),
+        meta=_paragraph_style(f"{name}_meta", template.meta),
+        body=_paragraph_style(f"{name}_body", template.body),
+        cookbook_title=_paragraph_style(
+            f"{name}_cookbook_title",
+            template.title,
+            fontSize=template.title.font_size + 4,
+            leading=template.title.leading + 6,
+            spaceAfter=24,
+        ),
+        contents_heading=_paragraph_style(
+            f"{name}_contents",
+            template.section,
+            spaceAfter=12,
+        ),
+        toc=ParagraphStyle(
+            f"{name}_toc",
+            fontName=template.body.font_name,
+            fontSize=12,
+            leading=18,
+            leftIndent=0,
+        ),
+        meta_table_style=TableStyle([
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+        ]),
+        ingredients_table_style=TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP")
+        ]),
+        side_by_side_table_style=TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ]),
+        disclaimer_table_style=TableStyle(disclaimer_table_style),
+        section_headings={
+            text: Paragraph(text, section) for text in SECTION_HEADINGS
+        },
+        disclaimer=Paragraph(
+            DISCLAIMER_TEXT,
+            _paragraph_style(f"{name}_disclaimer", template.disclaimer)
+        ),
+    )
+
+
+def _new_document(
+    doc_class: type,
+    buffer: BytesIO | str,
+    compiled: CompiledTemplate,
+    **kwargs
+) -> SimpleDocTemplate:
+    return doc_class(
+        buffer,
+        pagesize=A4,
+        rightMargin=compiled.page_margin,
+        leftMargin=compiled.page_margin,
+        topMargin=compiled.page_margin,
+        bottomMargin=compiled.page_margin,
+        **kwargs
+    )
+
+
+def _set_pdf_metadata(canvas, doc):
+    canvas.setTitle("AI Generated Recipe")
+    canvas.setAuthor("agent-after-dark")
+    canvas.setSubject("Recipe generated from uploaded image")
+
+
+def _document_output(buffer: BytesIO | str, current_span) -> bytes | None:
+    if isinstance(buffer, str):
+        set_attributes(current_span, pdf_bytes=os.path.getsize(buffer))
+        return None
+
+    # `getvalue()` hands over the buffer's contents without the extra copy
+    # that `seek(0)` + `read()` makes.
+    pdf_bytes = buffer.getvalue()
+    set_attributes(current_span, pdf_bytes=len(pdf_bytes))
+    return pdf_bytes
+
+
+def build_recipe_pdf(
+    recipe: Dict[str, Any],
+    image_bytes: bytes,
+    template_name: str = DEFAULT_TEMPLATE,
+    output_path: str | None = None,
+) -> bytes | None:
+    """
+    Lays out a recipe and renders it into PDF bytes.
+
+    This is the CPU-bound half of `generate_recipe_document`. It only takes
+    picklable arguments so that it can run inside a worker process.
+
+    Args:
+        recipe (Dict[str, Any]): The recipe fields passed to the tool
+            (recipe_name, description, prep_time, serves, cook_time,
+            ingredients and method).
+        image_bytes (bytes): Raw bytes of the recipe image to embed.
+        template_name (str): Name of the `DocumentTemplate` to lay out with.
+        output_path (str | None): Write the document to this file instead of
+            returning it, so a worker process does not send it back.
+
+    Returns:
+        bytes | None: The rendered PDF document, or None when it was written
+        to `output_path`.
+    """
+    compiled = compile_template(template_name)
+
+    buffer = output_path or BytesIO()
+    doc = _new_document(SimpleDocTemplate, buffer, compiled)
+
+    with span(
+        "render.layout",
+        template=template_name,
+        image_bytes=len(image_bytes),
+    ) as current_span:
+        recipe_image = None
+        if compiled.template.has_images:
+            recipe_image = ImageReader(BytesIO(
+                prepare_pdf_image(image_bytes, max_width_pt=compiled.image_width)
+            ))
+
+        story = _layout_recipe(doc, recipe, recipe_image, compiled)
+        set_attributes(current_span, flowables=len(story))
+
+    with span("render.build") as current_span:
+        doc.build(
+            story,
+            onFirstPage=_set_pdf_metadata,
+            onLaterPages=_set_pdf_metadata
+        )
+
+        set_attributes(current_span, pages=doc.page)
+
+        return _document_output(buffer, current_span)
+
+
+def _layout_recipe(
+    doc: SimpleDocTemplate,
+    recipe: Dict[str, Any],
+    recipe_image: ImageReader | None,
+    compiled: CompiledTemplate,
+    bookmark: str | None = None,
+    disclaimer: bool = True,
+) -> List[Flowable]:
+    template = compiled.template
+    body = compiled.body
+
+    section_gap = Spacer(1, template.section_spacing * cm)
+    heading_gap = Spacer(1, template.heading_spacing * cm)
+
+    story = []
+
+    if recipe_image is not None and template.hero_image_width > 0:
+        story.append(
+            SharedImage(recipe_image, doc.width * template.hero_image_width)
+        )
+        story.append(Spacer(1, template.image_spacing * cm))
+
+    title = Paragraph(recipe["recipe_name"], compiled.title)
+    if bookmark is not None:
+        title.toc_entry = (recipe["recipe_name"], bookmark)
+
+    story.append(title)
+    story.append(Spacer(1, template.title_spacing * cm))
+
+    if template.meta_on_one_line:
+        story.append(Paragraph(
+            f"<b>Prep:</b> {recipe['prep_time']} &nbsp;|&nbsp; "
+            f"<b>Serves:</b> {recipe['serves']} &nbsp;|&nbsp; "
+            f"<b>Cook:</b> {recipe['cook_time']}",
+            compiled.meta
+        ))
+
+    else:
+        meta_table = Table(
+            [[
+                Paragraph(f"<b>Preperation Time:</b> {recipe['prep_time']}", compiled.meta),
+                Paragraph(f"<b>Serves:</b> {recipe['serves']}", compiled.meta),
+                Paragraph(f"<b>Cooking Time:</b> {recipe['cook_time']}", compiled.meta),
+            ]],
+            colWidths=[doc.width / 3] * 3
+        )
+        meta_table.setStyle(compiled.meta_table_style)
+        story.append(meta_table)
+
+    story.append(section_gap)
+
+    story.append(compiled.heading("Description"))
+    story.append(heading_gap)
+
+    story.append(Paragraph(recipe["description"], body))
+    story.append(section_gap)
+
+    story.append(compiled.heading("Ingredients"))
+    story.append(heading_gap)
+
+    ingredient_paragraphs = [
+        Paragraph(f"• {item}", body) for item in recipe["ingredients"]
+    ]
+
+    if recipe_image is not None and template.side_image_width > 0:
+        ingredients_block = Table(
+            [[ingredient_paragraphs]],
+            colWidths=[doc.width * 0.5]
+        )
+        ingredients_block.setStyle(compiled.ingredients_table_style)
+
+        side_img = SharedImage(recipe_image, doc.width * template.side_image_width)
+
+        layout_table = Table(
+            [[ingredients_block, side_img]],
+            colWidths=[
+                doc.width * (0.95 - template.side_image_width),
+                doc.width * template.side_image_width
+            ]
+        )
+        layout_table.setStyle(compiled.side_by_side_table_style)
+        story.append(layout_table)
+
+    else:
+        story.extend(ingredient_paragraphs)
+
+    story.append(section_gap)
+
+    story.append(compiled.heading("Preparation Steps"))
+    story.append(heading_gap)
+
+    step_gap = Spacer(1, template.step_spacing * cm)
+    for i, step in enumerate(recipe["method"], start=1):
+        story.append(Paragraph(f"<b>Step {i}.</b> {step}", body))
+        story.append(step_gap)
+
+    if disclaimer:
+        story.append(section_gap)
+        story.extend(_layout_disclaimer(doc, compiled))
+
+    return story
+
+
+def _layout_disclaimer(
+    doc: SimpleDocTemplate,
+    compiled: CompiledTemplate
+) -> List[Flowable]:
+    warning_table = Table(
+        [[copy.copy(compiled.disclaimer)]],
+        colWidths=[doc.width]
+    )
+    warning_table.setStyle(compiled.disclaimer_table_style)
+
+    return [warning_table]
+
+
+class CookbookDocTemplate(SimpleDocTemplate):
+    """
+    Document template that bookmarks each recipe title and reports it to the
+    table of contents.
+    """
+
+    def afterFlowable(self, flowable):
+        toc_entry = getattr(flowable, "toc_entry", None)
+
+        if toc_entry is None:
+            return
+
+        text, bookmark = toc_entry
+        self.canv.bookmarkPage(bookmark)
+        self.canv.addOutlineEntry(text, bookmark, level=0)
+        self.notify("TOCEntry", (0, text, self.page, bookmark))
+
+
+def prepare_cookbook_image(
+    image_bytes: bytes,
+    template_name: str = DEFAULT_TEMPLATE
+) -> bytes:
+    """Prepares an image for `build_cookbook_pdf` at the template's widest placement."""
+    compiled = compile_template(template_name)
+    return prepare_pdf_image(image_bytes, max_width_pt=compiled.image_width)
+
+
+def build_cookbook_pdf(
+    title: str,
+    recipes: List[Dict[str, Any]],
+    images: Dict[str, bytes],
+    template_name: str = DEFAULT_TEMPLATE,
+    output_path: str | None = None,
+) -> bytes | None:
+    """
+    Lays out several recipes into one PDF document with a table of contents.
+
+    Like `build_recipe_pdf`, this only takes picklable arguments so that it
+    can run inside a worker process. Images are expected to be prepared
+    already (see `prepare_cookbook_image`), which lets the caller do that
+    work in parallel beforehand.
+
+    Args:
+        title (str): The cookbook title shown on the contents page.
+        recipes (List[Dict[str, Any]]): The recipe fields for each recipe, as
+            for `build_recipe_pdf`, plus an `image_key` into `images`.
+        images (Dict[str, bytes]): Prepared image bytes by image key. Each
+            image is decoded and embedded once, however many recipes use it.
+            May be empty for templates without images.
+        template_name (str): Name of the `DocumentTemplate` to lay out with.
+        output_path (str | None): Write the document to this file instead of
+            returning it.
+
+    Returns:
+        bytes | None: The rendered PDF document, or None when it was written
+        to `output_path`.
+    """
+    compiled = compile_template(template_name)
+
+    buffer = output_path or BytesIO()
+    doc = _new_document(CookbookDocTemplate, buffer, compiled, title=title)
+
+    with span(
+        "render.layout",
+        template=template_name,
+        recipes=len(recipes),
+        images=len(images),
+    ) as current_span:
+        readers = {
+            image_key: ImageReader(BytesIO(image_bytes))
+            for image_key, image_bytes in images.items()
+        }
+
+        table_of_contents = TableOfContents()
+        table_of_contents.levelStyles = [compiled.toc]
+
+        story = [
+            Paragraph(title, compiled.cookbook_title),
+            Paragraph("Contents", compiled.contents_heading),
+            table_of_contents,
+        ]
+
+        for index, recipe in enumerate(recipes):
+            story.append(PageBreak())
+            story.extend(_layout_recipe(
+                doc,
+                recipe,
+                readers.get(recipe["image_key"]),
+                compiled,
+                bookmark=f"recipe-{index}",
+                disclaimer=False,
+            ))
+
+        story.append(Spacer(1, compiled.template.section_spacing * cm))
+        story.extend(_layout_disclaimer(doc, compiled))
+        set_attributes(current_span, flowables=len(story))
+
+    with span("render.build") as current_span:
+        # Two passes: the first collects the page numbers for the contents.
+        doc.multiBuild(
+            story,
+            onFirstPage=_set_pdf_metadata,
+            onLaterPages=_set_pdf_metadata
+        )
+
+        set_attributes(current_span, pages=doc.page)
+
+        return _document_output(buffer, current_span)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Dict
+
+from google.adk.agents.callback_context import CallbackContext
+
+from .config import IMAGE_DEDUP_ENABLED, IMAGE_DEDUP_MAX_DISTANCE
+from .config import IMAGE_DEDUP_MAX_ENTRIES, IMAGE_DEDUP_SCOPE
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+IMAGE_INDEX_STATE_KEY = "image_hashes"
+
+
+@dataclass(frozen=True)
+class ImageDedupPolicy:
+    """
+    How uploaded images are matched against earlier uploads.
+
+    With `scope="user"` the index lives in user state and uploads are stored
+    as user-scoped artifacts, so a photo re-sent in a later session maps onto
+    the artifact saved by the first one. With `scope="session"` both stay in
+    the session. Images whose difference hashes are at most `max_distance`
+    bits apart are treated as the same picture, and the index remembers the
+    `max_entries` most recent uploads.
+    """
+
+    enabled: bool = False
+    scope: str = "user"
+    max_distance: int = 6
+    max_entries: int = 256
+
+    @property
+    def state_key(self) -> str:
+        if self.scope == "user":
+            return f"user:{IMAGE_INDEX_STATE_KEY}"
+        return IMAGE_INDEX_STATE_KEY
+
+    @property
+    def artifact_prefix(self) -> str:
+        return "user:" if self.enabled and self.scope == "user" else ""
+
+
+DEFAULT_IMAGE_DEDUP_POLICY = ImageDedupPolicy(
+    enabled=IMAGE_DEDUP_ENABLED,
+    scope=IMAGE_DEDUP_SCOPE,
+    max_distance=IMAGE_DEDUP_MAX_DISTANCE,
+    max_entries=IMAGE_DEDUP_MAX_ENTRIES,
+)
+
+
+async def image_fingerprint(image_bytes: bytes) -> int | None:
+    """
+    Returns the perceptual hash of `image_bytes`, or None when the image
+    cannot be decoded. Decoding runs off the event loop.
+    """
+    from .images import image_dhash
+
+    try:
+        return await asyncio.to_thread(image_dhash, image_bytes)
+    except Exception as e:
+        logger.info("Could not hash uploaded image: %s", e)
+        return None
+
+
+def _get_index(
+    callback_context: CallbackContext,
+    policy: ImageDedupPolicy
+) -> Dict[str, str]:
+    return dict(callback_context.state.get(policy.state_key) or {})
+
+
+def find_duplicate(
+    callback_context: CallbackContext,
+    fingerprint: int,
+    policy: ImageDedupPolicy = DEFAULT_IMAGE_DEDUP_POLICY
+) -> str | None:
+    """
+    Returns the artifact ID of the closest indexed image within
+    `policy.max_distance` of `fingerprint`, or None.
+    """
+    best_id = None
+    best_distance = policy.max_distance + 1
+
+    for artifact_id, indexed in _get_index(callback_context, policy).items():
+        distance = (fingerprint ^ int(indexed, 16)).bit_count()
+
+        if distance < best_distance:
+            best_id = artifact_id
+            best_distance = distance
+
+    if best_id is not None:
+        logger.debug(
+            "Upload matches %s at distance %d.", best_id, best_distance
+        )
+
+    return best_id
+
+
+def remember_image(
+    callback_context: CallbackContext,
+    artifact_id: str,
+    fingerprint: int,
+    policy: ImageDedupPolicy = DEFAULT_IMAGE_DEDUP_POLICY
+) -> None:
+    """Adds a saved upload to the index, dropping the oldest entries."""
+    index = _get_index(callback_context, policy)
+    index.pop(artifact_id, None)
+    index[artifact_id] = f"{fingerprint:016x}"
+
+    while len(index) > policy.max_entries:
+        del index[next(iter(index))]
+
+    callback_context.state[policy.state_key] = index
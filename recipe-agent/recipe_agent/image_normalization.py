@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+
+from google.genai.types import Blob, Part
+
+from .config import MODEL_IMAGE_CACHE_MAX_ENTRIES, MODEL_IMAGE_FORMAT
+from .config import MODEL_IMAGE_MAX_EDGE, MODEL_IMAGE_NORMALIZE
+from .config import MODEL_IMAGE_QUALITY
+from .tracing import set_attributes, span
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ImageNormalizationPolicy:
+    """
+    How uploaded images are re-encoded before they are sent to the model.
+
+    Gemini bills images in 768x768 tiles, so `max_edge` should be a multiple
+    of 768: the default of 1536 keeps a phone photo to at most 2x2 tiles. The
+    original upload is still saved as the artifact, and only the PDF renderer
+    reads it back.
+    """
+
+    enabled: bool = True
+    max_edge: int = 1536
+    image_format: str = "JPEG"
+    quality: int = 85
+    cache_max_entries: int = 256
+
+
+DEFAULT_IMAGE_NORMALIZATION_POLICY = ImageNormalizationPolicy(
+    enabled=MODEL_IMAGE_NORMALIZE,
+    max_edge=MODEL_IMAGE_MAX_EDGE,
+    image_format=MODEL_IMAGE_FORMAT.upper(),
+    quality=MODEL_IMAGE_QUALITY,
+    cache_max_entries=MODEL_IMAGE_CACHE_MAX_ENTRIES,
+)
+
+
+class _NormalizedImageCache:
+    """
+    Process-wide LRU of normalized images by the content hash of the original
+    and the policy. A None value records that the original is sent unchanged.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[Tuple, Tuple[bytes, str] | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Tuple[bool, Tuple[bytes, str] | None]:
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def put(self, key: Tuple, value: Tuple[bytes, str] | None) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_normalized_images = _NormalizedImageCache(
+    DEFAULT_IMAGE_NORMALIZATION_POLICY.cache_max_entries
+)
+
+
+async def normalize_image_part(
+    part: Part,
+    policy: ImageNormalizationPolicy = DEFAULT_IMAGE_NORMALIZATION_POLICY
+) -> Part:
+    """
+    Returns the variant of an inline image part to send to the model, or the
+    part itself when it needs no changes, cannot be decoded or is not an
+    image. Decoding runs off the event loop.
+    """
+    inline_data = part.inline_data
+
+    if (
+        not policy.enabled
+        or not inline_data
+        or not inline_data.data
+        or not (inline_data.mime_type or "").startswith("image/")
+    ):
+        return part
+
+    key = (
+        hashlib.sha256(inline_data.data).hexdigest(),
+        policy.max_edge,
+        policy.image_format,
+        policy.quality,
+    )
+
+    with span(
+        "image.normalize",
+        mime_type=inline_data.mime_type,
+        input_bytes=len(inline_data.data),
+    ) as current_span:
+        found, normalized = _normalized_images.get(key)
+        set_attributes(current_span, cache_hit=found)
+
+        if not found:
+            from .images import normalize_model_image
+
+            try:
+                normalized = await asyncio.to_thread(
+                    normalize_model_image,
+                    inline_data.data,
+                    policy.max_edge,
+                    policy.image_format,
+                    policy.quality,
+                )
+
+            except Exception as e:
+                logger.info("Could not normalize uploaded image: %s", e)
+                normalized = None
+
+            _normalized_images.put(key, normalized)
+
+        if normalized is None:
+            set_attributes(current_span, output_bytes=len(inline_data.data))
+            return part
+
+        image_bytes, mime_type = normalized
+        set_attributes(current_span, output_bytes=len(image_bytes))
+
+    return Part(
+        inline_data=Blob(
+            data=image_bytes,
+            mime_type=mime_type,
+            display_name=inline_data.display_name,
+        )
+    )
@@ -0,0 +1,211 @@
+import logging
+import math
+import warnings
+from io import BytesIO
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+from .config import PDF_IMAGE_DPI, PDF_IMAGE_JPEG_QUALITY
+
+try:
+    from pillow_heif import register_heif_opener
+
+except ImportError:  # HEIC/HEIF uploads are then passed on unchanged
+    register_heif_opener = None
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+if register_heif_opener is not None:
+    register_heif_opener()
+
+# Formats that are already compact enough to send to the model as they are.
+_EFFICIENT_FORMATS = ("JPEG", "WEBP")
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+def _flatten_to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGB", "L"):
+        return image
+
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+
+    return image.convert("RGB")
+
+
+def prepare_pdf_image(
+    image_bytes: bytes,
+    max_width_pt: float,
+    dpi: int = PDF_IMAGE_DPI,
+    quality: int = PDF_IMAGE_JPEG_QUALITY,
+) -> bytes:
+    """
+    Decodes an uploaded image once and re-encodes it for PDF embedding.
+
+    The image is downscaled so that it is never wider than `max_width_pt`
+    printed at `dpi`, its EXIF orientation is applied (the metadata itself is
+    dropped on re-encode), transparency is flattened onto white and the
+    result is stored as a JPEG.
+
+    Args:
+        image_bytes (bytes): Raw bytes of the uploaded image.
+        max_width_pt (float): Widest placement of the image in the document,
+            in PDF points.
+        dpi (int): Target print resolution.
+        quality (int): JPEG quality used for the re-encoded image.
+
+    Returns:
+        bytes: The JPEG encoded image.
+    """
+    target_width = max(1, round(max_width_pt / 72 * dpi))
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        if min(image.size) > target_width:
+            # Lets the JPEG decoder skip straight to a reduced scale. Both
+            # sides are bounded because EXIF rotation may swap them later.
+            image.draft("RGB", (target_width, target_width))
+
+        image = ImageOps.exif_transpose(image)
+        image = _flatten_to_rgb(image)
+
+        if image.width > target_width:
+            target_height = max(
+                1, round(image.height * target_width / image.width)
+            )
+            image = image.resize(
+                (target_width, target_height),
+                Image.Resampling.LANCZOS
+            )
+
+        output = BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+
+    return output.getvalue()
+
+
+def make_thumbnail(
+    image_bytes: bytes,
+    max_edge: int = 256,
+    quality: int = 60,
+) -> bytes:
+    with Image.open(BytesIO(image_bytes)) as image:
+        image.draft("RGB", (max_edge, max_edge))
+
+        image = ImageOps.exif_transpose(image)
+        image = _flatten_to_rgb(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        output = BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+
+    return output.getvalue()
+
+
+def image_dhash(image_bytes: bytes, hash_size: int = 8) -> int:
+    """
+    Computes the difference hash of an image.
+
+    The image is reduced to a `hash_size + 1` by `hash_size` grayscale
+    thumbnail and every bit records whether a pixel is brighter than its
+    right-hand neighbour. Re-encoding, resizing or small edits change only a
+    few bits, so near-duplicates are images whose hashes have a small Hamming
+    distance.
+
+    Args:
+        image_bytes (bytes): Raw bytes of the image.
+        hash_size (int): Rows of the hash; the hash has `hash_size ** 2` bits.
+
+    Returns:
+        int: The hash, with the top-left comparison in the most significant bit.
+    """
+    with Image.open(BytesIO(image_bytes)) as image:
+        image.draft("L", (hash_size * 8, hash_size * 8))
+
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("L").resize(
+            (hash_size + 1, hash_size),
+            Image.Resampling.BILINEAR
+        )
+        pixels = image.tobytes()
+
+    dhash = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            dhash = (dhash << 1) | (left > right)
+
+    return dhash
+
+
+def normalize_model_image(
+    image_bytes: bytes,
+    max_edge: int,
+    image_format: str = "JPEG",
+    quality: int = 85,
+) -> Tuple[bytes, str] | None:
+    """
+    Re-encodes an uploaded image into the variant sent to the model.
+
+    The image is downscaled so that its longer edge is at most `max_edge`,
+    its EXIF orientation is applied and EXIF/XMP metadata is dropped, and
+    transparency is flattened onto white before it is stored as `image_format`
+    (JPEG or WEBP). A JPEG or WebP that is already small enough and carries
+    no metadata is kept as it is, as is any image the result would be larger
+    than.
+
+    Args:
+        image_bytes (bytes): Raw bytes of the uploaded image.
+        max_edge (int): Longest edge of the normalized image, in pixels.
+        image_format (str): Pillow format name of the normalized image.
+        quality (int): Encoder quality of the normalized image.
+
+    Returns:
+        Tuple[bytes, str] | None: The normalized image and its MIME type, or
+        None when the original should be sent unchanged.
+    """
+    with Image.open(BytesIO(image_bytes)) as image:
+        has_metadata = "exif" in image.info or "xmp" in image.info
+        icc_profile = image.info.get("icc_profile")
+
+        if (
+            image.format in _EFFICIENT_FORMATS
+            and max(image.size) <= max_edge
+            and not has_metadata
+        ):
+            return None
+
+        scale = max_edge / max(image.size)
+        if scale < 1:
+            # Decodes JPEGs at the smallest scale that still covers the
+            # target size, which is most of the work for large photos.
+            image.draft("RGB", (
+                math.ceil(image.width * scale),
+                math.ceil(image.height * scale)
+            ))
+
+        image = ImageOps.exif_transpose(image)
+        image = _flatten_to_rgb(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        output = BytesIO()
+        image.save(
+            output,
+            format=image_format,
+            quality=quality,
+            icc_profile=icc_profile
+        )
+
+    normalized = output.getvalue()
+
+    if len(normalized) >= len(image_bytes) and not has_metadata:
+        return None
+
+    return normalized, _MIME_TYPES[image_format]
@@ -0,0 +1,408 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import warnings
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Deque
+from typing import Dict, Tuple, TypeVar
+
+from google.genai import types
+from google.genai.errors import APIError
+
+from .config import MODEL_BACKOFF_BASE_SECONDS, MODEL_BACKOFF_MAX_SECONDS
+from .config import MODEL_BASE_URL, MODEL_CONCURRENCY_INITIAL
+from .config import MODEL_CONCURRENCY_MAX, MODEL_CONCURRENCY_MIN
+from .config import MODEL_KEEPALIVE_SECONDS, MODEL_LATENCY_TARGET_SECONDS
+from .config import MODEL_MAX_ATTEMPTS, MODEL_MAX_CONNECTIONS
+from .config import MODEL_TIMEOUT_SECONDS
+from .tracing import set_attributes
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+T = TypeVar("T")
+
+# Status codes worth another attempt, and the subset that means the service
+# is overloaded and the concurrency limit should back off.
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+@dataclass(frozen=True)
+class ModelAccessPolicy:
+    """
+    How model requests share the process-wide client.
+
+    Requests hold one of `AdaptiveConcurrencyLimiter`'s slots while they are
+    in flight. The limit starts at `initial_concurrency` and moves between
+    `min_concurrency` and `max_concurrency`: it grows by one slot per
+    `limit` requests answered within `latency_target_seconds`, shrinks by 10%
+    when the first response takes longer, and halves on a 429 or 503.
+    Retryable errors are retried up to `max_attempts` times in total after a
+    jittered exponential backoff, and every retry queues for a slot again, so
+    a burst of failures cannot turn into a retry storm.
+    """
+
+    base_url: str = ""
+    max_connections: int = 64
+    keepalive_seconds: float = 30.0
+    timeout_seconds: float = 0.0
+    initial_concurrency: int = 8
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    latency_target_seconds: float = 10.0
+    max_attempts: int = 4
+    backoff_base_seconds: float = 1.0
+    backoff_max_seconds: float = 20.0
+
+
+DEFAULT_MODEL_ACCESS_POLICY = ModelAccessPolicy(
+    base_url=MODEL_BASE_URL,
+    max_connections=MODEL_MAX_CONNECTIONS,
+    keepalive_seconds=MODEL_KEEPALIVE_SECONDS,
+    timeout_seconds=MODEL_TIMEOUT_SECONDS,
+    initial_concurrency=MODEL_CONCURRENCY_INITIAL,
+    min_concurrency=MODEL_CONCURRENCY_MIN,
+    max_concurrency=MODEL_CONCURRENCY_MAX,
+    latency_target_seconds=MODEL_LATENCY_TARGET_SECONDS,
+    max_attempts=MODEL_MAX_ATTEMPTS,
+    backoff_base_seconds=MODEL_BACKOFF_BASE_SECONDS,
+    backoff_max_seconds=MODEL_BACKOFF_MAX_SECONDS,
+)
+
+
+@dataclass
+class Permit:
+    """A slot held by one request attempt."""
+
+    epoch: int
+    queue_depth: int
+    queued_at: float
+    started_at: float = 0.0
+    first_response_at: float = 0.0
+    overloaded: bool = False
+
+    @property
+    def wait_seconds(self) -> float:
+        return self.started_at - self.queued_at
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit shared by every model request in the process.
+
+    Waiters are served in arrival order. The limiter is guarded by a thread
+    lock and wakes waiters through their own event loop, so it can be shared
+    by sessions running on different loops. Only one decrease is applied per
+    congestion event: requests that started before the last decrease do not
+    shrink the limit again when they fail.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_target_seconds: float = 10.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_seconds = latency_target_seconds
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._epoch = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+        self._max_queue_depth = 0
+        self._overloads = 0
+        self._slow_responses = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Permit:
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            permit = Permit(
+                epoch=self._epoch,
+                queue_depth=len(self._waiters),
+                queued_at=time.monotonic(),
+            )
+
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                permit.started_at = permit.queued_at
+                return permit
+
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+            self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+
+        try:
+            await waiter
+
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+
+                except ValueError:
+                    # The slot was granted just before the cancellation.
+                    self._in_flight -= 1
+                    self._grant()
+
+            raise
+
+        with self._lock:
+            # A decrease while queued must not be charged to this request.
+            permit.epoch = self._epoch
+
+        permit.started_at = time.monotonic()
+        return permit
+
+    def release(self, permit: Permit) -> None:
+        finished_at = time.monotonic()
+        latency = (permit.first_response_at or finished_at) - permit.started_at
+
+        with self._lock:
+            self._in_flight -= 1
+
+            if permit.overloaded:
+                self._overloads += 1
+                self._decrease(permit, 0.5)
+
+            elif latency > self.latency_target_seconds:
+                self._slow_responses += 1
+                self._decrease(permit, 0.9)
+
+            elif permit.first_response_at:
+                self._limit = min(
+                    self.max_limit,
+                    self._limit + 1 / self._limit
+                )
+
+            self._grant()
+
+    def _decrease(self, permit: Permit, factor: float) -> None:
+        if permit.epoch != self._epoch:
+            return
+
+        self._limit = max(self.min_limit, self._limit * factor)
+        self._epoch += 1
+        self._decreases += 1
+
+        logger.info(
+            "Model concurrency limit lowered to %d (%d in flight, %d queued).",
+            self.limit,
+            self._in_flight,
+            len(self._waiters),
+        )
+
+    def _grant(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            loop, waiter = self._waiters.popleft()
+            self._in_flight += 1
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self._max_queue_depth,
+                "overloads": self._overloads,
+                "slow_responses": self._slow_responses,
+                "decreases": self._decreases,
+            }
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def backoff_delay(
+    attempt: int,
+    policy: ModelAccessPolicy = DEFAULT_MODEL_ACCESS_POLICY
+) -> float:
+    """
+    Equal-jitter exponential backoff before retry number `attempt + 1`:
+    half the capped delay plus a random share of the other half, so that
+    clients that failed together do not retry together.
+    """
+    delay = min(
+        policy.backoff_max_seconds,
+        policy.backoff_base_seconds * 2 ** attempt
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _status_code(error: BaseException) -> int | None:
+    return error.code if isinstance(error, APIError) else None
+
+
+async def generate_with_limits(
+    generate: Callable[[], AsyncIterator[T]],
+    current_span: Any = None,
+    limiter: AdaptiveConcurrencyLimiter | None = None,
+    policy: ModelAccessPolicy = DEFAULT_MODEL_ACCESS_POLICY,
+) -> AsyncGenerator[T, None]:
+    """
+    Runs `generate()` under the shared concurrency limit and yields its
+    responses, retrying retryable errors until the first response arrives.
+
+    Args:
+        generate (Callable[[], AsyncIterator[T]]): Starts one attempt.
+        current_span (Any): Span to record the queueing and retries on.
+        limiter (AdaptiveConcurrencyLimiter | None): Defaults to the
+            process-wide limiter.
+        policy (ModelAccessPolicy): Retry and backoff settings.
+    """
+    limiter = limiter or get_model_limiter()
+
+    for attempt in range(policy.max_attempts):
+        permit = await limiter.acquire()
+        set_attributes(
+            current_span,
+            attempts=attempt + 1,
+            queue_depth=permit.queue_depth,
+            queue_wait_ms=round(permit.wait_seconds * 1000, 1),
+            concurrency_limit=limiter.limit,
+        )
+
+        try:
+            async for response in generate():
+                if not permit.first_response_at:
+                    permit.first_response_at = time.monotonic()
+                yield response
+            return
+
+        except Exception as e:
+            status_code = _status_code(e)
+            permit.overloaded = status_code in OVERLOAD_STATUS_CODES
+
+            if (
+                status_code not in RETRYABLE_STATUS_CODES
+                or permit.first_response_at
+                or attempt + 1 >= policy.max_attempts
+            ):
+                raise
+
+            delay = backoff_delay(attempt, policy)
+            logger.warning(
+                "Model request failed with %s, retrying in %.1f s.",
+                status_code,
+                delay,
+            )
+
+        finally:
+            limiter.release(permit)
+
+        await asyncio.sleep(delay)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+_default_client = None
+_clients_lock = threading.Lock()
+
+
+def get_model_limiter() -> AdaptiveConcurrencyLimiter:
+    global _limiter
+
+    with _limiter_lock:
+        if _limiter is None:
+            policy = DEFAULT_MODEL_ACCESS_POLICY
+            _limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=policy.initial_concurrency,
+                min_limit=policy.min_concurrency,
+                max_limit=policy.max_concurrency,
+                latency_target_seconds=policy.latency_target_seconds,
+            )
+
+        return _limiter
+
+
+def _create_client(
+    headers: Dict[str, str],
+    policy: ModelAccessPolicy
+) -> Any:
+    import httpx
+    from google.genai import Client
+
+    pool_args = {
+        "limits": httpx.Limits(
+            max_connections=policy.max_connections,
+            max_keepalive_connections=policy.max_connections,
+            keepalive_expiry=policy.keepalive_seconds,
+        ),
+    }
+
+    return Client(
+        http_options=types.HttpOptions(
+            base_url=policy.base_url or None,
+            headers=headers,
+            timeout=int(policy.timeout_seconds * 1000) or None,
+            client_args=pool_args,
+            async_client_args=pool_args,
+            # Retries are made by `generate_with_limits`, which also applies
+            # the concurrency limit to them.
+            retry_options=types.HttpRetryOptions(attempts=1),
+        )
+    )
+
+
+def get_model_client(
+    headers: Dict[str, str],
+    policy: ModelAccessPolicy = DEFAULT_MODEL_ACCESS_POLICY
+) -> Any:
+    """
+    Returns the `google.genai.Client` shared by every agent and session.
+
+    Its HTTP connections are kept alive and reused between requests. An
+    async connection pool cannot outlive its event loop, so there is one
+    client per running loop, which in a server is one per process.
+    """
+    global _default_client
+
+    try:
+        loop = asyncio.get_running_loop()
+
+    except RuntimeError:
+        loop = None
+
+    with _clients_lock:
+        if loop is None:
+            if _default_client is None:
+                _default_client = _create_client(headers, policy)
+            return _default_client
+
+        client = _clients.get(loop)
+        if client is None:
+            client = _create_client(headers, policy)
+            _clients[loop] = client
+
+        return client
@@ -0,0 +1,166 @@
+import functools
+import logging
+import warnings
+from typing import Any, AsyncGenerator
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.models.google_llm import Gemini
+from google.genai.errors import ClientError
+
+from .config import CONTEXT_CACHE_ENABLED
+from .context_cache import get_context_cache_manager
+from .model_pool import generate_with_limits, get_model_client
+from .tracing import get_tracer, measure_contents, record_error
+from .tracing import set_attributes
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+def _attempt_request(llm_request: LlmRequest) -> LlmRequest:
+    """
+    Returns a copy of `llm_request` for a single attempt.
+
+    `Gemini.generate_content_async` edits the request it is given (labels,
+    file display names, the appended user turn, tracking headers), so each
+    attempt works on its own contents, parts and config and a retry starts
+    from the request as the agent built it. The rest, such as the tools
+    dict, is shared.
+    """
+    config = llm_request.config
+
+    return llm_request.model_copy(update={
+        "contents": [
+            content.model_copy(update={
+                "parts": [part.model_copy() for part in content.parts]
+                if content.parts is not None else None,
+            })
+            for content in llm_request.contents
+        ],
+        "config": config.model_copy(deep=True) if config is not None else None,
+    })
+
+
+class RecipeGemini(Gemini):
+    """
+    The `Gemini` model used by the agents.
+
+    Every request is recorded as a span carrying the request size and the
+    token counts reported in the response's usage metadata, so slow or
+    expensive turns can be attributed to the model call rather than to the
+    callbacks or tools around it.
+
+    With `CONTEXT_CACHE_ENABLED`, the static system instruction and tool
+    declarations are served from a Gemini context cache instead of being
+    sent with every request.
+
+    All instances share the pooled client from `get_model_client`, and each
+    request waits for a slot of the adaptive concurrency limit, which also
+    paces its retries (see `model_pool.py`). Retries follow
+    `ModelAccessPolicy`, so `retry_options` is not used, and each attempt
+    sends a fresh copy of the request.
+    """
+
+    @property
+    def api_client(self) -> Any:
+        # Not cached on the instance like in `Gemini`: the agents outlive
+        # the event loop a client's connection pool is bound to, so the
+        # pool hands out the client for the running loop.
+        return get_model_client(self._tracking_headers())
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        tracer = get_tracer()
+
+        if tracer is None:
+            async for llm_response in self._generate(llm_request, stream, None):
+                yield llm_response
+            return
+
+        # The span is not made current: it stays open across `yield`s, which
+        # may resume in a different context.
+        current_span = tracer.start_span("model.generate_content")
+        inline_bytes, text_bytes = measure_contents(llm_request.contents)
+
+        set_attributes(
+            current_span,
+            model=llm_request.model or self.model,
+            stream=stream,
+            contents=len(llm_request.contents),
+            request_inline_bytes=inline_bytes,
+            request_text_bytes=text_bytes,
+        )
+
+        responses = 0
+        try:
+            async for llm_response in self._generate(
+                llm_request, stream, current_span
+            ):
+                responses += 1
+                usage = llm_response.usage_metadata
+
+                if usage is not None:
+                    set_attributes(
+                        current_span,
+                        prompt_tokens=usage.prompt_token_count,
+                        cached_tokens=usage.cached_content_token_count,
+                        output_tokens=usage.candidates_token_count,
+                        thoughts_tokens=usage.thoughts_token_count,
+                        total_tokens=usage.total_token_count,
+                    )
+
+                yield llm_response
+
+        except Exception as e:
+            record_error(current_span, e)
+            raise
+
+        finally:
+            set_attributes(current_span, responses=responses)
+            current_span.end()
+
+    async def _generate(
+        self, llm_request: LlmRequest, stream: bool, current_span: Any
+    ) -> AsyncGenerator[LlmResponse, None]:
+        generate_content = super().generate_content_async
+
+        def attempt() -> AsyncGenerator[LlmResponse, None]:
+            return generate_content(_attempt_request(llm_request), stream)
+
+        generate = functools.partial(generate_with_limits, attempt, current_span)
+
+        manager = None
+        applied = None
+
+        if CONTEXT_CACHE_ENABLED:
+            manager = get_context_cache_manager(self.api_client)
+            applied = await manager.apply(llm_request)
+
+        if applied is None:
+            async for llm_response in generate():
+                yield llm_response
+            return
+
+        responded = False
+        try:
+            async for llm_response in generate():
+                responded = True
+                yield llm_response
+
+        except ClientError as e:
+            # The cached content may have expired or been deleted remotely.
+            # Fall back to sending the full prefix once; the cache is
+            # recreated on the next request.
+            if responded or e.code not in (400, 403, 404):
+                raise
+
+            logger.warning(
+                "Request with context cache %s failed, retrying without it: %s",
+                llm_request.config.cached_content,
+                e,
+            )
+            manager.restore(llm_request, applied)
+
+            async for llm_response in generate():
+                yield llm_response
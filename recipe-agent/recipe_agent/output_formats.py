@@ -0,0 +1,184 @@
+import html
+import json
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from .config import DOCUMENT_DEFAULT_FORMAT, DOCUMENT_IMAGE_URL_TEMPLATE
+from .templates import DISCLAIMER_TEXT
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """
+    A backend that `generate_recipe_document` can deliver a recipe in.
+
+    Text backends build the document in-process with `render(recipe,
+    image_url)` in well under a millisecond, and reference the recipe image
+    by URL instead of embedding it. The PDF backend has no `render`: it is
+    laid out by ReportLab on the render executor.
+    """
+
+    name: str
+    label: str
+    mime_type: str
+    extension: str
+    render: Callable[[Dict[str, Any], str], str] | None = None
+
+    @property
+    def is_text(self) -> bool:
+        return self.render is not None
+
+
+def recipe_image_url(image_artifact_id: str) -> str:
+    """Where text documents point clients for the recipe image."""
+    return DOCUMENT_IMAGE_URL_TEMPLATE.format(artifact_id=image_artifact_id)
+
+
+def render_recipe_markdown(recipe: Dict[str, Any], image_url: str) -> str:
+    ingredients = "\n".join(f"- {item}" for item in recipe["ingredients"])
+    method = "\n".join(
+        f"{i}. {step}" for i, step in enumerate(recipe["method"], start=1)
+    )
+    disclaimer = (
+        DISCLAIMER_TEXT
+        .replace("<b>", "**")
+        .replace("</b>", "**")
+        .replace("\n", " ")
+    )
+
+    return (
+        f"# {recipe['recipe_name']}\n\n"
+        f"![{recipe['recipe_name']}]({image_url})\n\n"
+        f"**Preparation Time:** {recipe['prep_time']} | "
+        f"**Serves:** {recipe['serves']} | "
+        f"**Cooking Time:** {recipe['cook_time']}\n\n"
+        f"## Description\n\n{recipe['description']}\n\n"
+        f"## Ingredients\n\n{ingredients}\n\n"
+        f"## Preparation Steps\n\n{method}\n\n"
+        f"> {disclaimer}\n"
+    )
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ margin: 0; font: 16px/1.5 system-ui, -apple-system, sans-serif; color: #222; }}
+main {{ max-width: 52rem; margin: 0 auto; padding: 1rem; }}
+.hero {{ width: 100%; max-height: 28rem; object-fit: cover; border-radius: .5rem; }}
+h1 {{ text-align: center; margin: 1rem 0 .5rem; }}
+.meta {{ display: flex; flex-wrap: wrap; justify-content: center; gap: .5rem 2rem; padding: 0; list-style: none; }}
+.disclaimer {{ margin-top: 2rem; padding: .75rem 1rem; font-size: .85rem; background: #fff8cc; border: 1px solid #ddd; }}
+@media (min-width: 48rem) {{
+  .ingredients {{ columns: 2; }}
+}}
+</style>
+</head>
+<body>
+<main>
+<img class="hero" src="{image_url}" alt="{title}">
+<h1>{title}</h1>
+<ul class="meta">
+<li><b>Preparation Time:</b> {prep_time}</li>
+<li><b>Serves:</b> {serves}</li>
+<li><b>Cooking Time:</b> {cook_time}</li>
+</ul>
+<h2>Description</h2>
+<p>{description}</p>
+<h2>Ingredients</h2>
+<ul class="ingredients">
+{ingredients}
+</ul>
+<h2>Preparation Steps</h2>
+<ol>
+{method}
+</ol>
+<p class="disclaimer">{disclaimer}</p>
+</main>
+</body>
+</html>
+"""
+
+
+def render_recipe_html(recipe: Dict[str, Any], image_url: str) -> str:
+    escape = html.escape
+
+    return _HTML_TEMPLATE.format(
+        title=escape(recipe["recipe_name"]),
+        image_url=escape(image_url),
+        prep_time=escape(recipe["prep_time"]),
+        serves=escape(recipe["serves"]),
+        cook_time=escape(recipe["cook_time"]),
+        description=escape(recipe["description"]),
+        ingredients="\n".join(
+            f"<li>{escape(item)}</li>" for item in recipe["ingredients"]
+        ),
+        method="\n".join(
+            f"<li>{escape(step)}</li>" for step in recipe["method"]
+        ),
+        disclaimer=DISCLAIMER_TEXT,
+    )
+
+
+def render_recipe_json(recipe: Dict[str, Any], image_url: str) -> str:
+    """Renders the recipe as a schema.org `Recipe` object."""
+    document = {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": recipe["recipe_name"],
+        "description": recipe["description"],
+        "image": image_url,
+        "prepTime": recipe["prep_time"],
+        "cookTime": recipe["cook_time"],
+        "recipeYield": recipe["serves"],
+        "recipeIngredient": list(recipe["ingredients"]),
+        "recipeInstructions": [
+            {"@type": "HowToStep", "position": i, "text": step}
+            for i, step in enumerate(recipe["method"], start=1)
+        ],
+    }
+
+    return json.dumps(document, ensure_ascii=False, indent=2)
+
+
+OUTPUT_FORMATS: Dict[str, OutputFormat] = {
+    output_format.name: output_format
+    for output_format in (
+        OutputFormat("pdf", "PDF", "application/pdf", "pdf"),
+        OutputFormat("html", "HTML", "text/html", "html", render_recipe_html),
+        OutputFormat(
+            "markdown", "Markdown", "text/markdown", "md", render_recipe_markdown
+        ),
+        OutputFormat(
+            "json", "JSON", "application/ld+json", "json", render_recipe_json
+        ),
+    )
+}
+
+if DOCUMENT_DEFAULT_FORMAT not in OUTPUT_FORMATS:
+    logger.warning(
+        "Unknown DOCUMENT_DEFAULT_FORMAT %r, using 'pdf'.",
+        DOCUMENT_DEFAULT_FORMAT,
+    )
+
+DEFAULT_OUTPUT_FORMAT = (
+    DOCUMENT_DEFAULT_FORMAT
+    if DOCUMENT_DEFAULT_FORMAT in OUTPUT_FORMATS
+    else "pdf"
+)
+
+# Clients that cannot show PDFs inline (web and mobile) set this session
+# state key when they create the session, e.g. to "html".
+PREFERRED_OUTPUT_FORMAT_STATE_KEY = "preferred_output_format"
+
+
+def get_output_format(name: str) -> OutputFormat | None:
+    return OUTPUT_FORMATS.get(name)
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Any, Dict
+
+from .config import RENDER_CACHE_MAX_ENTRIES, RENDER_CACHE_MAX_BYTES
+from .config import RENDER_CACHE_DIR, RENDER_CACHE_DISK_MAX_BYTES
+from .config import PDF_IMAGE_DPI, PDF_IMAGE_JPEG_QUALITY
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+# Bump when a change to the layout code changes the documents it renders, so
+# that renders cached on disk by an earlier version are not served.
+RENDER_FORMAT_VERSION = 1
+
+
+def make_render_key(
+    recipe: Dict[str, Any],
+    image_hash: str,
+    template: str
+) -> str:
+    payload = json.dumps(
+        {
+            "recipe": recipe,
+            "image": image_hash,
+            "template": template,
+            "render": {
+                "version": RENDER_FORMAT_VERSION,
+                "image_dpi": PDF_IMAGE_DPI,
+                "image_quality": PDF_IMAGE_JPEG_QUALITY,
+            },
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered documents.
+
+    Entries are kept in an in-memory LRU bounded both by entry count and by
+    total bytes. When `disk_dir` is set, every entry is also written to disk
+    (bounded by `disk_max_bytes`, evicting the least recently used files) so
+    that renders survive restarts and are shared between worker processes.
+    The directory is scanned once, when the cache is created; after that its
+    size is tracked as files are written, read and evicted, so each process
+    only accounts for the files it has seen.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: str | None = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._disk_files: OrderedDict[str, int] = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+
+            if len(data) > self.max_bytes:
+                return
+
+            self._entries[key] = data
+            self._size += len(data)
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._size > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.bin")
+
+    def _scan_disk(self) -> None:
+        files = []
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".bin"):
+                    continue
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._disk_files[key] = size
+            self._disk_size += size
+
+    def _track_disk_file(self, key: str, size: int) -> None:
+        evicted = []
+
+        with self._lock:
+            self._disk_size += size - self._disk_files.pop(key, 0)
+            self._disk_files[key] = size
+
+            while self._disk_size > self.disk_max_bytes:
+                evicted_key, evicted_size = self._disk_files.popitem(last=False)
+                self._disk_size -= evicted_size
+                evicted.append(evicted_key)
+
+        for evicted_key in evicted:
+            try:
+                os.remove(self._disk_path(evicted_key))
+            except FileNotFoundError:
+                pass
+
+    def _read_disk(self, key: str) -> bytes | None:
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+
+        except FileNotFoundError:
+            with self._lock:
+                self._disk_size -= self._disk_files.pop(key, 0)
+            return None
+
+        self._track_disk_file(key, len(data))
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._disk_path(key))
+
+        self._track_disk_file(key, len(data))
+
+    async def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        if self.disk_dir:
+            data = await asyncio.to_thread(self._read_disk, key)
+            if data is not None:
+                self._remember(key, data)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, data)
+            except OSError as e:
+                logger.warning("Failed to persist rendered document: %s", e)
+
+
+_render_cache: RenderCache | None = None
+
+
+def get_render_cache() -> RenderCache:
+    global _render_cache
+
+    if _render_cache is None:
+        _render_cache = RenderCache(
+            max_entries=RENDER_CACHE_MAX_ENTRIES,
+            max_bytes=RENDER_CACHE_MAX_BYTES,
+            disk_dir=RENDER_CACHE_DIR or None,
+            disk_max_bytes=RENDER_CACHE_DISK_MAX_BYTES,
+        )
+    return _render_cache
@@ -0,0 +1,266 @@
+import asyncio
+import functools
+import json
+import logging
+import uuid
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Dict, Hashable, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai.types import Part
+
+from .artifacts import SessionArtifacts, record_saved_artifacts
+from .config import CALLBACK_CACHE_MAX_SESSIONS
+from .session_cache import SessionCache, session_key
+from .tracing import set_attributes, span
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+RENDER_JOBS_STATE_KEY = "render_jobs"
+
+
+def render_job_artifact_id(artifact_id: str) -> str:
+    return f"{artifact_id}.render_job.json"
+
+
+# Running tasks by session key and artifact ID. They are never evicted, and
+# this is also what keeps them alive: the event loop only holds weak
+# references to its tasks.
+_running_jobs: Dict[Tuple[Hashable, str], asyncio.Task] = {}
+
+
+@dataclass
+class _SessionJobs:
+    # Records of finished jobs not yet collected, by artifact ID. Losing one
+    # is safe: it was saved through the artifact service (see `_run_job`).
+    records: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+_finished_jobs = SessionCache(
+    _SessionJobs,
+    max_sessions=CALLBACK_CACHE_MAX_SESSIONS
+)
+
+
+def _finish_job(
+    key: Tuple[Hashable, str],
+    job_id: str,
+    session_jobs: _SessionJobs,
+    task: asyncio.Task
+) -> None:
+    if _running_jobs.get(key) is task:
+        del _running_jobs[key]
+
+    if task.cancelled():
+        return
+
+    if task.exception() is not None:
+        # Only reached when the job record itself could not be saved.
+        logger.warning(
+            "Render job %s failed: %s", task.get_name(), task.exception()
+        )
+        record = {
+            "job_id": job_id,
+            "result": {
+                "status": "error",
+                "message": f"Failed to render the document: {task.exception()}",
+            },
+            "artifact_versions": {},
+        }
+
+    else:
+        record = task.result()
+
+    session_jobs.records[key[1]] = record
+
+
+async def _run_job(
+    job_id: str,
+    artifact_id: str,
+    artifacts: SessionArtifacts,
+    job: Coroutine[Any, Any, Dict[str, Any]],
+) -> Dict[str, Any]:
+    try:
+        result = await job
+
+    except Exception as e:
+        logger.warning("Render job for %s failed: %s", artifact_id, e)
+        result = {
+            "status": "error",
+            "message": f"Failed to render the document: {e}",
+        }
+
+    record = {
+        "job_id": job_id,
+        "result": result,
+        "artifact_versions": dict(artifacts.saved),
+        "deleted_artifacts": sorted(artifacts.deleted),
+    }
+
+    await artifacts.save(
+        render_job_artifact_id(artifact_id),
+        Part.from_bytes(
+            data=json.dumps(record).encode("utf-8"),
+            mime_type="application/json"
+        )
+    )
+
+    return record
+
+
+def schedule_render_job(
+    callback_context: CallbackContext,
+    artifact_id: str,
+    artifacts: SessionArtifacts,
+    job: Coroutine[Any, Any, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Runs `job` in the background and returns a pending handle for it.
+
+    The job must return the tool response to report when it is collected
+    (see `get_render_job`), and save everything it produces through
+    `artifacts` rather than the tool's context, which is no longer valid
+    once the tool has returned. Its result is stored through the artifact
+    service as well, next to the document. The task itself is process-local,
+    so deferred rendering needs a server whose event loop outlives the
+    invocation (e.g. `adk web` or `adk api_server`). A job already running
+    for the same artifact is cancelled.
+    """
+    key = (session_key(callback_context), artifact_id)
+
+    previous = _running_jobs.get(key)
+    if previous is not None:
+        previous.cancel()
+
+    job_id = uuid.uuid4().hex
+    task = asyncio.get_running_loop().create_task(
+        _run_job(job_id, artifact_id, artifacts, job),
+        name=f"render:{artifact_id}"
+    )
+    task.add_done_callback(functools.partial(
+        _finish_job,
+        key,
+        job_id,
+        _finished_jobs.get(callback_context)
+    ))
+    _running_jobs[key] = task
+
+    pending = {
+        "status": "pending",
+        "message": (
+            "The document is being rendered in the background. Call "
+            "`get_document_status` with this artifact ID before sharing "
+            "its content."
+        ),
+        "generated_file_artifact_id": artifact_id,
+    }
+
+    jobs = callback_context.state.get(RENDER_JOBS_STATE_KEY, {})
+    callback_context.state[RENDER_JOBS_STATE_KEY] = {
+        **jobs,
+        artifact_id: {**pending, "job_id": job_id},
+    }
+
+    return pending
+
+
+async def _load_job_record(
+    callback_context: CallbackContext,
+    artifact_id: str,
+    job_id: str,
+) -> Dict[str, Any] | None:
+    record = _finished_jobs.get(callback_context).records.pop(artifact_id, None)
+
+    if record is None:
+        artifact = await callback_context.load_artifact(
+            filename=render_job_artifact_id(artifact_id)
+        )
+
+        if artifact is None or not artifact.inline_data:
+            return None
+
+        record = json.loads(artifact.inline_data.data)
+
+    # Left behind by an earlier render of the same document.
+    if record.get("job_id") != job_id:
+        return None
+
+    return record
+
+
+async def get_render_job(
+    callback_context: CallbackContext,
+    artifact_id: str,
+    timeout: float | None = 0,
+) -> Dict[str, Any] | None:
+    """
+    Returns the status of the render job for `artifact_id`, or None if no
+    job was scheduled for it.
+
+    A pending job is awaited for up to `timeout` seconds (None waits until it
+    finishes, 0 only polls). The result of a finished job is read from the
+    artifact service, and recorded on the calling tool's or callback's event
+    together with the artifacts the job saved, so that they are persisted
+    with the session like any other change.
+    """
+    jobs = callback_context.state.get(RENDER_JOBS_STATE_KEY, {})
+    job = jobs.get(artifact_id)
+
+    if job is None or job["status"] != "pending":
+        return job
+
+    task = _running_jobs.get((session_key(callback_context), artifact_id))
+
+    with span(
+        "render_job.wait",
+        artifact_id=artifact_id,
+        timeout=-1 if timeout is None else timeout,
+    ) as current_span:
+        if task is not None:
+            # Failures are recorded by `_finish_job`.
+            done, _ = await asyncio.wait([task], timeout=timeout)
+
+            if not done:
+                set_attributes(current_span, finished=False)
+                return {k: v for k, v in job.items() if k != "job_id"}
+
+            # Let `_finish_job` run before its record is looked up.
+            await asyncio.sleep(0)
+
+        # Jobs scheduled by another process, or whose session was evicted
+        # from `_finished_jobs`, are read back from the artifact service.
+        record = await _load_job_record(
+            callback_context,
+            artifact_id,
+            job.get("job_id")
+        )
+
+        if record is None:
+            result = {
+                "status": "error",
+                "message": (
+                    "The document was not rendered because the server "
+                    "restarted. Please generate it again."
+                ),
+            }
+
+        else:
+            result = record["result"]
+            record_saved_artifacts(
+                callback_context,
+                record["artifact_versions"],
+                record.get("deleted_artifacts", ())
+            )
+
+        set_attributes(current_span, finished=True, status=result["status"])
+
+    jobs = callback_context.state.get(RENDER_JOBS_STATE_KEY, {})
+    callback_context.state[RENDER_JOBS_STATE_KEY] = {
+        **jobs,
+        artifact_id: result,
+    }
+
+    return result
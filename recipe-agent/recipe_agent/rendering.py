@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import warnings
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+from .config import RENDER_EXECUTOR_KIND, RENDER_MAX_WORKERS
+from .config import RENDER_MAX_PENDING, RENDER_TIMEOUT_SECONDS
+from .config import RENDER_PROCESS_START_METHOD, RENDER_QUEUE_TIMEOUT_SECONDS
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+class RenderError(RuntimeError):
+    pass
+
+
+class RenderQueueFullError(RenderError):
+    pass
+
+
+class RenderTimeoutError(RenderError):
+    def __init__(self, message: str, job: Future):
+        super().__init__(message)
+        # Done once the timed-out job has really stopped running.
+        self.job = job
+
+
+# Render jobs are submitted through these wrappers so that ReportLab is only
+# imported where, and when, a document is actually rendered.
+def render_recipe_pdf(
+    recipe: Dict[str, Any],
+    image_bytes: bytes,
+    template_name: str,
+    output_path: str | None = None,
+) -> bytes | None:
+    from .documents import build_recipe_pdf
+    return build_recipe_pdf(recipe, image_bytes, template_name, output_path)
+
+
+def render_cookbook_pdf(
+    title: str,
+    recipes: List[Dict[str, Any]],
+    images: Dict[str, bytes],
+    template_name: str,
+    output_path: str | None = None,
+) -> bytes | None:
+    from .documents import build_cookbook_pdf
+    return build_cookbook_pdf(title, recipes, images, template_name, output_path)
+
+
+def prepare_cookbook_image(image_bytes: bytes, template_name: str) -> bytes:
+    from .documents import prepare_cookbook_image
+    return prepare_cookbook_image(image_bytes, template_name)
+
+
+class RenderExecutor:
+    """
+    Runs CPU-bound rendering jobs off the event loop.
+
+    Jobs are dispatched to a process pool (or a thread pool when processes are
+    unavailable or explicitly configured). The number of jobs that are either
+    running or waiting for a worker is capped at `max_workers + max_pending`.
+    Submissions beyond that wait, in arrival order, for up to `queue_timeout`
+    seconds for a job to finish and are rejected after that instead of
+    queueing unboundedly. Every submitted job is awaited for at most `timeout`
+    seconds.
+
+    A job keeps its slot until it has really stopped, not just until its
+    caller gave up on it. When a job times out in a process pool, the pool is
+    replaced and its workers are terminated, which also fails the other jobs
+    still running in it. A render thread cannot be stopped, so a timed-out
+    job in a thread pool runs to completion while holding its slot.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: int = 2,
+        max_pending: int = 8,
+        timeout: float = 30.0,
+        start_method: str = "spawn",
+        queue_timeout: float = 30.0,
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.start_method = start_method
+        self.queue_timeout = queue_timeout
+
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _create_executor(self) -> Executor:
+        if self.kind == "process":
+            try:
+                return ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            except (ImportError, NotImplementedError, OSError, ValueError) as e:
+                logger.warning(
+                    "Process pool unavailable (%s), rendering in threads.", e
+                )
+                self.kind = "thread"
+
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="recipe-render",
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _reset_executor(self, executor: Executor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle_executor(self, executor: ProcessPoolExecutor) -> None:
+        # Shutting the pool down does not stop the jobs it is running, so its
+        # workers are terminated as well. The jobs still in it then fail with
+        # BrokenProcessPool, which releases their slots.
+        processes = list((executor._processes or {}).values())
+
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+        for process in processes:
+            process.terminate()
+
+    def _grant(self) -> None:
+        while self._waiters and self._in_flight < self.max_workers + self.max_pending:
+            loop, waiter = self._waiters.popleft()
+            self._in_flight += 1
+            loop.call_soon_threadsafe(_resolve_waiter, waiter)
+
+    def _release(self, _future=None) -> None:
+        # Called from executor threads when a job finishes.
+        with self._lock:
+            self._in_flight -= 1
+            self._grant()
+
+    async def _acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if (
+                not self._waiters
+                and self._in_flight < self.max_workers + self.max_pending
+            ):
+                self._in_flight += 1
+                return
+
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+
+                except ValueError:
+                    # The slot was granted just before the wait ended.
+                    self._in_flight -= 1
+                    self._grant()
+
+            if isinstance(e, asyncio.TimeoutError):
+                raise RenderQueueFullError(
+                    "The document renderer is busy. Please try again shortly."
+                ) from None
+            raise
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        await self._acquire()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._release()
+            self._reset_executor(executor)
+            raise RenderError(f"The document renderer is unavailable: {e}")
+
+        # The slot is freed when the job really finishes (or is cancelled
+        # while still queued), not when the caller stops waiting for it.
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=self.timeout,
+            )
+
+        except asyncio.TimeoutError:
+            if not future.cancel() and isinstance(executor, ProcessPoolExecutor):
+                self._recycle_executor(executor)
+
+            raise RenderTimeoutError(
+                f"Rendering did not finish within {self.timeout:g} seconds.",
+                future
+            )
+
+        except BrokenProcessPool as e:
+            self._reset_executor(executor)
+            raise RenderError(f"The document renderer crashed: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _resolve_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_render_executor: RenderExecutor | None = None
+
+
+def get_render_executor() -> RenderExecutor:
+    global _render_executor
+
+    if _render_executor is None:
+        _render_executor = RenderExecutor(
+            kind=RENDER_EXECUTOR_KIND,
+            max_workers=RENDER_MAX_WORKERS,
+            max_pending=RENDER_MAX_PENDING,
+            timeout=RENDER_TIMEOUT_SECONDS,
+            start_method=RENDER_PROCESS_START_METHOD,
+            queue_timeout=RENDER_QUEUE_TIMEOUT_SECONDS,
+        )
+    return _render_executor
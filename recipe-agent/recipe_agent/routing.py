@@ -0,0 +1,174 @@
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Sequence
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+from google.genai.types import Content, ThinkingConfig
+
+from .config import ROUTER_ENABLED, ROUTER_FAST_MODEL
+from .config import ROUTER_FAST_THINKING_BUDGET, ROUTER_MAX_CLARIFICATION_CHARS
+from .config import ROUTER_MAX_CLARIFICATION_TURNS
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+PHASE_CLARIFICATION = "clarification"
+PHASE_IMAGE_ANALYSIS = "image_analysis"
+PHASE_SYNTHESIS = "synthesis"
+
+ROUTING_STATE_KEY = "model_routing"
+
+
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """
+    How turns are routed between the fast and the full model configuration.
+
+    Clarification turns go to `fast_model` (the agent's own model when empty).
+    Their thinking config is only replaced when `fast_model` or
+    `fast_thinking_budget` is set: thoughts are left out of the response and
+    the budget is `fast_thinking_budget`, or the fast model's default when it
+    is None. Not every model accepts a budget of 0. Every other phase keeps
+    the agent's model and planner settings.
+    """
+
+    enabled: bool = True
+    fast_model: str = ""
+    fast_thinking_budget: int | None = None
+    max_clarification_turns: int = 4
+    max_clarification_chars: int = 400
+
+
+DEFAULT_ROUTING_POLICY = RoutingPolicy(
+    enabled=ROUTER_ENABLED,
+    fast_model=ROUTER_FAST_MODEL,
+    fast_thinking_budget=ROUTER_FAST_THINKING_BUDGET,
+    max_clarification_turns=ROUTER_MAX_CLARIFICATION_TURNS,
+    max_clarification_chars=ROUTER_MAX_CLARIFICATION_CHARS,
+)
+
+
+def is_user_turn(content: Content) -> bool:
+    return content.role == "user" and any(
+        not part.function_response for part in content.parts or []
+    )
+
+
+def _has_image(content: Content) -> bool:
+    return any(
+        part.inline_data
+        and (part.inline_data.mime_type or "").startswith("image/")
+        for part in content.parts or []
+    )
+
+
+def classify_phase(
+    contents: Sequence[Content],
+    policy: RoutingPolicy = DEFAULT_ROUTING_POLICY
+) -> str:
+    """
+    Classifies the phase of the conversation a model request belongs to.
+
+    Args:
+        contents (Sequence[Content]): The request history, oldest first.
+        policy (RoutingPolicy): Limits that bound the clarification phase.
+
+    Returns:
+        str: `PHASE_IMAGE_ANALYSIS` when the current user message carries an
+        image; `PHASE_SYNTHESIS` once tools are being called in the current
+        turn, the user has answered more than `max_clarification_turns`
+        follow-up questions since the last image, or the current message is
+        longer than `max_clarification_chars`; otherwise
+        `PHASE_CLARIFICATION`.
+    """
+    user_turn_indexes = [
+        idx for idx, content in enumerate(contents) if is_user_turn(content)
+    ]
+
+    if not user_turn_indexes:
+        return PHASE_SYNTHESIS
+
+    current_idx = user_turn_indexes[-1]
+    current = contents[current_idx]
+
+    if _has_image(current):
+        return PHASE_IMAGE_ANALYSIS
+
+    if any(
+        part.function_call or part.function_response
+        for content in contents[current_idx + 1:]
+        for part in content.parts or []
+    ):
+        return PHASE_SYNTHESIS
+
+    turns_since_image = 0
+    for idx in reversed(user_turn_indexes):
+        if _has_image(contents[idx]):
+            break
+        turns_since_image += 1
+
+    if turns_since_image > policy.max_clarification_turns:
+        return PHASE_SYNTHESIS
+
+    text_chars = sum(len(part.text or "") for part in current.parts or [])
+    if text_chars > policy.max_clarification_chars:
+        return PHASE_SYNTHESIS
+
+    return PHASE_CLARIFICATION
+
+
+def route_request(
+    llm_request: LlmRequest,
+    callback_context: CallbackContext,
+    policy: RoutingPolicy = DEFAULT_ROUTING_POLICY
+) -> str:
+    """
+    Classifies `llm_request` and points clarification turns at the fast
+    model configuration. The decision, including whether the thinking config
+    was replaced, is recorded in the session state under `model_routing`,
+    with a running count of requests per phase.
+
+    Returns:
+        str: The phase the request was classified as.
+    """
+    phase = classify_phase(llm_request.contents, policy)
+    thinking_overridden = False
+
+    if policy.enabled and phase == PHASE_CLARIFICATION:
+        if policy.fast_model:
+            llm_request.model = policy.fast_model
+
+        if (
+            (policy.fast_model or policy.fast_thinking_budget is not None)
+            and llm_request.config is not None
+        ):
+            llm_request.config.thinking_config = ThinkingConfig(
+                include_thoughts=False,
+                thinking_budget=policy.fast_thinking_budget,
+            )
+            thinking_overridden = True
+
+    routing = callback_context.state.get(ROUTING_STATE_KEY) or {}
+    phases = dict(routing.get("phases", {}))
+    phases[phase] = phases.get(phase, 0) + 1
+
+    callback_context.state[ROUTING_STATE_KEY] = {
+        "phase": phase,
+        "model": llm_request.model,
+        "thinking_overridden": thinking_overridden,
+        "thinking_budget": (
+            policy.fast_thinking_budget if thinking_overridden else None
+        ),
+        "phases": phases,
+    }
+
+    logger.debug(
+        "Routed %s request to %s (thinking %s).",
+        phase,
+        llm_request.model,
+        f"budget {policy.fast_thinking_budget}" if thinking_overridden else "unchanged",
+    )
+    return phase
@@ -0,0 +1,501 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import warnings
+from typing import Any, Dict
+
+from google.adk.agents import BaseAgent
+from google.adk.events import EventActions
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .accounting import USAGE_STATE_KEY, merge_branch_usage
+from .config import SEARCH_CACHE_ENABLED, SEARCH_CACHE_PATH
+from .config import SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+_NON_WORD_PATTERN = re.compile(r"[^\w\s]+")
+
+# Bump when `normalize_query` changes, so that results cached under the old
+# keys are not served for queries they no longer match.
+SEARCH_CACHE_KEY_VERSION = 2
+
+
+def normalize_query(query: str) -> str:
+    """
+    Folds a search request into its cache key.
+
+    Only case, accents, punctuation and whitespace are folded away, so that
+    near-repeats such as "Substitute for buttermilk?" and "substitute for
+    Buttermilk" share one cache entry. Every word is kept, in order: small
+    words such as "with", "or" and "without" change what a culinary query
+    asks for.
+
+    Args:
+        query (str): The raw search request.
+
+    Returns:
+        str: The normalized query.
+    """
+    query = unicodedata.normalize("NFKD", query)
+    query = "".join(c for c in query if not unicodedata.combining(c))
+    query = _NON_WORD_PATTERN.sub("", query.casefold())
+
+    return " ".join(query.split())
+
+
+class SearchCache:
+    """
+    SQLite-backed cache of web search results.
+
+    Entries expire `ttl_seconds` after they were stored. Once the table holds
+    more than `max_entries` rows, the least recently used ones are evicted.
+    Every entry records how often it was served, so popular lookups can be
+    inspected with `stats()`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 5000,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    query_key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_hit_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS search_results_last_hit_at
+                ON search_results (last_hit_at)
+                """
+            )
+            connection.commit()
+            self._connection = connection
+
+        return self._connection
+
+    def _get(self, query_key: str) -> Any | None:
+        now = time.time()
+
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT result, created_at FROM search_results "
+                "WHERE query_key = ?",
+                (query_key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            result, created_at = row
+
+            if now - created_at > self.ttl_seconds:
+                connection.execute(
+                    "DELETE FROM search_results WHERE query_key = ?",
+                    (query_key,)
+                )
+                connection.commit()
+                self.misses += 1
+                return None
+
+            connection.execute(
+                "UPDATE search_results "
+                "SET hit_count = hit_count + 1, last_hit_at = ? "
+                "WHERE query_key = ?",
+                (now, query_key)
+            )
+            connection.commit()
+            self.hits += 1
+
+        return json.loads(result)
+
+    def _put(self, query_key: str, query: str, result: Any) -> None:
+        now = time.time()
+
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO search_results "
+                "(query_key, query, result, created_at, last_hit_at, hit_count) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (query_key, query, json.dumps(result), now, now)
+            )
+            connection.execute(
+                "DELETE FROM search_results WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+            connection.execute(
+                "DELETE FROM search_results WHERE query_key IN ("
+                "SELECT query_key FROM search_results "
+                "ORDER BY last_hit_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            connection.commit()
+
+    async def get(self, query_key: str) -> Any | None:
+        return await asyncio.to_thread(self._get, query_key)
+
+    async def put(self, query_key: str, query: str, result: Any) -> None:
+        await asyncio.to_thread(self._put, query_key, query, result)
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            connection = self._connect()
+            entries = connection.execute(
+                "SELECT COUNT(*) FROM search_results"
+            ).fetchone()[0]
+            popular = connection.execute(
+                "SELECT query, hit_count FROM search_results "
+                "ORDER BY hit_count DESC LIMIT ?",
+                (top,)
+            ).fetchall()
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "popular_queries": [
+                    {"query": query, "hit_count": hit_count}
+                    for query, hit_count in popular
+                ],
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_search_cache: SearchCache | None = None
+
+
+def get_search_cache() -> SearchCache:
+    global _search_cache
+
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            path=SEARCH_CACHE_PATH,
+            ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+            max_entries=SEARCH_CACHE_MAX_ENTRIES,
+        )
+    return _search_cache
+
+
+class CachedAgentTool(AgentTool):
+    """An `AgentTool` that serves repeated requests from a `SearchCache`."""
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        cache: SearchCache | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(agent=agent, **kwargs)
+        self.cache = cache
+
+    async def run_async(
+        self,
+        *,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+    ) -> Any:
+        if not SEARCH_CACHE_ENABLED and self.cache is None:
+            return await super().run_async(args=args, tool_context=tool_context)
+
+        cache = self.cache or get_search_cache()
+        query = str(args.get("request", ""))
+        query_key = (
+            f"{self.name}:v{SEARCH_CACHE_KEY_VERSION}:{normalize_query(query)}"
+        )
+
+        try:
+            result = await cache.get(query_key)
+        except sqlite3.Error as e:
+            logger.warning("Search cache lookup failed: %s", e)
+            result = None
+
+        if result is not None:
+            logger.debug("Search cache hit for %r", query_key)
+            return result
+
+        result = await super().run_async(args=args, tool_context=tool_context)
+
+        if result:
+            try:
+                await cache.put(query_key, query, result)
+            except sqlite3.Error as e:
+                logger.warning("Failed to cache search result: %s", e)
+
+        return result
+
+
+class BatchWebSearchTool(BaseTool):
+    """
+    Runs several web search requests concurrently in a single tool call.
+
+    Each query goes through `search_tool` (normally the cached web search
+    `AgentTool`), at most `max_concurrency` at a time and each bounded by
+    `timeout` seconds. Failed or timed out queries are reported alongside the
+    successful ones instead of failing the whole batch.
+
+    Each query runs against its own snapshot of the session state (see
+    `_branch_tool_context`). Their state and artifact changes are applied to
+    the session once the batch finishes, with model usage added up rather
+    than overwritten by whichever search finished last.
+    """
+
+    def __init__(
+        self,
+        search_tool: BaseTool,
+        max_concurrency: int = 3,
+        timeout: float = 45.0,
+        max_queries: int = 5,
+    ):
+        super().__init__(
+            name="batch_web_search",
+            description=(
+                "Runs several independent web searches at once and returns a "
+                "merged, de-duplicated summary. Use this instead of calling "
+                f"`{search_tool.name}` repeatedly when a recipe needs more "
+                "than one lookup (e.g. authentic method, a substitute and a "
+                "chef's style)."
+            ),
+        )
+        self.search_tool = search_tool
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_queries = max_queries
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "queries": types.Schema(
+                        type=types.Type.ARRAY,
+                        items=types.Schema(type=types.Type.STRING),
+                        description=(
+                            "Independent search requests, at most "
+                            f"{self.max_queries}."
+                        ),
+                    ),
+                },
+                required=["queries"],
+            ),
+        )
+
+    async def run_async(
+        self,
+        *,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+    ) -> Any:
+        queries = []
+        seen_queries = set()
+
+        for query in args.get("queries") or []:
+            query_key = normalize_query(str(query))
+            if query_key and query_key not in seen_queries:
+                seen_queries.add(query_key)
+                queries.append(str(query))
+
+        if not queries:
+            return {
+                "status": "error",
+                "message": "No search queries were provided.",
+            }
+
+        queries = queries[:self.max_queries]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        base_usage = tool_context.state.get(USAGE_STATE_KEY)
+        query_contexts = [_branch_tool_context(tool_context) for _ in queries]
+
+        async def run_query(query: str, query_context: ToolContext) -> Any:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    self.search_tool.run_async(
+                        args={"request": query},
+                        tool_context=query_context
+                    ),
+                    timeout=self.timeout
+                )
+
+        try:
+            responses = await asyncio.gather(
+                *(
+                    run_query(query, query_context)
+                    for query, query_context in zip(queries, query_contexts)
+                ),
+                return_exceptions=True
+            )
+
+        finally:
+            _join_tool_contexts(tool_context, query_contexts, base_usage)
+
+        results = []
+        for query, response in zip(queries, responses):
+            if isinstance(response, asyncio.TimeoutError):
+                results.append({
+                    "query": query,
+                    "status": "error",
+                    "message": f"Search timed out after {self.timeout:g} seconds.",
+                })
+
+            elif isinstance(response, Exception):
+                logger.warning("Search for %r failed: %s", query, response)
+                results.append({
+                    "query": query,
+                    "status": "error",
+                    "message": "Search failed.",
+                })
+
+            else:
+                results.append({
+                    "query": query,
+                    "status": "success",
+                    "result": response,
+                })
+
+        succeeded = sum(1 for result in results if result["status"] == "success")
+
+        if not succeeded:
+            status = "error"
+        elif succeeded < len(results):
+            status = "partial"
+        else:
+            status = "success"
+
+        return {
+            "status": status,
+            "summary": _merge_search_results(results),
+            "results": [
+                {k: v for k, v in result.items() if k != "result"}
+                for result in results
+            ],
+        }
+
+
+def _branch_tool_context(tool_context: ToolContext) -> ToolContext:
+    """
+    Returns a `ToolContext` for one branch of a concurrent fan-out.
+
+    It reads a private snapshot of the session state, so that a branch never
+    sees, and copies into its own results, what another branch wrote, and
+    collects its state and artifact deltas in its own `EventActions`, which
+    `_join_tool_contexts` applies to `tool_context` afterwards. This is the
+    only place that builds a tool context by hand; tests/test_search.py
+    checks that ADK still behaves the way it relies on.
+    """
+    invocation_context = tool_context._invocation_context
+    session = invocation_context.session
+
+    branch_context = invocation_context.model_copy(update={
+        "session": session.model_copy(update={"state": dict(session.state)}),
+    })
+
+    return ToolContext(
+        branch_context,
+        function_call_id=tool_context.function_call_id,
+        event_actions=EventActions(),
+    )
+
+
+def _join_tool_contexts(
+    tool_context: ToolContext,
+    forks: list[ToolContext],
+    base_usage: Dict[str, Any] | None,
+) -> None:
+    branch_usage = []
+
+    for forked in forks:
+        delta = dict(forked.actions.state_delta)
+        usage = delta.pop(USAGE_STATE_KEY, None)
+
+        if usage is not None:
+            branch_usage.append(usage)
+        if delta:
+            tool_context.state.update(delta)
+
+        tool_context.actions.artifact_delta.update(forked.actions.artifact_delta)
+        if forked.actions.skip_summarization:
+            tool_context.actions.skip_summarization = True
+
+    if branch_usage:
+        merge_branch_usage(tool_context, base_usage, branch_usage)
+
+
+def _merge_search_results(results: list[dict[str, Any]]) -> str:
+    sections = []
+    seen_lines = set()
+
+    for result in results:
+        if result["status"] != "success":
+            continue
+
+        response = result["result"]
+        if not isinstance(response, str):
+            response = json.dumps(response, ensure_ascii=False)
+
+        lines = []
+        for line in response.splitlines():
+            line_key = " ".join(line.casefold().split())
+
+            if not line_key:
+                if lines and lines[-1]:
+                    lines.append("")
+                continue
+
+            if line_key in seen_lines:
+                continue
+
+            seen_lines.add(line_key)
+            lines.append(line)
+
+        if any(lines):
+            sections.append(f"### {result['query']}\n\n" + "\n".join(lines).strip())
+
+    return "\n\n".join(sections)
@@ -0,0 +1,58 @@
+import logging
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Tuple, TypeVar
+
+from google.adk.agents.callback_context import CallbackContext
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+T = TypeVar("T")
+
+
+def session_key(callback_context: CallbackContext) -> Tuple[str, str, str]:
+    session = callback_context.session
+    return (session.app_name, session.user_id, session.id)
+
+
+class SessionCache(Generic[T]):
+    """
+    Process-local, per-session objects with LRU eviction.
+
+    Used for memoized data that does not belong in (JSON-serialisable)
+    session state. Losing an entry must always be safe, since it is rebuilt
+    by `factory` the next time the session is seen; anything that cannot be
+    rebuilt, such as a running task, does not belong here.
+    """
+
+    def __init__(self, factory: Callable[[], T], max_sessions: int = 256):
+        self.factory = factory
+        self.max_sessions = max_sessions
+
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, callback_context: CallbackContext) -> T:
+        key = session_key(callback_context)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self.factory()
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+            return entry
+
+    def discard(self, callback_context: CallbackContext) -> None:
+        with self._lock:
+            self._entries.pop(session_key(callback_context), None)
@@ -0,0 +1,137 @@
+import logging
+import warnings
+from dataclasses import dataclass
+from typing import Dict
+
+from .config import PDF_DEFAULT_TEMPLATE
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+DISCLAIMER_TEXT = """
+<b>Disclaimer:</b> This recipe is generated by an AI system for educational
+purposes only. Please use your own judgment while cooking. Always follow
+proper safety practices, check ingredient suitability and ensure correct
+procedures. The authors/developers are not responsible for any outcome
+resulting from the use of this recipe.
+""".strip()
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    """A paragraph style. Sizes are in points."""
+
+    font_size: float
+    leading: float
+    font_name: str = "Helvetica"
+    centered: bool = False
+    space_after: float = 0
+
+
+@dataclass(frozen=True)
+class DocumentTemplate:
+    """
+    Declarative layout of a recipe document.
+
+    Templates are plain data, so they can be listed and validated without
+    importing ReportLab; `documents.py` compiles each one into reusable
+    ReportLab styles the first time it is used. Spacing and margins are in
+    centimetres, image widths are fractions of the content width, and an
+    image width of 0 leaves that image out.
+    """
+
+    name: str
+    description: str
+    title: TextStyle
+    meta: TextStyle
+    section: TextStyle
+    body: TextStyle
+    disclaimer: TextStyle
+    page_margin: float = 1.5
+    hero_image_width: float = 1.0
+    side_image_width: float = 0.0
+    meta_on_one_line: bool = False
+    image_spacing: float = 0.75
+    title_spacing: float = 0.5
+    section_spacing: float = 0.6
+    heading_spacing: float = 0.2
+    step_spacing: float = 0.1
+    disclaimer_background: bool = True
+
+    @property
+    def has_images(self) -> bool:
+        return self.hero_image_width > 0 or self.side_image_width > 0
+
+
+HERO_SIDE_IMAGE = DocumentTemplate(
+    name="hero_side_image",
+    description=(
+        "Full-width photo above the title and a second copy beside the "
+        "ingredients. Best for sharing and viewing on large screens."
+    ),
+    title=TextStyle(24, 28, "Helvetica-Bold", centered=True),
+    meta=TextStyle(11, 12, centered=True),
+    section=TextStyle(16, 12, "Helvetica-Bold", space_after=8),
+    body=TextStyle(10.5, 14),
+    disclaimer=TextStyle(9.5, 13),
+    side_image_width=0.40,
+)
+
+COMPACT = DocumentTemplate(
+    name="compact",
+    description=(
+        "Single column with a small photo and tighter type. Fewer pages and "
+        "a smaller file, ideal for reading on a phone."
+    ),
+    title=TextStyle(18, 22, "Helvetica-Bold", centered=True, space_after=4),
+    meta=TextStyle(9.5, 12, centered=True),
+    section=TextStyle(13, 16, "Helvetica-Bold", space_after=4),
+    body=TextStyle(10, 13),
+    disclaimer=TextStyle(8, 10.5),
+    page_margin=1.0,
+    hero_image_width=0.6,
+    meta_on_one_line=True,
+    image_spacing=0.4,
+    title_spacing=0.25,
+    section_spacing=0.35,
+    heading_spacing=0.1,
+    step_spacing=0.05,
+)
+
+PRINT_FRIENDLY = DocumentTemplate(
+    name="print_friendly",
+    description=(
+        "Text only, in a serif typeface with no background fills. Saves ink "
+        "when printing."
+    ),
+    title=TextStyle(22, 26, "Times-Bold", centered=True),
+    meta=TextStyle(11, 13.2, "Times-Roman", centered=True),
+    section=TextStyle(15, 18, "Times-Bold", space_after=6),
+    body=TextStyle(11.5, 15, "Times-Roman"),
+    disclaimer=TextStyle(9, 12, "Times-Italic"),
+    hero_image_width=0.0,
+    disclaimer_background=False,
+)
+
+DOCUMENT_TEMPLATES: Dict[str, DocumentTemplate] = {
+    template.name: template
+    for template in (HERO_SIDE_IMAGE, COMPACT, PRINT_FRIENDLY)
+}
+
+if PDF_DEFAULT_TEMPLATE not in DOCUMENT_TEMPLATES:
+    logger.warning(
+        "Unknown PDF_DEFAULT_TEMPLATE %r, using %r.",
+        PDF_DEFAULT_TEMPLATE,
+        HERO_SIDE_IMAGE.name,
+    )
+
+DEFAULT_TEMPLATE = (
+    PDF_DEFAULT_TEMPLATE
+    if PDF_DEFAULT_TEMPLATE in DOCUMENT_TEMPLATES
+    else HERO_SIDE_IMAGE.name
+)
+
+
+def get_template(name: str) -> DocumentTemplate | None:
+    return DOCUMENT_TEMPLATES.get(name)
@@ -1,29 +1,255 @@
+import asyncio
+import hashlib
 import logging
+import os
 import warnings
-from io import BytesIO
-from dotenv import load_dotenv
-from typing import Dict
-
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm 
-from reportlab.platypus import SimpleDocTemplate, Spacer
-from reportlab.platypus import Image, Paragraph, Table, TableStyle
+from typing import Any, Callable, Coroutine, Dict
 
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+from .artifacts import SessionArtifacts, artifact_exists, load_artifact
+from .artifacts import record_saved_artifacts
+from .config import COOKBOOK_MAX_RECIPES, RENDER_DEFERRED, RENDER_STREAM_TO_FILE
+from .config import PDF_DIGEST_THUMBNAIL, PDF_DIGEST_THUMBNAIL_MAX_EDGE
+from .digest import build_cookbook_digest, build_recipe_digest, count_pdf_pages
+from .digest import count_pdf_file_pages
+from .digest import digest_artifact_id, thumbnail_artifact_id
+from .render_cache import get_render_cache, make_render_key
+from .render_jobs import get_render_job, schedule_render_job
+from .rendering import RenderError, RenderTimeoutError, get_render_executor
+from .rendering import prepare_cookbook_image
+from .rendering import render_cookbook_pdf, render_recipe_pdf
+from .output_formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS, OutputFormat
+from .output_formats import PREFERRED_OUTPUT_FORMAT_STATE_KEY
+from .output_formats import get_output_format, recipe_image_url
+from .templates import DEFAULT_TEMPLATE, DOCUMENT_TEMPLATES, get_template
+from .tracing import set_attributes, span
 
-load_dotenv()
 warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
 logger = logging.getLogger(__name__)
 
 
-def _set_pdf_metadata(canvas, doc):
-    canvas.setTitle("AI Generated Recipe")
-    canvas.setAuthor("agent-after-dark")
-    canvas.setSubject("Recipe generated from uploaded image")
+class CookbookRecipe(BaseModel):
+    """One recipe in a `generate_cookbook_document` call."""
+
+    recipe_name: str
+    description: str
+    prep_time: str
+    serves: str
+    cook_time: str
+    ingredients: list[str]
+    method: list[str]
+    recipe_image_artifact_id: str
+
+
+async def _save_document_digest(
+    artifacts: SessionArtifacts,
+    artifact_id: str,
+    digest: str,
+    recipe_image_bytes: bytes | None,
+) -> None:
+    await artifacts.save(
+        digest_artifact_id(artifact_id),
+        types.Part.from_bytes(
+            data=digest.encode("utf-8"),
+            mime_type="text/markdown"
+        )
+    )
+
+    if not PDF_DIGEST_THUMBNAIL:
+        return
+
+    # Text documents link the image the model has already seen instead, and
+    # text-only templates have no image to preview. A thumbnail left by an
+    # earlier render of the same document with an image would be stale.
+    if recipe_image_bytes is None:
+        await artifacts.delete(thumbnail_artifact_id(artifact_id))
+        return
+
+    from .images import make_thumbnail
+
+    thumbnail_bytes = await asyncio.to_thread(
+        make_thumbnail,
+        recipe_image_bytes,
+        PDF_DIGEST_THUMBNAIL_MAX_EDGE
+    )
+
+    await artifacts.save(
+        thumbnail_artifact_id(artifact_id),
+        types.Part.from_bytes(
+            data=thumbnail_bytes,
+            mime_type="image/jpeg"
+        )
+    )
+
+
+def _remove_spool_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def _previous_render(
+    tool_context: ToolContext,
+    artifact_id: str,
+    message: str,
+) -> Dict[str, Any] | None:
+    """
+    Returns the result of the earlier render of the same document, or None
+    if it has to be rendered again: when its deferred render failed, or when
+    the document is no longer in the artifact store.
+    """
+    render_job = await get_render_job(tool_context, artifact_id)
+
+    if render_job is not None and render_job["status"] == "pending":
+        return render_job
+
+    if render_job is not None and render_job["status"] == "error":
+        return None
+
+    if not await artifact_exists(tool_context, artifact_id):
+        return None
+
+    return render_job or {
+        "status": "success",
+        "message": message,
+        "generated_file_artifact_id": artifact_id
+    }
+
+
+async def _render_document(
+    artifacts: SessionArtifacts,
+    artifact_id: str,
+    render_key: str,
+    pdf_bytes: bytes | None,
+    current_span: Any,
+    render: Callable[..., bytes | None],
+    *args: Any,
+) -> int:
+    """
+    Saves the PDF document `artifact_id` and returns its page count.
+
+    `pdf_bytes` is the cached document, if any. Otherwise `render(*args)` runs
+    on the render executor and its result is added to the render cache. With
+    `RENDER_STREAM_TO_FILE` and an artifact service that can save files, the
+    worker writes the document straight into the artifact store instead, so
+    it never passes through this process's memory; such renders are not
+    added to the render cache.
+
+    Raises:
+        RenderError: If the document could not be rendered.
+    """
+    spool_path = None
+    if pdf_bytes is None and RENDER_STREAM_TO_FILE:
+        spool_path = artifacts.spool_path()
+
+    if spool_path is not None:
+        abandoned_job = None
+        try:
+            await get_render_executor().submit(render, *args, spool_path)
+            set_attributes(
+                current_span,
+                streamed=True,
+                pdf_bytes=os.path.getsize(spool_path),
+            )
+
+            page_count = await asyncio.to_thread(count_pdf_file_pages, spool_path)
+            await artifacts.save_file(
+                artifact_id,
+                spool_path,
+                "application/pdf"
+            )
+
+        except RenderTimeoutError as e:
+            abandoned_job = e.job
+            raise
+
+        finally:
+            if abandoned_job is not None and not abandoned_job.done():
+                # The worker may still be writing the file.
+                abandoned_job.add_done_callback(
+                    lambda _: _remove_spool_file(spool_path)
+                )
+            else:
+                _remove_spool_file(spool_path)
+
+        return page_count
+
+    if pdf_bytes is None:
+        pdf_bytes = await get_render_executor().submit(render, *args)
+        await get_render_cache().put(render_key, pdf_bytes)
+
+    set_attributes(current_span, pdf_bytes=len(pdf_bytes))
+
+    await artifacts.save(
+        artifact_id,
+        types.Part.from_bytes(
+            data=pdf_bytes,
+            mime_type="application/pdf"
+        )
+    )
+
+    return count_pdf_pages(pdf_bytes)
+
+
+async def _run_render(
+    tool_context: ToolContext,
+    artifact_id: str,
+    artifacts: SessionArtifacts,
+    render: Coroutine[Any, Any, Dict[str, str]],
+) -> Dict[str, str]:
+    """
+    Awaits `render`, or with `RENDER_DEFERRED` schedules it as a background
+    job and returns a pending handle at once. Either way the artifact ID is
+    reserved for the document.
+
+    `render` saves through `artifacts`. Rendered inline, its saves are
+    reported on this tool call's event; deferred, by whichever call
+    collects the job.
+    """
+    if RENDER_DEFERRED:
+        return schedule_render_job(tool_context, artifact_id, artifacts, render)
+
+    result = await render
+    record_saved_artifacts(tool_context, artifacts.saved, artifacts.deleted)
+    return result
+
+
+def _unknown_template_error(template: str) -> Dict[str, str]:
+    return {
+        "status": "error",
+        "message": (
+            f"Unknown document template '{template}'. Use one of: "
+            f"{', '.join(DOCUMENT_TEMPLATES)}."
+        )
+    }
+
+
+async def _save_text_document(
+    artifacts: SessionArtifacts,
+    artifact_id: str,
+    recipe: Dict[str, Any],
+    recipe_image_artifact_id: str,
+    document_format: OutputFormat,
+) -> None:
+    with span(
+        "tool.generate_recipe_document.render",
+        output_format=document_format.name,
+    ) as current_span:
+        document = document_format.render(
+            recipe,
+            recipe_image_url(recipe_image_artifact_id)
+        ).encode("utf-8")
+        set_attributes(current_span, document_bytes=len(document))
+
+        await artifacts.save(
+            artifact_id,
+            types.Part.from_bytes(
+                data=document,
+                mime_type=document_format.mime_type
+            )
+        )
 
 
 async def generate_recipe_document(
@@ -36,6 +262,8 @@ async def generate_recipe_document(
     method: list[str],
     recipe_image_artifact_id: str,
     tool_context: ToolContext,
+    template: str = DEFAULT_TEMPLATE,
+    output_format: str = "",
 ) -> Dict[str, str]:
     """
     Tool to generate a PDF version of a recipe and stores it as an ADK artifact.
@@ -46,6 +274,10 @@ async def generate_recipe_document(
     ingredients and preparation steps. The document is saved as an artifact and 
     can be retrieved using the returned artifact ID.
 
+    The recipe can also be delivered as HTML, Markdown or schema.org JSON
+    for clients that show it inline. These are built in milliseconds and
+    link the recipe image by its artifact ID instead of embedding it.
+
     Args:
         recipe_name (str): The title of the recipe.
         description (str): A short description or introduction to the recipe.
@@ -58,26 +290,111 @@ async def generate_recipe_document(
             to be embedded in the PDF.
         tool_context (ToolContext): Context object used for loading and saving
             artifacts within the agent framework.
+        template (str): Layout of the document: "hero_side_image" (photo
+            above the title and beside the ingredients), "compact" (small
+            photo, fewer pages, for phones) or "print_friendly" (text only,
+            saves ink). Defaults to the configured template. Only used for
+            PDF documents.
+        output_format (str): "pdf", "html", "markdown" or "json". Leave
+            empty to use the format preferred by the client, or the
+            configured default.
 
     Returns:
         Dict[str, str]: A dictionary containing:
             - status (str): Indicates the operation result.
                 - "success" if the PDF was generated and stored successfully.
-                - "error" if required inputs or artifacts are missing.
+                - "error" if required inputs or artifacts are missing, the
+                  template or format is unknown, or the renderer is busy or
+                  timed out.
             - message (str): A short description of the result.
-            - generated_file_artifact_id (str): Artifact ID of the generated PDF file
+            - generated_file_artifact_id (str): Artifact ID of the generated file
             (present only when status is "success").
     """
-    WARNING_BG = colors.Color(1, 0.97, 0.80, alpha=0.9)
-
     if recipe_image_artifact_id is None:
         return {
             "status": "error",
             "message": "Recipe image artifact ID is missing."
         }
 
-    recipe_image_artifact = await tool_context.load_artifact(
-        filename=recipe_image_artifact_id
+    document_template = get_template(template)
+    if document_template is None:
+        return _unknown_template_error(template)
+
+    output_format = (
+        output_format
+        or tool_context.state.get(PREFERRED_OUTPUT_FORMAT_STATE_KEY)
+        or DEFAULT_OUTPUT_FORMAT
+    )
+    document_format = get_output_format(output_format)
+
+    if document_format is None:
+        return {
+            "status": "error",
+            "message": (
+                f"Unknown output format '{output_format}'. Use one of: "
+                f"{', '.join(OUTPUT_FORMATS)}."
+            )
+        }
+
+    recipe = {
+        "recipe_name": recipe_name,
+        "description": description,
+        "prep_time": prep_time,
+        "serves": serves,
+        "cook_time": cook_time,
+        "ingredients": list(ingredients),
+        "method": list(method),
+    }
+
+    recipe_slug = recipe_name.lower().replace(" ", "_")
+    artifact_id = f"{recipe_slug}_recipe.{document_format.extension}"
+
+    if document_format.is_text:
+        # The image is only linked, so it never has to be loaded.
+        if not await artifact_exists(tool_context, recipe_image_artifact_id):
+            return {
+                "status": "error",
+                "message": "Recipe image artifact is missing."
+            }
+
+        artifacts = SessionArtifacts(tool_context)
+
+        await _save_text_document(
+            artifacts,
+            artifact_id,
+            recipe,
+            recipe_image_artifact_id,
+            document_format
+        )
+
+        await _save_document_digest(
+            artifacts,
+            artifact_id,
+            build_recipe_digest(
+                artifact_id,
+                recipe,
+                None,
+                document_format.label
+            ),
+            None
+        )
+        record_saved_artifacts(tool_context, artifacts.saved, artifacts.deleted)
+
+        artifact_descriptions = tool_context.state.get("artifact_descriptions", {})
+        tool_context.state["artifact_descriptions"] = {
+            **artifact_descriptions,
+            artifact_id: f"{document_format.label} recipe document for {recipe_name}.",
+        }
+
+        return {
+            "status": "success",
+            "message": "Recipe document generated successfully.",
+            "generated_file_artifact_id": artifact_id
+        }
+
+    recipe_image_artifact = await load_artifact(
+        tool_context,
+        recipe_image_artifact_id
     )
 
     if recipe_image_artifact and recipe_image_artifact.inline_data:
@@ -89,182 +406,403 @@ async def generate_recipe_document(
             "message": "Recipe image artifact is missing inline data."
         }
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=1.5 * cm,
-        leftMargin=1.5 * cm,
-        topMargin=1.5 * cm,
-        bottomMargin=1.5 * cm
+    render_key = make_render_key(
+        recipe,
+        hashlib.sha256(recipe_image_bytes).hexdigest(),
+        template
     )
 
-    styles = getSampleStyleSheet()
+    rendered_documents = tool_context.state.get("rendered_documents", {})
+    if rendered_documents.get(artifact_id) == render_key:
+        previous = await _previous_render(
+            tool_context,
+            artifact_id,
+            "Recipe document generated successfully."
+        )
+        if previous is not None:
+            return previous
+
+    artifacts = SessionArtifacts(tool_context)
+
+    async def render() -> Dict[str, str]:
+        render_cache = get_render_cache()
+
+        with span(
+            "tool.generate_recipe_document.render",
+            template=template,
+        ) as current_span:
+            pdf_bytes = await render_cache.get(render_key)
+            set_attributes(current_span, cache_hit=pdf_bytes is not None)
+
+            try:
+                page_count = await _render_document(
+                    artifacts,
+                    artifact_id,
+                    render_key,
+                    pdf_bytes,
+                    current_span,
+                    render_recipe_pdf,
+                    recipe,
+                    recipe_image_bytes,
+                    template
+                )
+
+            except RenderError as e:
+                logger.warning("Failed to render recipe document: %s", e)
+                return {
+                    "status": "error",
+                    "message": str(e)
+                }
+
+        logger.debug("Render cache stats: %s", render_cache.stats())
+
+        await _save_document_digest(
+            artifacts,
+            artifact_id,
+            build_recipe_digest(artifact_id, recipe, page_count),
+            recipe_image_bytes if document_template.has_images else None
+        )
 
-    title_style = ParagraphStyle(
-        "title",
-        fontSize=24,
-        leading=28,
-        alignment=TA_CENTER,
-        fontName="Helvetica-Bold"
-    )
+        return {
+            "status": "success",
+            "message": "Recipe document generated successfully.",
+            "generated_file_artifact_id": artifact_id
+        }
 
-    meta_style = ParagraphStyle(
-        "meta",
-        fontSize=11,
-        alignment=TA_CENTER,
-        textColor=colors.black
-    )
+    result = await _run_render(tool_context, artifact_id, artifacts, render())
+    if result["status"] == "error":
+        return result
 
-    section_title = ParagraphStyle(
-        "section",
-        fontSize=16,
-        fontName="Helvetica-Bold",
-        spaceAfter=8
-    )
+    tool_context.state["rendered_documents"] = {
+        **rendered_documents,
+        artifact_id: render_key,
+    }
+
+    artifact_descriptions = tool_context.state.get("artifact_descriptions", {})
+    tool_context.state["artifact_descriptions"] = {
+        **artifact_descriptions,
+        artifact_id: f"PDF recipe document for {recipe_name}.",
+    }
+
+    return result
+
+
+async def _prepare_cookbook_images(
+    images: Dict[str, bytes],
+    template: str
+) -> Dict[str, bytes]:
+    executor = get_render_executor()
+    # Keep at most one job per worker in flight, so a long menu does not
+    # fill the renderer's queue on its own.
+    semaphore = asyncio.Semaphore(executor.max_workers)
+
+    async def prepare(image_bytes: bytes) -> bytes:
+        async with semaphore:
+            return await executor.submit(
+                prepare_cookbook_image,
+                image_bytes,
+                template
+            )
 
-    body = ParagraphStyle(
-        "body",
-        fontSize=10.5,
-        leading=14
+    prepared = await asyncio.gather(
+        *(prepare(image_bytes) for image_bytes in images.values())
     )
 
-    story = []
+    return dict(zip(images, prepared))
 
-    hero_img = Image(BytesIO(recipe_image_bytes))
 
-    hero_img.drawWidth = doc.width
-    hero_img.drawHeight = hero_img.drawWidth * hero_img.imageHeight / hero_img.imageWidth
+async def generate_cookbook_document(
+    title: str,
+    recipes: list[CookbookRecipe],
+    tool_context: ToolContext,
+    template: str = DEFAULT_TEMPLATE,
+) -> Dict[str, str]:
+    """
+    Tool to generate a single PDF cookbook from several recipes and store it
+    as an ADK artifact.
 
-    story.append(hero_img)
-    story.append(Spacer(1, 0.75 * cm))
+    Use this instead of calling `generate_recipe_document` once per recipe
+    when the user wants a meal plan, weekly menu or any other set of recipes.
+    The cookbook opens with a table of contents followed by each recipe on
+    its own pages, in the given order. Recipes may share an image artifact.
 
-    story.append(Paragraph(recipe_name, title_style))
-    story.append(Spacer(1, 0.5 * cm))
+    Args:
+        title (str): The cookbook title (e.g., "Weekly Vegetarian Menu").
+        recipes (list[CookbookRecipe]): The recipes to include. Each one
+            holds the same fields as `generate_recipe_document`: recipe_name,
+            description, prep_time, serves, cook_time, ingredients, method
+            and recipe_image_artifact_id.
+        tool_context (ToolContext): Context object used for loading and saving
+            artifacts within the agent framework.
+        template (str): Layout of every recipe in the cookbook, as for
+            `generate_recipe_document`.
 
-    meta_table = Table(
-        [[
-            Paragraph(f"<b>Preperation Time:</b> {prep_time}", meta_style),
-            Paragraph(f"<b>Serves:</b> {serves}", meta_style),
-            Paragraph(f"<b>Cooking Time:</b> {cook_time}", meta_style),
-        ]],
-        colWidths=[doc.width / 3] * 3
-    )
+    Returns:
+        Dict[str, str]: A dictionary containing:
+            - status (str): Indicates the operation result.
+                - "success" if the PDF was generated and stored successfully.
+                - "error" if the recipes are invalid, an image artifact is
+                  missing, the template is unknown, or the renderer is busy
+                  or timed out.
+            - message (str): A short description of the result.
+            - generated_file_artifact_id (str): Artifact ID of the generated PDF file
+            (present only when status is "success").
+    """
+    document_template = get_template(template)
+    if document_template is None:
+        return _unknown_template_error(template)
 
-    meta_table.setStyle(TableStyle([
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
-    ]))
+    try:
+        recipes = [CookbookRecipe.model_validate(recipe) for recipe in recipes]
 
-    story.append(meta_table)
-    story.append(Spacer(1, 0.6 * cm))
+    except ValidationError as e:
+        error = e.errors()[0]
+        return {
+            "status": "error",
+            "message": (
+                f"Invalid recipe field '{'.'.join(map(str, error['loc']))}': "
+                f"{error['msg']}."
+            )
+        }
 
-    story.append(Paragraph("Description", section_title))
-    story.append(Spacer(1, 0.2 * cm))
+    if not recipes:
+        return {
+            "status": "error",
+            "message": "No recipes were provided."
+        }
 
-    story.append(Paragraph(description, body))
-    story.append(Spacer(1, 0.6 * cm))
+    if len(recipes) > COOKBOOK_MAX_RECIPES:
+        return {
+            "status": "error",
+            "message": f"A cookbook can hold at most {COOKBOOK_MAX_RECIPES} recipes."
+        }
 
-    story.append(Paragraph("Ingredients", section_title))
-    story.append(Spacer(1, 0.2 * cm))
+    image_artifact_ids = list(dict.fromkeys(
+        recipe.recipe_image_artifact_id for recipe in recipes
+    ))
+    image_artifacts = await asyncio.gather(*(
+        load_artifact(tool_context, image_artifact_id)
+        for image_artifact_id in image_artifact_ids
+    ))
 
-    ingredient_paragraphs = []
-    for item in ingredients:
-        ingredient_paragraphs.append(Paragraph(f"• {item}", body))
+    images = {}
+    image_keys = {}
 
-    ingredients_block = Table(
-        [[ingredient_paragraphs]],
-        colWidths=[doc.width * 0.5]
-    )
-    ingredients_block.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "TOP")
-    ]))
+    for image_artifact_id, image_artifact in zip(image_artifact_ids, image_artifacts):
+        if not image_artifact or not image_artifact.inline_data:
+            return {
+                "status": "error",
+                "message": f"Recipe image artifact {image_artifact_id} is missing."
+            }
+
+        image_bytes = image_artifact.inline_data.data
+        image_key = hashlib.sha256(image_bytes).hexdigest()
 
-    side_img = Image(BytesIO(recipe_image_bytes))
+        images[image_key] = image_bytes
+        image_keys[image_artifact_id] = image_key
 
-    side_img.drawWidth = doc.width * 0.40
-    side_img.drawHeight = side_img.drawWidth * side_img.imageHeight / side_img.imageWidth
+    cookbook_recipes = [
+        {
+            **recipe.model_dump(exclude={"recipe_image_artifact_id"}),
+            "image_key": image_keys[recipe.recipe_image_artifact_id],
+        }
+        for recipe in recipes
+    ]
+
+    artifact_id = f"{title.lower().replace(' ', '_')}_cookbook.pdf"
 
-    layout_table = Table(
-        [[ingredients_block, side_img]],
-        colWidths=[
-            doc.width * 0.55,
-            doc.width * 0.40
-        ]
+    render_key = make_render_key(
+        {"title": title, "recipes": cookbook_recipes},
+        ":".join(sorted(images)),
+        template
     )
 
-    layout_table.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-    ]))
+    rendered_documents = tool_context.state.get("rendered_documents", {})
+    if rendered_documents.get(artifact_id) == render_key:
+        previous = await _previous_render(
+            tool_context,
+            artifact_id,
+            "Cookbook document generated successfully."
+        )
+        if previous is not None:
+            return previous
+
+    artifacts = SessionArtifacts(tool_context)
+
+    async def render() -> Dict[str, str]:
+        render_cache = get_render_cache()
+
+        with span(
+            "tool.generate_cookbook_document.render",
+            template=template,
+            recipes=len(recipes),
+            images=len(images),
+        ) as current_span:
+            pdf_bytes = await render_cache.get(render_key)
+            set_attributes(current_span, cache_hit=pdf_bytes is not None)
+
+            try:
+                # Text-only templates never embed the images.
+                prepared_images = None
+                if pdf_bytes is None:
+                    prepared_images = (
+                        await _prepare_cookbook_images(images, template)
+                        if document_template.has_images
+                        else {}
+                    )
+
+                page_count = await _render_document(
+                    artifacts,
+                    artifact_id,
+                    render_key,
+                    pdf_bytes,
+                    current_span,
+                    render_cookbook_pdf,
+                    title,
+                    cookbook_recipes,
+                    prepared_images,
+                    template
+                )
+
+            except RenderError as e:
+                logger.warning("Failed to render cookbook document: %s", e)
+                return {
+                    "status": "error",
+                    "message": str(e)
+                }
+
+        await _save_document_digest(
+            artifacts,
+            artifact_id,
+            build_cookbook_digest(
+                artifact_id,
+                title,
+                cookbook_recipes,
+                page_count
+            ),
+            (
+                images[cookbook_recipes[0]["image_key"]]
+                if document_template.has_images
+                else None
+            )
+        )
 
-    story.append(layout_table)
-    story.append(Spacer(1, 0.6 * cm))
+        return {
+            "status": "success",
+            "message": "Cookbook document generated successfully.",
+            "generated_file_artifact_id": artifact_id
+        }
 
-    story.append(Paragraph("Preparation Steps", section_title))
-    story.append(Spacer(1, 0.2 * cm))
+    result = await _run_render(tool_context, artifact_id, artifacts, render())
+    if result["status"] == "error":
+        return result
 
-    for i, step in enumerate(method, start=1):
-        story.append(Paragraph(f"<b>Step {i}.</b> {step}", body))
-        story.append(Spacer(1, 0.1 * cm))
+    tool_context.state["rendered_documents"] = {
+        **rendered_documents,
+        artifact_id: render_key,
+    }
 
-    story.append(Spacer(1, 0.6 * cm))
+    artifact_descriptions = tool_context.state.get("artifact_descriptions", {})
+    tool_context.state["artifact_descriptions"] = {
+        **artifact_descriptions,
+        artifact_id: f"PDF cookbook \"{title}\" with {len(recipes)} recipes.",
+    }
 
-    warning_text = """
-    <b>Disclaimer:</b> This recipe is generated by an AI system for educational 
-    purposes only. Please use your own judgment while cooking. Always follow 
-    proper safety practices, check ingredient suitability and ensure correct 
-    procedures. The authors/developers are not responsible for any outcome 
-    resulting from the use of this recipe.
-    """
+    return result
 
-    warning_paragraph = Paragraph(warning_text.strip(), ParagraphStyle(
-        name="WarningStyle",
-        fontSize=9.5,
-        leading=13,
-        textColor=colors.black,
-    ))
 
-    warning_table = Table(
-        [[warning_paragraph]],
-        colWidths=[doc.width]
-    )
+async def reload_artifacts(
+    artifact_ids: list[str],
+    tool_context: ToolContext,
+) -> Dict[str, Any]:
+    """
+    Tool to bring previously shared artifacts back into the model's context.
 
-    warning_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), WARNING_BG),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("LEFTPADDING", (0, 0), (-1, -1), 12),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
-        ("TOPPADDING", (0, 0), (-1, -1), 10),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
-    ]))
-
-    story.append(warning_table)
-
-    doc.build(
-        story,
-        onFirstPage=_set_pdf_metadata,
-        onLaterPages=_set_pdf_metadata
-    )
+    Older images and documents are replaced in the conversation history with
+    short artifact references to keep the context small. Call this tool with
+    the artifact IDs from those references when their full content is needed
+    again; the content is attached right after this tool's response.
 
-    buffer.seek(0)
-    pdf_bytes = buffer.read()
+    Args:
+        artifact_ids (list[str]): Artifact IDs to reload.
+        tool_context (ToolContext): Context object used for looking up
+            artifacts within the agent framework.
 
-    recipe_artifact = types.Part.from_bytes(
-        data=pdf_bytes,
-        mime_type="application/pdf"
-    )
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): "success" if at least one artifact was found,
+              otherwise "error".
+            - message (str): A short description of the result.
+            - reloaded_artifact_ids (list[str]): Artifact IDs that will be
+              attached to the context.
+            - missing_artifact_ids (list[str]): Artifact IDs that do not exist.
+    """
+    reloaded_artifact_ids = []
+    missing_artifact_ids = []
 
-    artifact_id = f"{recipe_name.lower().replace(' ', '_')}_recipe.pdf"
+    for artifact_id in artifact_ids:
+        await get_render_job(tool_context, artifact_id, timeout=None)
 
-    await tool_context.save_artifact(
-        filename=artifact_id,
-        artifact=recipe_artifact
-    )
+        if await artifact_exists(tool_context, artifact_id):
+            reloaded_artifact_ids.append(artifact_id)
+        else:
+            missing_artifact_ids.append(artifact_id)
+
+    if not reloaded_artifact_ids:
+        return {
+            "status": "error",
+            "message": "None of the requested artifacts exist.",
+            "reloaded_artifact_ids": [],
+            "missing_artifact_ids": missing_artifact_ids,
+        }
 
     return {
         "status": "success",
-        "message": "Recipe document generated successfully.",
-        "generated_file_artifact_id": artifact_id
+        "message": "Artifacts reloaded into the context.",
+        "reloaded_artifact_ids": reloaded_artifact_ids,
+        "missing_artifact_ids": missing_artifact_ids,
+    }
+
+
+async def get_document_status(
+    artifact_id: str,
+    tool_context: ToolContext,
+) -> Dict[str, str]:
+    """
+    Tool to wait for a document that is being rendered in the background.
+
+    `generate_recipe_document` and `generate_cookbook_document` may return
+    a "pending" status when documents are rendered in the background. Call
+    this tool with the returned artifact ID before describing or reloading
+    the document; it waits until the document is ready and reports whether
+    rendering succeeded.
+
+    Args:
+        artifact_id (str): Artifact ID returned by the document tool.
+        tool_context (ToolContext): Context object used for looking up
+            artifacts within the agent framework.
+
+    Returns:
+        Dict[str, str]: A dictionary containing:
+            - status (str): "success" if the document is ready, otherwise
+              "error".
+            - message (str): A short description of the result.
+            - generated_file_artifact_id (str): Artifact ID of the document
+            (present only when status is "success").
+    """
+    render_job = await get_render_job(tool_context, artifact_id, timeout=None)
+
+    if render_job is not None:
+        return render_job
+
+    if await artifact_exists(tool_context, artifact_id):
+        return {
+            "status": "success",
+            "message": "The document is ready.",
+            "generated_file_artifact_id": artifact_id
+        }
+
+    return {
+        "status": "error",
+        "message": f"No document with artifact ID {artifact_id} was generated."
     }
@@ -0,0 +1,122 @@
+import logging
+import warnings
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence, Tuple
+
+from .config import TRACE_EXPORTER, TRACE_FILE
+
+try:
+    from opentelemetry import trace
+
+except ImportError:  # pragma: no cover - OpenTelemetry ships with google-adk
+    trace = None
+
+warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
+logger = logging.getLogger(__name__)
+
+
+TRACER_NAME = "recipe_agent"
+
+_ATTRIBUTE_TYPES = (bool, int, float, str)
+
+
+_tracer = None
+
+
+def _make_exporter(kind: str):
+    # The SDK is only needed for local exporters, so it is imported lazily.
+    if kind == "stdout":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+
+    if kind == "json":
+        from .trace_export import JsonFileSpanExporter
+        return JsonFileSpanExporter(TRACE_FILE)
+
+    logger.warning("Unknown TRACE_EXPORTER %r, tracing is disabled.", kind)
+    return None
+
+
+def get_tracer():
+    """
+    Returns the tracer used for the agent's own spans, or None when
+    OpenTelemetry is not installed.
+
+    With `TRACE_EXPORTER` set to "stdout" or "json", spans go to a private
+    provider with a local exporter so that they can be inspected offline.
+    Otherwise the globally configured provider is used, which is a no-op
+    unless the host application (or ADK's own telemetry setup) installs one.
+    """
+    global _tracer
+
+    if _tracer is None and trace is not None:
+        exporter = _make_exporter(TRACE_EXPORTER) if TRACE_EXPORTER else None
+
+        if exporter is not None:
+            # Spans are exported synchronously so that the ones recorded in
+            # render worker processes are not lost when a worker exits.
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+            provider = TracerProvider()
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+            _tracer = provider.get_tracer(TRACER_NAME)
+
+        else:
+            _tracer = trace.get_tracer(TRACER_NAME)
+
+    return _tracer
+
+
+def set_attributes(current_span, **attributes: Any) -> None:
+    """Sets every attribute that OpenTelemetry can record, skipping the rest."""
+    if current_span is None:
+        return
+
+    for key, value in attributes.items():
+        if isinstance(value, _ATTRIBUTE_TYPES):
+            current_span.set_attribute(key, value)
+
+
+def record_error(current_span, error: BaseException) -> None:
+    if current_span is None:
+        return
+
+    current_span.record_exception(error)
+    current_span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Records the enclosed block as a span named `name`.
+
+    Yields the span (None when tracing is unavailable) so that attributes
+    known only after the work is done can be added with `set_attributes`.
+    """
+    tracer = get_tracer()
+
+    if tracer is None:
+        yield None
+        return
+
+    with tracer.start_as_current_span(name) as current_span:
+        set_attributes(current_span, **attributes)
+        yield current_span
+
+
+def measure_contents(contents: Sequence[Any]) -> Tuple[int, int]:
+    """
+    Returns the inline data and text bytes held by a list of `Content`s.
+    """
+    inline_bytes = 0
+    text_bytes = 0
+
+    for content in contents:
+        for part in content.parts or []:
+            if part.inline_data and part.inline_data.data:
+                inline_bytes += len(part.inline_data.data)
+            if part.text:
+                text_bytes += len(part.text)
+
+    return inline_bytes, text_bytes
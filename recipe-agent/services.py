@@ -0,0 +1,29 @@
+"""
+Custom ADK services, loaded by `adk web` / `adk api_server` from the agents
+directory.
+
+Registers the `cas://` artifact service URI scheme for the content-addressed
+`LocalArtifactService`:
+
+    adk web --artifact_service_uri cas://.adk/artifacts
+"""
+
+from urllib.parse import unquote, urlparse
+
+from google.adk.cli.service_registry import get_service_registry
+
+from recipe_agent.artifact_store import LocalArtifactService
+from recipe_agent.config import ARTIFACT_STORE_MAX_BYTES
+
+
+def local_artifact_factory(uri: str, **_):
+    parsed_uri = urlparse(uri)
+    root_dir = unquote(parsed_uri.netloc + parsed_uri.path)
+
+    if not root_dir:
+        raise ValueError("cas:// artifact URIs must include a path.")
+
+    return LocalArtifactService(root_dir, max_bytes=ARTIFACT_STORE_MAX_BYTES)
+
+
+get_service_registry().register_artifact_service("cas", local_artifact_factory)
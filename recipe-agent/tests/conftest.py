@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+import pytest
+
+# The tests never talk to Gemini; give the agent package the configuration it
+# expects at import time and keep caches away from the developer's real ones.
+os.environ.setdefault("ROOT_AGENT_MODEL", "gemini-2.5-flash")
+os.environ.setdefault("WEB_SEARCH_AGENT_MODEL", "gemini-2.5-flash")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-tests")
+os.environ.setdefault(
+    "SEARCH_CACHE_PATH",
+    os.path.join(tempfile.mkdtemp(prefix="recipe-tests-"), "search.sqlite3")
+)
+# Worker processes take longer to start than most test renders take.
+os.environ.setdefault("RENDER_EXECUTOR_KIND", "thread")
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.tool_context import ToolContext
+
+
+APP_NAME = "recipe_agent_tests"
+
+
+@pytest.fixture
+def recipe():
+    return {
+        "recipe_name": "Test Bruschetta",
+        "description": "A rustic Italian starter.",
+        "prep_time": "15 minutes",
+        "serves": "4",
+        "cook_time": "10 minutes",
+        "ingredients": ["4 slices of bread", "2 tomatoes", "1 clove of garlic"],
+        "method": ["Toast the bread.", "Chop the tomatoes.", "Rub with garlic."],
+    }
+
+
+@pytest.fixture
+def artifact_service():
+    return InMemoryArtifactService()
+
+
+@pytest.fixture
+async def tool_context(artifact_service):
+    session_service = InMemorySessionService()
+    session = await session_service.create_session(
+        app_name=APP_NAME,
+        user_id="test-user"
+    )
+
+    invocation_context = InvocationContext(
+        session_service=session_service,
+        artifact_service=artifact_service,
+        invocation_id="e-test",
+        agent=LlmAgent(name="test_agent"),
+        session=session,
+    )
+    return ToolContext(invocation_context)
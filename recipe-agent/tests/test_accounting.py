@@ -0,0 +1,107 @@
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from recipe_agent.accounting import USAGE_STATE_KEY, UsageBudget, _add_usage
+from recipe_agent.accounting import after_model_callback, apply_budget
+from recipe_agent.accounting import get_usage, merge_branch_usage, record_request
+from recipe_agent.compaction import DEFAULT_COMPACTION_POLICY, CompactionPolicy
+
+
+BUDGET = UsageBudget(
+    tokens=100,
+    inline_bytes=1000,
+    token_limit=200,
+    fallback_model="gemini-2.5-flash-lite",
+    compaction=CompactionPolicy(enabled=True, keep_recent_turns=1),
+)
+
+
+def _response(prompt_tokens: int, output_tokens: int, partial: bool = False) -> LlmResponse:
+    return LlmResponse(
+        partial=partial,
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+        ),
+    )
+
+
+async def test_usage_is_recorded_per_session_and_per_agent(tool_context):
+    record_request(tool_context, inline_bytes=10, text_bytes=5)
+    await after_model_callback(tool_context, _response(30, 7))
+    # Partial streaming chunks carry running totals and are not counted.
+    await after_model_callback(tool_context, _response(30, 3, partial=True))
+
+    usage = get_usage(tool_context)
+
+    assert usage["total"]["requests"] == 1
+    assert usage["total"]["input_tokens"] == 30
+    assert usage["total"]["output_tokens"] == 7
+    assert usage["total"]["inline_bytes"] == 10
+    assert usage["agents"]["test_agent"] == usage["total"]
+    assert tool_context.actions.state_delta[USAGE_STATE_KEY] == usage
+
+
+async def test_session_under_budget_keeps_its_model(tool_context):
+    _add_usage(tool_context, BUDGET, input_tokens=50)
+    llm_request = LlmRequest(model="gemini-2.5-pro")
+
+    assert apply_budget(llm_request, tool_context, BUDGET) is DEFAULT_COMPACTION_POLICY
+    assert llm_request.model == "gemini-2.5-pro"
+
+
+async def test_session_over_budget_uses_the_fallback_model(tool_context):
+    _add_usage(tool_context, BUDGET, input_tokens=90, output_tokens=20)
+    llm_request = LlmRequest(model="gemini-2.5-pro")
+
+    assert get_usage(tool_context)["over_budget"]
+    assert apply_budget(llm_request, tool_context, BUDGET) is BUDGET.compaction
+    assert llm_request.model == "gemini-2.5-flash-lite"
+
+
+async def test_inline_bytes_alone_put_the_session_over_budget(tool_context):
+    _add_usage(tool_context, BUDGET, inline_bytes=1001)
+
+    usage = get_usage(tool_context)
+
+    assert usage["over_budget"]
+    assert not usage["over_limit"]
+
+
+async def test_session_over_its_limit_stops_calling_the_model(tool_context):
+    _add_usage(tool_context, BUDGET, input_tokens=150, thinking_tokens=51)
+
+    result = apply_budget(LlmRequest(model="gemini-2.5-pro"), tool_context, BUDGET)
+
+    assert isinstance(result, LlmResponse)
+    assert "usage limit" in result.content.parts[0].text
+
+
+async def test_disabled_budget_never_flags_the_session(tool_context):
+    usage = _add_usage(tool_context, UsageBudget(), input_tokens=10 ** 9, inline_bytes=10 ** 9)
+
+    assert not usage["over_budget"]
+    assert not usage["over_limit"]
+
+
+async def test_branch_usage_is_added_not_overwritten(tool_context):
+    base = {
+        "total": {"requests": 2, "input_tokens": 20},
+        "agents": {"root": {"requests": 2, "input_tokens": 20}},
+    }
+    branch = {
+        "total": {"requests": 3, "input_tokens": 50},
+        "agents": {
+            "root": {"requests": 2, "input_tokens": 20},
+            "search": {"requests": 1, "input_tokens": 30},
+        },
+    }
+
+    usage = merge_branch_usage(tool_context, base, [branch, branch], BUDGET)
+
+    assert usage["total"]["requests"] == 4
+    assert usage["total"]["input_tokens"] == 80
+    assert usage["agents"]["root"]["requests"] == 2
+    assert usage["agents"]["search"]["requests"] == 2
+    assert usage["agents"]["search"]["input_tokens"] == 60
+    assert get_usage(tool_context) == usage
@@ -0,0 +1,164 @@
+import itertools
+import os
+import sqlite3
+
+import pytest
+from google.genai.types import Part
+
+from recipe_agent import artifact_store
+from recipe_agent.artifact_store import LocalArtifactService
+
+
+APP = "recipe_agent_tests"
+USER = "user"
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    # Every access gets its own timestamp, so LRU order is deterministic.
+    ticks = itertools.count(1)
+    monkeypatch.setattr(artifact_store.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalArtifactService(str(tmp_path), max_bytes=10)
+    yield store
+    store.close()
+
+
+def _part(data: bytes) -> Part:
+    return Part.from_bytes(data=data, mime_type="application/octet-stream")
+
+
+async def _save(store, filename: str, data: bytes, session_id: str = "s1") -> int:
+    return await store.save_artifact(
+        app_name=APP, user_id=USER, session_id=session_id,
+        filename=filename, artifact=_part(data),
+    )
+
+
+async def _load(store, filename: str, session_id: str = "s1", version: int | None = None):
+    part = await store.load_artifact(
+        app_name=APP, user_id=USER, session_id=session_id,
+        filename=filename, version=version,
+    )
+    return part.inline_data.data if part is not None else None
+
+
+async def _list(store, session_id: str = "s1") -> list[str]:
+    return await store.list_artifact_keys(app_name=APP, user_id=USER, session_id=session_id)
+
+
+def _blob_files(store) -> list[str]:
+    return [
+        name
+        for _, _, files in os.walk(os.path.join(store.root_dir, "blobs"))
+        for name in files
+    ]
+
+
+async def test_identical_payloads_are_stored_once(store):
+    await _save(store, "a.bin", b"1234", session_id="s1")
+    await _save(store, "b.bin", b"1234", session_id="s2")
+
+    assert store.stats()["blobs"] == 1
+    assert store.stats()["versions"] == 2
+
+    await store.delete_artifact(app_name=APP, user_id=USER, session_id="s1", filename="a.bin")
+    assert await _load(store, "b.bin", session_id="s2") == b"1234"
+
+    await store.delete_artifact(app_name=APP, user_id=USER, session_id="s2", filename="b.bin")
+    assert store.stats()["blobs"] == 0
+    assert _blob_files(store) == []
+
+
+async def test_user_scoped_artifacts_are_shared_across_sessions(store):
+    await _save(store, "user:photo.jpg", b"1234", session_id="s1")
+
+    assert await _load(store, "user:photo.jpg", session_id="s2") == b"1234"
+    assert await _list(store, session_id="s2") == ["user:photo.jpg"]
+
+
+async def test_evicted_version_fails_to_load_instead_of_falling_back(store, caplog):
+    await _save(store, "doc.bin", b"aaaa")
+    await _save(store, "doc.bin", b"bbbb")
+    assert await _load(store, "doc.bin", version=0) == b"aaaa"
+
+    # Over the 10 byte cap: "bbbb" is now the least recently used blob.
+    await _save(store, "other.bin", b"cccc")
+
+    assert store.evictions == 1
+    assert await _load(store, "doc.bin") is None
+    assert "doc.bin version 1 was evicted" in caplog.text
+    assert await _load(store, "doc.bin", version=0) == b"aaaa"
+    assert await store.list_versions(
+        app_name=APP, user_id=USER, session_id="s1", filename="doc.bin"
+    ) == [0]
+
+
+async def test_artifact_whose_latest_version_was_evicted_is_not_listed(store):
+    await _save(store, "doc.bin", b"aaaaaa")
+    await _save(store, "other.bin", b"bbbbbb")
+
+    assert await _list(store) == ["other.bin"]
+    assert await store.get_artifact_version(
+        app_name=APP, user_id=USER, session_id="s1", filename="doc.bin"
+    ) is None
+
+
+async def test_versions_keep_increasing_after_an_eviction(store):
+    assert await _save(store, "doc.bin", b"aaaaaa") == 0
+    await _save(store, "other.bin", b"bbbbbb")
+
+    assert await _save(store, "doc.bin", b"cccccc") == 1
+    assert await _load(store, "doc.bin") == b"cccccc"
+    assert await _load(store, "doc.bin", version=0) is None
+
+
+async def test_evicted_payload_can_be_stored_again(store):
+    await _save(store, "doc.bin", b"aaaaaa", session_id="s1")
+    await _save(store, "other.bin", b"bbbbbb")
+    await _save(store, "copy.bin", b"aaaaaa", session_id="s2")
+
+    assert await _load(store, "copy.bin", session_id="s2") == b"aaaaaa"
+    assert await _load(store, "doc.bin", session_id="s1") is None
+
+    # Only the live version holds a reference to the stored blob.
+    await store.delete_artifact(app_name=APP, user_id=USER, session_id="s2", filename="copy.bin")
+    assert store.stats()["blobs"] == 0
+
+
+async def test_saved_file_is_moved_into_the_store(store):
+    path = store.spool_path()
+    with open(path, "wb") as f:
+        f.write(b"%PDF")
+
+    version = await store.save_artifact_file(
+        app_name=APP, user_id=USER, session_id="s1",
+        filename="doc.pdf", path=path, mime_type="application/pdf",
+    )
+
+    assert version == 0
+    assert not os.path.exists(path)
+    assert await _load(store, "doc.pdf") == b"%PDF"
+
+
+def test_store_created_before_purged_versions_is_upgraded(tmp_path):
+    connection = sqlite3.connect(tmp_path / "artifacts.sqlite3")
+    connection.execute(
+        "CREATE TABLE artifact_versions (app_name TEXT NOT NULL, "
+        "user_id TEXT NOT NULL, session_id TEXT NOT NULL, filename TEXT NOT NULL, "
+        "version INTEGER NOT NULL, digest TEXT NOT NULL, mime_type TEXT, "
+        "is_text INTEGER NOT NULL, custom_metadata TEXT NOT NULL, "
+        "created_at REAL NOT NULL, "
+        "PRIMARY KEY (app_name, user_id, session_id, filename, version))"
+    )
+    connection.commit()
+    connection.close()
+
+    store = LocalArtifactService(str(tmp_path))
+    try:
+        assert store.stats()["versions"] == 0
+    finally:
+        store.close()
@@ -0,0 +1,45 @@
+import pytest
+from google.adk.artifacts import InMemoryArtifactService
+from google.genai.types import Part
+
+from recipe_agent.artifacts import artifact_exists, save_artifact
+
+
+class CountingArtifactService(InMemoryArtifactService):
+    list_calls: int = 0
+    evictions: int = 0
+
+    async def list_artifact_keys(self, **kwargs):
+        self.list_calls += 1
+        return await super().list_artifact_keys(**kwargs)
+
+
+@pytest.fixture
+def artifact_service():
+    return CountingArtifactService()
+
+
+async def test_artifacts_are_listed_once_per_session(tool_context, artifact_service):
+    assert not await artifact_exists(tool_context, "notes.txt")
+
+    await save_artifact(tool_context, "notes.txt", Part(text="Salt"))
+
+    assert await artifact_exists(tool_context, "notes.txt")
+    assert not await artifact_exists(tool_context, "other.txt")
+    assert artifact_service.list_calls == 1
+
+
+async def test_artifacts_are_listed_again_after_an_eviction(tool_context, artifact_service):
+    await save_artifact(tool_context, "notes.txt", Part(text="Salt"))
+    assert await artifact_exists(tool_context, "notes.txt")
+
+    await artifact_service.delete_artifact(
+        app_name=tool_context.session.app_name,
+        user_id=tool_context.session.user_id,
+        session_id=tool_context.session.id,
+        filename="notes.txt",
+    )
+    artifact_service.evictions += 1
+
+    assert not await artifact_exists(tool_context, "notes.txt")
+    assert artifact_service.list_calls == 2
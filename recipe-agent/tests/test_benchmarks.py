@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks.harness import BenchmarkHarness
+from benchmarks.scenarios import callback_processing, pdf_render, research
+
+
+@pytest.fixture(scope="module")
+def harness():
+    # Swaps the agents' models for scripted ones for the rest of the run.
+    return BenchmarkHarness()
+
+
+async def test_callback_processing_scenario(harness):
+    result = await harness.run_scenario(callback_processing(turns=3, image_size=(320, 240)))
+
+    assert result.model_calls == 3
+    assert result.stages["callback:before_model"]["count"] == 3
+    assert result.artifact_calls["save"] == 3
+    assert result.session_usage["total"]["requests"] == 3
+
+
+@pytest.mark.parametrize("output_format", ["pdf", "html"])
+async def test_render_scenario_saves_the_document(harness, output_format):
+    result = await harness.run_scenario(pdf_render(image_size=(640, 480), output_format=output_format))
+
+    assert result.model_calls == 4
+    assert result.stages["tool:generate_recipe_document"]["count"] == 1
+    assert result.artifact_bytes_saved > 0
+
+
+async def test_research_scenario_records_every_model_call(harness):
+    result = await harness.run_scenario(research())
+
+    # Two root calls per turn and three searches: the batch repeats the first
+    # turn's query, which is served from the search cache.
+    assert result.model_calls == 7
+    assert result.session_usage["total"]["requests"] == result.model_calls
@@ -0,0 +1,73 @@
+from google.adk.models import LlmRequest
+from google.genai.types import Blob, Content, Part
+
+from recipe_agent import callbacks
+from recipe_agent.callbacks import _part_fingerprint, _rewrite_history
+from recipe_agent.compaction import CompactionPolicy
+
+
+def _photo_part(body: bytes) -> Part:
+    # Same size and the same header, as two photos from one camera.
+    header = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+    return Part(inline_data=Blob(mime_type="image/jpeg", data=header + body))
+
+
+def _request(*contents: Content) -> LlmRequest:
+    return LlmRequest(
+        model="gemini-2.5-flash",
+        contents=[content.model_copy(deep=True) for content in contents]
+    )
+
+
+def _artifact_ids(llm_request: LlmRequest) -> list[str]:
+    return [
+        part.text.split("artifact ID : ")[1].split()[0]
+        for content in llm_request.contents
+        for part in content.parts
+        if part.text and "artifact ID : " in part.text
+    ]
+
+
+def test_photos_with_the_same_header_have_different_fingerprints():
+    first = _photo_part(b"a" * 1000)
+    second = _photo_part(b"b" * 1000)
+
+    assert _part_fingerprint(first) != _part_fingerprint(second)
+    assert _part_fingerprint(first) == _part_fingerprint(_photo_part(b"a" * 1000))
+
+
+async def test_rewound_history_does_not_reuse_another_photo(tool_context):
+    policy = CompactionPolicy()
+    greeting = Content(role="user", parts=[Part(text="Hi")])
+    reply = Content(role="model", parts=[Part(text="Hello! Send a photo.")])
+
+    first = Content(role="user", parts=[_photo_part(b"a" * 1000)])
+    llm_request = _request(greeting, reply, first)
+    await _rewrite_history(llm_request, tool_context, policy)
+    [first_id] = _artifact_ids(llm_request)
+
+    # The user edits their last message and sends another photo instead.
+    second = Content(role="user", parts=[_photo_part(b"b" * 1000)])
+    llm_request = _request(greeting, reply, second)
+    await _rewrite_history(llm_request, tool_context, policy)
+    [second_id] = _artifact_ids(llm_request)
+
+    assert second_id != first_id
+    artifact = await tool_context.load_artifact(second_id)
+    assert artifact.inline_data.data.endswith(b"b" * 1000)
+
+
+async def test_unchanged_history_is_not_processed_again(tool_context, monkeypatch):
+    policy = CompactionPolicy()
+    photo = Content(role="user", parts=[_photo_part(b"a" * 1000)])
+    await _rewrite_history(_request(photo), tool_context, policy)
+
+    async def process_part(part, callback_context):
+        raise AssertionError("history was processed again")
+
+    monkeypatch.setattr(callbacks, "_process_part", process_part)
+
+    llm_request = _request(photo)
+    await _rewrite_history(llm_request, tool_context, policy)
+
+    assert len(_artifact_ids(llm_request)) == 1
@@ -0,0 +1,76 @@
+from google.genai.types import Blob, Part
+
+from recipe_agent.compaction import Attachment, CompactionPolicy
+from recipe_agent.compaction import flatten_items, select_inline_attachments
+
+
+def _attachment(artifact_id: str, size: int = 100) -> Attachment:
+    return Attachment(
+        artifact_id,
+        Part(text=f"Below is the content of artifact ID : {artifact_id}"),
+        Part(inline_data=Blob(mime_type="image/jpeg", data=b"x" * size)),
+    )
+
+
+def test_current_turn_is_always_kept_inline():
+    current = _attachment("current", size=1000)
+    policy = CompactionPolicy(keep_recent_turns=0, max_inline_bytes=10)
+
+    assert select_inline_attachments([(0, [current])], policy) == {id(current)}
+
+
+def test_old_turns_are_compacted():
+    old = _attachment("old")
+    recent = _attachment("recent")
+    policy = CompactionPolicy(keep_recent_turns=2)
+
+    keep = select_inline_attachments([(2, [old]), (1, [recent])], policy)
+
+    assert keep == {id(recent)}
+
+
+def test_byte_budget_keeps_the_newest_attachments():
+    older = _attachment("older", size=600)
+    newer = _attachment("newer", size=600)
+    policy = CompactionPolicy(keep_recent_turns=5, max_inline_bytes=1000)
+
+    keep = select_inline_attachments([(2, [older]), (1, [newer])], policy)
+
+    assert keep == {id(newer)}
+
+
+def test_only_the_latest_copy_of_an_artifact_is_kept():
+    first = _attachment("photo")
+    again = _attachment("photo")
+    policy = CompactionPolicy()
+
+    keep = select_inline_attachments([(1, [first]), (0, [again])], policy)
+
+    assert keep == {id(again)}
+
+
+def test_disabled_policy_keeps_everything():
+    items = [_attachment("a"), _attachment("a"), _attachment("b")]
+    policy = CompactionPolicy(enabled=False)
+
+    keep = select_inline_attachments([(10, items)], policy)
+
+    assert keep == {id(item) for item in items}
+
+
+def test_compacted_attachment_becomes_a_stub():
+    kept = _attachment("kept")
+    dropped = _attachment("dropped")
+    text = Part(text="Here is the photo.")
+
+    parts = flatten_items(
+        [text, kept, dropped],
+        {id(kept)},
+        {"dropped": "Photo of a tomato salad."}
+    )
+
+    assert parts[:3] == [text, kept.header, kept.payload]
+    assert len(parts) == 4
+    assert "Artifact ID : dropped" in parts[3].text
+    assert "Photo of a tomato salad." in parts[3].text
+    assert "reload_artifacts" in parts[3].text
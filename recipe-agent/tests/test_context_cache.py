@@ -0,0 +1,215 @@
+import asyncio
+import gc
+import time
+import weakref
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from recipe_agent import context_cache
+from recipe_agent.context_cache import ContextCacheManager, get_context_cache_manager
+
+
+INSTRUCTION = "You are a helpful cook. " * 100
+
+
+class StubCaches:
+    """Stands in for `google.genai.Client.aio.caches`."""
+
+    def __init__(self, ttl_seconds: float = 3600, fail: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.fail = fail
+        self.created = []
+        self.updated = []
+        self.deleted = []
+        self.gate: asyncio.Event | None = None
+        self.gated_tools: set[str] | None = None
+
+    def _cached_content(self, name: str) -> types.CachedContent:
+        return types.CachedContent(
+            name=name,
+            expire_time=datetime.fromtimestamp(time.time() + self.ttl_seconds, timezone.utc),
+        )
+
+    async def create(self, model, config):
+        tool = config.tools[0].function_declarations[0].name
+        if self.gate is not None and (self.gated_tools is None or tool in self.gated_tools):
+            await self.gate.wait()
+        if self.fail:
+            raise ValueError("prefix too small")
+
+        self.created.append(config)
+        return self._cached_content(f"cachedContents/{len(self.created)}")
+
+    async def update(self, name, config):
+        if self.gate is not None:
+            await self.gate.wait()
+
+        self.updated.append(name)
+        return self._cached_content(name)
+
+    async def delete(self, name):
+        self.deleted.append(name)
+
+
+def _manager(caches: StubCaches, **kwargs) -> ContextCacheManager:
+    return ContextCacheManager(SimpleNamespace(aio=SimpleNamespace(caches=caches)), **kwargs)
+
+
+def _request(instruction: str = INSTRUCTION, tool: str = "search") -> LlmRequest:
+    return LlmRequest(
+        model="gemini-2.5-flash",
+        config=types.GenerateContentConfig(
+            system_instruction=instruction,
+            tools=[types.Tool(function_declarations=[types.FunctionDeclaration(name=tool)])],
+        ),
+    )
+
+
+async def test_request_is_pointed_at_the_cached_prefix():
+    caches = StubCaches()
+    manager = _manager(caches, min_tokens=10)
+
+    first = _request()
+    second = _request()
+    await manager.apply(first)
+    await manager.apply(second)
+
+    assert len(caches.created) == 1
+    assert first.config.cached_content == "cachedContents/1"
+    assert first.config.system_instruction is None
+    assert first.config.tools is None
+    assert second.config.cached_content == "cachedContents/1"
+
+
+async def test_short_prefix_is_sent_uncached():
+    caches = StubCaches()
+    llm_request = _request(instruction="Be brief.")
+
+    assert await _manager(caches, min_tokens=10).apply(llm_request) is None
+    assert llm_request.config.system_instruction == "Be brief."
+    assert not caches.created
+
+
+async def test_restore_sends_the_full_prefix_and_recreates_the_cache():
+    caches = StubCaches()
+    manager = _manager(caches, min_tokens=10)
+    llm_request = _request()
+
+    manager.restore(llm_request, await manager.apply(llm_request))
+
+    assert llm_request.config.cached_content is None
+    assert llm_request.config.system_instruction == INSTRUCTION
+
+    await manager.apply(_request())
+    assert len(caches.created) == 2
+
+
+async def test_failed_creation_is_not_retried_until_it_expires():
+    caches = StubCaches(fail=True)
+    manager = _manager(caches, min_tokens=10)
+
+    assert await manager.apply(_request()) is None
+    caches.fail = False
+    assert await manager.apply(_request()) is None
+    assert not caches.created
+
+
+async def test_changed_prompt_replaces_the_cache_without_deleting_it():
+    caches = StubCaches()
+    manager = _manager(caches, min_tokens=10)
+
+    await manager.apply(_request())
+    await manager.apply(_request(instruction=INSTRUCTION + "Be brief."))
+    await manager.apply(_request(tool="render"))
+
+    # Requests in flight may still use the replaced cache; it expires on
+    # its own.
+    assert not caches.deleted
+    assert len(manager._entries) == 2
+
+
+async def test_least_recently_used_prefixes_are_forgotten():
+    caches = StubCaches()
+    manager = _manager(caches, min_tokens=10, max_entries=2)
+
+    for tool in ("a", "b", "a", "c"):
+        await manager.apply(_request(tool=tool))
+
+    await manager.apply(_request(tool="a"))
+    await manager.apply(_request(tool="b"))
+
+    assert len(caches.created) == 4
+    assert not caches.deleted
+
+
+async def test_creating_one_prefix_does_not_block_another():
+    caches = StubCaches()
+    caches.gate = asyncio.Event()
+    caches.gated_tools = {"slow"}
+    manager = _manager(caches, min_tokens=10)
+
+    blocked = asyncio.create_task(manager.apply(_request(tool="slow")))
+    await asyncio.sleep(0)
+
+    applied = await asyncio.wait_for(manager.apply(_request(tool="fast")), timeout=1)
+
+    assert applied is not None
+    assert not blocked.done()
+
+    caches.gate.set()
+    assert await blocked is not None
+
+
+async def test_requests_keep_using_a_cache_while_it_is_renewed():
+    caches = StubCaches(ttl_seconds=60)
+    manager = _manager(caches, min_tokens=10, refresh_seconds=300)
+    await manager.apply(_request())
+
+    caches.gate = asyncio.Event()
+    renewing = asyncio.create_task(manager.apply(_request()))
+    await asyncio.sleep(0)
+
+    waiting = _request()
+    await asyncio.wait_for(manager.apply(waiting), timeout=1)
+
+    assert waiting.config.cached_content == "cachedContents/1"
+
+    caches.gate.set()
+    await renewing
+    assert caches.updated == ["cachedContents/1"]
+    assert len(caches.created) == 1
+
+
+async def test_close_deletes_the_caches_still_served():
+    caches = StubCaches()
+    manager = _manager(caches, min_tokens=10)
+    await manager.apply(_request(tool="a"))
+    await manager.apply(_request(tool="b"))
+
+    await manager.close()
+
+    assert sorted(caches.deleted) == ["cachedContents/1", "cachedContents/2"]
+
+
+class StubClient:
+    def __init__(self, caches: StubCaches):
+        self.aio = SimpleNamespace(caches=caches)
+
+
+def test_manager_is_dropped_with_its_client(monkeypatch):
+    managers = weakref.WeakKeyDictionary()
+    monkeypatch.setattr(context_cache, "_context_cache_managers", managers)
+    client = StubClient(StubCaches())
+
+    manager = get_context_cache_manager(client)
+
+    assert get_context_cache_manager(client) is manager
+    assert manager.client.aio is client.aio
+
+    del client
+    gc.collect()
+
+    assert len(managers) == 0
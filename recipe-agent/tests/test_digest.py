@@ -0,0 +1,91 @@
+from io import BytesIO
+
+from google.adk.models import LlmRequest
+from google.genai.types import Content, FunctionResponse, Part
+from PIL import Image
+
+from recipe_agent.callbacks import _rewrite_history
+from recipe_agent.compaction import CompactionPolicy
+from recipe_agent.digest import build_recipe_digest, count_pdf_file_pages
+from recipe_agent.digest import count_pdf_pages, thumbnail_artifact_id
+from recipe_agent.documents import build_recipe_pdf
+from recipe_agent.tools import generate_recipe_document
+
+
+def test_recipe_digest_carries_the_recipe(recipe):
+    digest = build_recipe_digest("bruschetta_recipe.pdf", recipe, 2)
+
+    assert digest.startswith("# Test Bruschetta\n")
+    assert "bruschetta_recipe.pdf (PDF, 2 page(s))" in digest
+    assert "- 2 tomatoes" in digest
+    assert "3. Rub with garlic." in digest
+
+
+def test_page_count_matches_the_rendered_document(recipe, tmp_path):
+    recipe = {**recipe, "method": [" ".join(["Stir well."] * 40)] * 30}
+    pdf_bytes = build_recipe_pdf(recipe, b"", "print_friendly")
+
+    path = tmp_path / "recipe.pdf"
+    path.write_bytes(pdf_bytes)
+
+    assert count_pdf_pages(pdf_bytes) > 1
+    assert count_pdf_file_pages(str(path)) == count_pdf_pages(pdf_bytes)
+
+
+async def _generate(tool_context, recipe, template: str) -> dict:
+    image = BytesIO()
+    Image.new("RGB", (64, 48), (200, 120, 40)).save(image, format="JPEG")
+    await tool_context.save_artifact(
+        "user_uploaded_img_1.jpg",
+        Part.from_bytes(data=image.getvalue(), mime_type="image/jpeg")
+    )
+
+    return await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+        template=template,
+        output_format="pdf",
+    )
+
+
+async def test_model_sees_the_digest_instead_of_the_pdf(tool_context, recipe):
+    result = await _generate(tool_context, recipe, "compact")
+    response = Content(role="user", parts=[Part(
+        function_response=FunctionResponse(
+            name="generate_recipe_document",
+            response=result
+        )
+    )])
+
+    llm_request = LlmRequest(model="gemini-2.5-flash", contents=[response])
+    await _rewrite_history(llm_request, tool_context, CompactionPolicy())
+
+    parts = llm_request.contents[0].parts
+    assert not any(
+        part.inline_data and part.inline_data.mime_type == "application/pdf"
+        for part in parts
+    )
+    assert any(part.text and "# Test Bruschetta" in part.text for part in parts)
+    assert any(
+        part.inline_data and part.inline_data.mime_type == "image/jpeg"
+        for part in parts
+    )
+
+
+async def test_text_only_template_gets_no_thumbnail(tool_context, recipe):
+    result = await _generate(tool_context, recipe, "print_friendly")
+
+    thumbnail_id = thumbnail_artifact_id(result["generated_file_artifact_id"])
+    assert await tool_context.load_artifact(thumbnail_id) is None
+
+
+async def test_text_only_render_removes_a_stale_thumbnail(tool_context, recipe):
+    result = await _generate(tool_context, recipe, "compact")
+    thumbnail_id = thumbnail_artifact_id(result["generated_file_artifact_id"])
+    assert await tool_context.load_artifact(thumbnail_id) is not None
+
+    await _generate(tool_context, recipe, "print_friendly")
+
+    assert await tool_context.load_artifact(thumbnail_id) is None
+    assert thumbnail_id not in await tool_context.list_artifacts()
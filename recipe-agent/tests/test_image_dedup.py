@@ -0,0 +1,101 @@
+from io import BytesIO
+
+import pytest
+from google.genai.types import Blob, Part
+from PIL import Image, ImageDraw
+
+from recipe_agent import callbacks
+from recipe_agent.callbacks import _process_inline_data_part
+from recipe_agent.image_dedup import ImageDedupPolicy, find_duplicate
+from recipe_agent.image_dedup import image_fingerprint, remember_image
+from recipe_agent.images import image_dhash
+
+
+POLICY = ImageDedupPolicy(enabled=True, scope="session", max_distance=6, max_entries=2)
+
+
+def _photo(size=(640, 480), seed: int = 0) -> Image.Image:
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    width, height = size
+
+    for i in range(6):
+        x = (seed * 97 + i * 53) % width
+        y = (seed * 61 + i * 89) % height
+        draw.ellipse((x, y, x + width // 4, y + height // 4), fill=(200, 40 * i, 255 - 30 * i))
+
+    return image
+
+
+def _encode(image: Image.Image, image_format: str = "JPEG", **kwargs) -> bytes:
+    output = BytesIO()
+    image.save(output, format=image_format, **kwargs)
+    return output.getvalue()
+
+
+def _distance(a: bytes, b: bytes) -> int:
+    return (image_dhash(a) ^ image_dhash(b)).bit_count()
+
+
+def test_dhash_survives_reencoding_and_resizing():
+    photo = _photo()
+    original = _encode(photo, quality=95)
+
+    assert _distance(original, _encode(photo, quality=40)) <= POLICY.max_distance
+    assert _distance(original, _encode(photo, "PNG")) <= POLICY.max_distance
+    assert _distance(original, _encode(photo.resize((320, 240)))) <= POLICY.max_distance
+
+
+def test_dhash_tells_different_photos_apart():
+    assert _distance(_encode(_photo(seed=0)), _encode(_photo(seed=5))) > POLICY.max_distance
+
+
+async def test_undecodable_upload_has_no_fingerprint():
+    assert await image_fingerprint(b"not an image") is None
+
+
+async def test_find_duplicate_returns_the_closest_match(tool_context):
+    remember_image(tool_context, "far.jpg", 0b1111, POLICY)
+    remember_image(tool_context, "near.jpg", 0b0001, POLICY)
+
+    assert find_duplicate(tool_context, 0b0000, POLICY) == "near.jpg"
+    assert find_duplicate(tool_context, (1 << 64) - 1, POLICY) is None
+
+
+async def test_index_keeps_the_most_recent_uploads(tool_context):
+    remember_image(tool_context, "a.jpg", 1, POLICY)
+    remember_image(tool_context, "b.jpg", 2, POLICY)
+    remember_image(tool_context, "a.jpg", 1, POLICY)
+    remember_image(tool_context, "c.jpg", 3, POLICY)
+
+    assert list(tool_context.state[POLICY.state_key]) == ["a.jpg", "c.jpg"]
+
+
+def _upload(image_bytes: bytes, name: str, mime_type: str) -> Part:
+    return Part(inline_data=Blob(data=image_bytes, mime_type=mime_type, display_name=name))
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+async def test_resent_photo_reuses_the_first_artifact(tool_context, monkeypatch, enabled):
+    monkeypatch.setattr(
+        callbacks,
+        "DEFAULT_IMAGE_DEDUP_POLICY",
+        ImageDedupPolicy(enabled=enabled, scope="session"),
+    )
+    photo = _photo()
+
+    first = await _process_inline_data_part(
+        _upload(_encode(photo), "dinner.jpg", "image/jpeg"), tool_context
+    )
+    second = await _process_inline_data_part(
+        _upload(_encode(photo, "PNG"), "IMG_0042.png", "image/png"), tool_context
+    )
+    other = await _process_inline_data_part(
+        _upload(_encode(_photo(seed=5)), "lunch.jpg", "image/jpeg"), tool_context
+    )
+
+    artifacts = await tool_context.list_artifacts()
+
+    assert (second[0].artifact_id == first[0].artifact_id) is enabled
+    assert other[0].artifact_id != first[0].artifact_id
+    assert len(artifacts) == (2 if enabled else 3)
@@ -0,0 +1,114 @@
+from io import BytesIO
+
+import pytest
+from google.genai.types import Blob, Part
+from PIL import Image
+
+from recipe_agent import image_normalization
+from recipe_agent.image_normalization import ImageNormalizationPolicy
+from recipe_agent.image_normalization import _NormalizedImageCache, normalize_image_part
+from recipe_agent.images import normalize_model_image
+
+
+POLICY = ImageNormalizationPolicy(max_edge=768)
+
+
+def _encode(image: Image.Image, image_format: str = "JPEG", **kwargs) -> bytes:
+    output = BytesIO()
+    image.save(output, format=image_format, **kwargs)
+    return output.getvalue()
+
+
+def _open(image_bytes: bytes) -> Image.Image:
+    image = Image.open(BytesIO(image_bytes))
+    image.load()
+    return image
+
+
+def _upload(image_bytes: bytes, mime_type: str = "image/jpeg") -> Part:
+    return Part(inline_data=Blob(data=image_bytes, mime_type=mime_type, display_name="dinner"))
+
+
+@pytest.fixture(autouse=True)
+def normalized_images(monkeypatch):
+    cache = _NormalizedImageCache(max_entries=8)
+    monkeypatch.setattr(image_normalization, "_normalized_images", cache)
+    return cache
+
+
+def test_large_photo_is_downscaled_to_the_max_edge():
+    photo = _encode(Image.new("RGB", (3000, 2000), (200, 120, 40)))
+
+    image_bytes, mime_type = normalize_model_image(photo, 768)
+
+    assert mime_type == "image/jpeg"
+    assert _open(image_bytes).size == (768, 512)
+
+
+def test_small_metadata_free_jpeg_is_sent_unchanged():
+    photo = _encode(Image.new("RGB", (640, 480), (200, 120, 40)))
+
+    assert normalize_model_image(photo, 768) is None
+
+
+def test_metadata_is_dropped_and_orientation_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees clockwise.
+    photo = _encode(Image.new("RGB", (400, 200), (200, 120, 40)), exif=exif)
+
+    image_bytes, _ = normalize_model_image(photo, 768)
+    image = _open(image_bytes)
+
+    assert image.size == (200, 400)
+    assert not image.getexif()
+
+
+def test_transparent_png_is_flattened_onto_white():
+    logo = _encode(Image.new("RGBA", (1600, 1600), (255, 0, 0, 0)), "PNG")
+
+    image_bytes, mime_type = normalize_model_image(logo, 768)
+    image = _open(image_bytes)
+
+    assert mime_type == "image/jpeg"
+    assert image.mode == "RGB"
+    assert all(channel > 245 for channel in image.getpixel((10, 10)))
+
+
+def test_webp_output_format():
+    photo = _encode(Image.new("RGB", (3000, 2000), (200, 120, 40)))
+
+    image_bytes, mime_type = normalize_model_image(photo, 768, "WEBP")
+
+    assert mime_type == "image/webp"
+    assert _open(image_bytes).format == "WEBP"
+
+
+async def test_normalized_part_keeps_its_name_and_is_cached(normalized_images, monkeypatch):
+    photo = _encode(Image.new("RGB", (3000, 2000), (200, 120, 40)))
+
+    first = await normalize_image_part(_upload(photo), POLICY)
+
+    def fail(*args):
+        raise AssertionError("the image was normalized again")
+
+    monkeypatch.setattr("recipe_agent.images.normalize_model_image", fail)
+    second = await normalize_image_part(_upload(photo), POLICY)
+
+    assert first.inline_data.display_name == "dinner"
+    assert len(first.inline_data.data) < len(photo)
+    assert second.inline_data.data == first.inline_data.data
+
+
+@pytest.mark.parametrize("part", [
+    Part(text="hello"),
+    _upload(b"%PDF-1.4", "application/pdf"),
+    _upload(b"not an image"),
+])
+async def test_parts_that_cannot_be_normalized_are_sent_as_they_are(part):
+    assert await normalize_image_part(part, POLICY) is part
+
+
+async def test_disabled_policy_sends_the_original():
+    photo = _upload(_encode(Image.new("RGB", (3000, 2000), (200, 120, 40))))
+
+    assert await normalize_image_part(photo, ImageNormalizationPolicy(enabled=False)) is photo
@@ -0,0 +1,65 @@
+from io import BytesIO
+
+from PIL import Image
+
+from recipe_agent.documents import build_recipe_pdf
+from recipe_agent.images import prepare_pdf_image
+
+
+def _encode(image: Image.Image, image_format: str = "JPEG", **kwargs) -> bytes:
+    output = BytesIO()
+    image.save(output, format=image_format, **kwargs)
+    return output.getvalue()
+
+
+def _open(image_bytes: bytes) -> Image.Image:
+    image = Image.open(BytesIO(image_bytes))
+    image.load()
+    return image
+
+
+def test_pdf_image_is_downscaled_to_the_placement_width():
+    photo = _encode(Image.new("RGB", (4000, 3000), (200, 120, 40)))
+
+    # 144 pt printed at 100 DPI is 200 pixels.
+    prepared = _open(prepare_pdf_image(photo, max_width_pt=144, dpi=100))
+
+    assert prepared.format == "JPEG"
+    assert prepared.size == (200, 150)
+
+
+def test_small_pdf_image_is_not_upscaled():
+    photo = _encode(Image.new("RGB", (120, 80), (200, 120, 40)))
+
+    prepared = _open(prepare_pdf_image(photo, max_width_pt=720, dpi=150))
+
+    assert prepared.size == (120, 80)
+
+
+def test_pdf_image_applies_exif_orientation():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees clockwise.
+    photo = _encode(Image.new("RGB", (400, 200), (200, 120, 40)), exif=exif)
+
+    prepared = _open(prepare_pdf_image(photo, max_width_pt=720, dpi=150))
+
+    assert prepared.size == (200, 400)
+    assert 0x0112 not in prepared.getexif()
+
+
+def test_pdf_image_flattens_transparency_onto_white():
+    logo = _encode(Image.new("RGBA", (50, 50), (255, 0, 0, 0)), "PNG")
+
+    prepared = _open(prepare_pdf_image(logo, max_width_pt=720, dpi=150))
+
+    assert prepared.mode == "RGB"
+    assert all(channel > 245 for channel in prepared.getpixel((25, 25)))
+
+
+def test_recipe_pdf_embeds_the_image_once(recipe):
+    photo = _encode(Image.new("RGB", (1600, 1200), (200, 120, 40)))
+
+    # The hero image and the side image share one XObject.
+    pdf_bytes = build_recipe_pdf(recipe, photo, "hero_side_image")
+
+    assert pdf_bytes.count(b"/Subtype /Image") == 1
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import DEFAULT_FORBIDDEN
+
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(statement: str, **env: str) -> set[str]:
+    """Returns the modules loaded by `statement` in a fresh interpreter."""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{statement}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=PACKAGE_ROOT,
+        env={**os.environ, "TRACE_EXPORTER": "", **env},
+        check=True,
+    )
+    return set(json.loads(completed.stdout.splitlines()[-1]))
+
+
+def test_importing_the_agent_defers_rendering_and_tracing_sdk():
+    loaded = _loaded_after("import recipe_agent")
+
+    assert "recipe_agent.agent" in loaded
+    assert not [
+        module for module in loaded
+        if any(
+            module == forbidden or module.startswith(f"{forbidden}.")
+            for forbidden in DEFAULT_FORBIDDEN
+        )
+    ]
+
+
+def test_tracing_sdk_is_loaded_once_an_exporter_is_configured(tmp_path):
+    loaded = _loaded_after(
+        "import recipe_agent\n"
+        "from recipe_agent.tracing import get_tracer\n"
+        "get_tracer()",
+        TRACE_EXPORTER="json",
+        TRACE_FILE=str(tmp_path / "traces.jsonl"),
+    )
+
+    assert "opentelemetry.sdk.trace" in loaded
+    assert "recipe_agent.trace_export" in loaded
+    assert "reportlab" not in loaded
+
+
+def test_render_loads_reportlab_on_demand(recipe):
+    loaded = _loaded_after(
+        "from recipe_agent.rendering import render_recipe_pdf\n"
+        f"render_recipe_pdf({recipe!r}, b'', 'print_friendly')"
+    )
+
+    assert "recipe_agent.documents" in loaded
+    assert "reportlab" in loaded
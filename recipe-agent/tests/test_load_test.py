@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from benchmarks import load_test
+from benchmarks.harness import BenchmarkHarness
+from benchmarks.load_test import LoadTest
+from benchmarks.scenarios import make_image
+
+
+@pytest.fixture(scope="module")
+def harness():
+    return BenchmarkHarness()
+
+
+def _load_test(harness, output_format: str = "pdf", sessions: int = 2) -> LoadTest:
+    return LoadTest(
+        harness,
+        sessions=sessions,
+        arrival_rate=0,
+        poisson=False,
+        clarifications=1,
+        images=[make_image(320, 240)],
+        output_format=output_format,
+        sample_interval=0.1,
+    )
+
+
+async def test_sessions_run_every_turn(harness):
+    result = await _load_test(harness).run()
+
+    assert result.failed_sessions == 0
+    assert result.turns == 2 * 4
+    assert set(result.turn_latency_by_kind) == {"upload", "clarify", "document", "follow_up"}
+    assert result.tool_errors == 0
+    assert result.errors == []
+
+
+async def test_tool_error_fails_the_session(harness):
+    # The document tool rejects the format and returns an error status.
+    result = await _load_test(harness, output_format="docx").run()
+
+    assert result.failed_sessions == 2
+    assert result.tool_errors_by_kind == {"document": {"generate_recipe_document": 2}}
+    assert result.tool_errors == 2
+    assert result.sessions_per_second == 0
+    assert "generate_recipe_document" in result.errors[0]
+
+
+def test_command_exits_non_zero_when_a_session_fails(tmp_path, capsys):
+    json_path = tmp_path / "load.json"
+
+    exit_code = load_test.main([
+        "--sessions", "1",
+        "--arrival-rate", "0",
+        "--model-latency", "0",
+        "--image-size", "320x240",
+        "--output-format", "docx",
+        "--json", str(json_path),
+    ])
+
+    assert exit_code == 1
+    assert json.loads(json_path.read_text())["tool_errors"] == 1
+    assert "generate_recipe_document x1" in capsys.readouterr().out
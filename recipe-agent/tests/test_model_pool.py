@@ -0,0 +1,218 @@
+import asyncio
+import time
+
+import pytest
+from google.genai.errors import ClientError, ServerError
+
+from recipe_agent.model_pool import AdaptiveConcurrencyLimiter, ModelAccessPolicy
+from recipe_agent.model_pool import backoff_delay, generate_with_limits
+
+
+NO_BACKOFF = ModelAccessPolicy(max_attempts=3, backoff_base_seconds=0, backoff_max_seconds=0)
+
+
+def _error(error_class, code: int):
+    return error_class(code, {"error": {"code": code, "message": "boom", "status": "X"}})
+
+
+async def _answer(limiter: AdaptiveConcurrencyLimiter, overloaded: bool = False) -> None:
+    permit = await limiter.acquire()
+    permit.first_response_at = time.monotonic()
+    permit.overloaded = overloaded
+    limiter.release(permit)
+
+
+async def test_limit_grows_by_about_one_slot_per_limit_fast_responses():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+    await _answer(limiter)
+    await _answer(limiter)
+
+    assert limiter.limit == 2
+
+    await _answer(limiter)
+
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+
+
+async def test_limit_never_exceeds_the_maximum():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+
+    for _ in range(5):
+        await _answer(limiter)
+
+    assert limiter.limit == 2
+
+
+async def test_overload_halves_the_limit_once_per_congestion_event():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    permits = [await limiter.acquire() for _ in range(3)]
+
+    for permit in permits:
+        permit.overloaded = True
+        limiter.release(permit)
+
+    assert limiter.limit == 4
+    assert limiter.stats()["decreases"] == 1
+    assert limiter.stats()["overloads"] == 3
+
+    # A request started after the decrease may lower it again.
+    await _answer(limiter, overloaded=True)
+
+    assert limiter.limit == 2
+
+
+async def test_slow_first_response_shrinks_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_target_seconds=0)
+    permit = await limiter.acquire()
+    permit.first_response_at = time.monotonic() + 1
+
+    limiter.release(permit)
+
+    assert limiter.limit == 9
+    assert limiter.stats()["slow_responses"] == 1
+
+
+async def test_limit_never_drops_below_the_minimum():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+
+    await _answer(limiter, overloaded=True)
+
+    assert limiter.limit == 2
+
+
+async def test_waiters_are_served_in_arrival_order():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    held = await limiter.acquire()
+    served = []
+
+    async def request(name: str):
+        permit = await limiter.acquire()
+        served.append(name)
+        limiter.release(permit)
+
+    tasks = [asyncio.create_task(request(name)) for name in ("first", "second", "third")]
+    await asyncio.sleep(0)
+
+    assert limiter.queue_depth == 3
+
+    limiter.release(held)
+    await asyncio.gather(*tasks)
+
+    assert served == ["first", "second", "third"]
+    assert limiter.stats()["max_queue_depth"] == 3
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    held = await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.queue_depth == 0
+
+    limiter.release(held)
+
+    assert limiter.in_flight == 0
+
+
+async def test_waiter_cancelled_after_its_grant_passes_the_slot_on():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    held = await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    # The slot is granted, but the waiter is cancelled before it resumes.
+    limiter.release(held)
+    waiter.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.in_flight == 0
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+
+def _attempts(*outcomes):
+    """Returns a `generate` callable whose attempts play out `outcomes`."""
+    calls = []
+
+    def generate():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+
+        async def responses():
+            for item in outcome:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+
+        return responses()
+
+    return generate, calls
+
+
+async def _collect(generate, limiter, policy=NO_BACKOFF):
+    return [
+        response
+        async for response in generate_with_limits(generate, None, limiter, policy)
+    ]
+
+
+async def test_overloaded_request_is_retried_and_backs_off_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    generate, calls = _attempts([_error(ServerError, 503)], ["a", "b"])
+
+    assert await _collect(generate, limiter) == ["a", "b"]
+    assert len(calls) == 2
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+async def test_non_retryable_error_is_raised_right_away():
+    limiter = AdaptiveConcurrencyLimiter()
+    generate, calls = _attempts([_error(ClientError, 400)], ["a"])
+
+    with pytest.raises(ClientError):
+        await _collect(generate, limiter)
+
+    assert len(calls) == 1
+    assert limiter.in_flight == 0
+
+
+async def test_error_after_the_first_response_is_not_retried():
+    limiter = AdaptiveConcurrencyLimiter()
+    generate, calls = _attempts(["a", _error(ServerError, 500)], ["b"])
+    received = []
+
+    with pytest.raises(ServerError):
+        async for response in generate_with_limits(generate, None, limiter, NO_BACKOFF):
+            received.append(response)
+
+    assert received == ["a"]
+    assert len(calls) == 1
+
+
+async def test_retries_stop_after_max_attempts():
+    limiter = AdaptiveConcurrencyLimiter()
+    generate, calls = _attempts(*[[_error(ServerError, 500)]] * 4)
+
+    with pytest.raises(ServerError):
+        await _collect(generate, limiter)
+
+    assert len(calls) == NO_BACKOFF.max_attempts
+    assert limiter.in_flight == 0
+
+
+def test_backoff_is_jittered_within_the_capped_delay():
+    policy = ModelAccessPolicy(backoff_base_seconds=1, backoff_max_seconds=5)
+
+    for attempt, (low, high) in enumerate([(0.5, 1), (1, 2), (2, 4), (2.5, 5), (2.5, 5)]):
+        delay = backoff_delay(attempt, policy)
+        assert low <= delay <= high
@@ -0,0 +1,79 @@
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+from google.genai.errors import ServerError
+
+from recipe_agent import model_pool, models
+from recipe_agent.model_pool import AdaptiveConcurrencyLimiter
+from recipe_agent.models import RecipeGemini, _attempt_request
+
+
+def _request() -> LlmRequest:
+    return LlmRequest(
+        model="gemini-2.5-flash",
+        contents=[
+            types.Content(role="user", parts=[
+                types.Part(inline_data=types.Blob(
+                    data=b"\xff\xd8\xff", mime_type="image/jpeg", display_name="dinner"
+                )),
+            ]),
+            types.Content(role="model", parts=[types.Part(text="Looks tasty.")]),
+        ],
+        config=types.GenerateContentConfig(
+            system_instruction="You are a helpful cook.",
+            labels={"agent": "root"},
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def limiter(monkeypatch):
+    limiter = AdaptiveConcurrencyLimiter()
+    monkeypatch.setattr(model_pool, "_limiter", limiter)
+    monkeypatch.setattr(model_pool, "backoff_delay", lambda attempt, policy: 0)
+    monkeypatch.setattr(models, "CONTEXT_CACHE_ENABLED", False)
+    return limiter
+
+
+async def test_preprocessing_a_copy_leaves_the_request_untouched():
+    llm_request = _request()
+    original = llm_request.model_dump()
+    model = RecipeGemini(model="gemini-2.5-flash")
+
+    attempt = _attempt_request(llm_request)
+    await model._preprocess_request(attempt)
+    model._maybe_append_user_content(attempt)
+
+    assert len(attempt.contents) == 3
+    assert attempt.contents[0].parts[0].inline_data.display_name is None
+    assert llm_request.model_dump() == original
+
+
+async def test_each_retry_sends_the_request_as_the_agent_built_it(monkeypatch, limiter):
+    llm_request = _request()
+    original = llm_request.model_dump()
+    sent = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        sent.append(llm_request)
+        # Stand-ins for the edits `Gemini` makes before sending.
+        llm_request.contents.append(types.Content(role="user", parts=[types.Part(text="Continue.")]))
+        llm_request.config.labels = None
+
+        if len(sent) == 1:
+            raise ServerError(503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Done.")]))
+
+    monkeypatch.setattr(Gemini, "generate_content_async", generate_content_async)
+    model = RecipeGemini(model="gemini-2.5-flash")
+
+    responses = [response async for response in model.generate_content_async(llm_request)]
+
+    assert [response.content.parts[0].text for response in responses] == ["Done."]
+    assert len(sent) == 2
+    assert sent[0] is not sent[1]
+    assert len(sent[1].contents) == 3
+    assert sent[1].config.labels is None
+    assert llm_request.model_dump() == original
+    assert limiter.in_flight == 0
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from google.genai.types import Part
+
+from recipe_agent.output_formats import PREFERRED_OUTPUT_FORMAT_STATE_KEY
+from recipe_agent.output_formats import render_recipe_html, render_recipe_json
+from recipe_agent.output_formats import render_recipe_markdown
+from recipe_agent.tools import generate_recipe_document
+
+
+def test_markdown_lists_ingredients_and_numbered_steps(recipe):
+    markdown = render_recipe_markdown(recipe, "https://example.com/img.jpg")
+
+    assert markdown.startswith("# Test Bruschetta\n")
+    assert "![Test Bruschetta](https://example.com/img.jpg)" in markdown
+    assert "- 2 tomatoes" in markdown
+    assert "3. Rub with garlic." in markdown
+    assert "<b>" not in markdown
+
+
+def test_html_escapes_recipe_text(recipe):
+    recipe = {**recipe, "recipe_name": "Mac & <Cheese>"}
+
+    document = render_recipe_html(recipe, "https://example.com/img.jpg?a=1&b=2")
+
+    assert "<h1>Mac &amp; &lt;Cheese&gt;</h1>" in document
+    assert 'src="https://example.com/img.jpg?a=1&amp;b=2"' in document
+    assert "<Cheese>" not in document
+
+
+def test_json_is_a_schema_org_recipe(recipe):
+    document = json.loads(render_recipe_json(recipe, "https://example.com/img.jpg"))
+
+    assert document["@type"] == "Recipe"
+    assert document["recipeIngredient"] == recipe["ingredients"]
+    assert document["recipeInstructions"][2] == {
+        "@type": "HowToStep",
+        "position": 3,
+        "text": "Rub with garlic.",
+    }
+
+
+async def _save_photo(tool_context) -> None:
+    await tool_context.save_artifact(
+        "user_uploaded_img_1.jpg",
+        Part.from_bytes(data=b"\xff\xd8\xff", mime_type="image/jpeg")
+    )
+
+
+@pytest.mark.parametrize("output_format, extension, mime_type", [
+    ("html", "html", "text/html"),
+    ("markdown", "md", "text/markdown"),
+    ("json", "json", "application/ld+json"),
+])
+async def test_text_document_is_saved_as_an_artifact(
+    tool_context, recipe, output_format, extension, mime_type
+):
+    await _save_photo(tool_context)
+
+    result = await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+        output_format=output_format,
+    )
+
+    artifact_id = result["generated_file_artifact_id"]
+    document = await tool_context.load_artifact(artifact_id)
+
+    assert result["status"] == "success"
+    assert artifact_id == f"test_bruschetta_recipe.{extension}"
+    assert document.inline_data.mime_type == mime_type
+    assert b"Rub with garlic." in document.inline_data.data
+
+
+async def test_session_preference_picks_the_format(tool_context, recipe):
+    await _save_photo(tool_context)
+    tool_context.state[PREFERRED_OUTPUT_FORMAT_STATE_KEY] = "markdown"
+
+    result = await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+    )
+
+    assert result["generated_file_artifact_id"].endswith(".md")
+
+
+async def test_text_document_needs_the_image_artifact(tool_context, recipe):
+    result = await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+        output_format="html",
+    )
+
+    assert result["status"] == "error"
+    assert "missing" in result["message"]
+
+
+async def test_unknown_format_is_rejected(tool_context, recipe):
+    result = await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+        output_format="docx",
+    )
+
+    assert result["status"] == "error"
+    assert "markdown" in result["message"]
@@ -0,0 +1,135 @@
+import os
+from io import BytesIO
+
+import pytest
+from google.adk.artifacts import InMemoryArtifactService
+from google.genai import types
+from PIL import Image
+
+from recipe_agent import render_cache
+from recipe_agent.render_cache import RenderCache, make_render_key
+from recipe_agent.tools import generate_recipe_document
+
+
+class EvictingArtifactService(InMemoryArtifactService):
+    """Counts evictions the way `LocalArtifactService` does."""
+
+    evictions: int = 0
+
+    async def evict(self, **kwargs) -> None:
+        await self.delete_artifact(**kwargs)
+        self.evictions += 1
+
+
+@pytest.fixture
+def artifact_service():
+    return EvictingArtifactService()
+
+
+async def test_memory_tier_is_bounded_by_entries_and_bytes():
+    cache = RenderCache(max_entries=2, max_bytes=10)
+
+    await cache.put("a", b"aaaa")
+    await cache.put("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"
+
+    # Over the entry bound; "b" is the least recently used.
+    await cache.put("c", b"cccc")
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"aaaa"
+
+    # Over the byte bound.
+    await cache.put("d", b"dddddddd")
+    assert await cache.get("a") is None
+    assert await cache.get("c") is None
+
+    # Larger than the whole cache; not kept at all.
+    await cache.put("e", b"e" * 11)
+    assert await cache.get("e") is None
+
+    assert cache.stats()["bytes"] == 8
+
+
+async def test_disk_tier_survives_a_new_cache(tmp_path):
+    await RenderCache(disk_dir=str(tmp_path)).put("key", b"%PDF")
+
+    cache = RenderCache(disk_dir=str(tmp_path))
+
+    assert await cache.get("key") == b"%PDF"
+    assert cache.stats()["disk_hits"] == 1
+
+
+async def test_disk_tier_evicts_least_recently_used_without_rescanning(tmp_path, monkeypatch):
+    cache = RenderCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=10)
+
+    def scandir(path):
+        raise AssertionError("the disk tier was rescanned")
+
+    monkeypatch.setattr(render_cache.os, "scandir", scandir)
+
+    await cache.put("a", b"aaaa")
+    await cache.put("b", b"bbbb")
+    # Only in memory: "b". Reading "a" from disk makes it the most recent.
+    assert await cache.get("a") == b"aaaa"
+    await cache.put("c", b"cccc")
+
+    assert sorted(os.listdir(tmp_path)) == ["a.bin", "c.bin"]
+
+
+async def test_disk_tier_counts_files_left_by_an_earlier_process(tmp_path):
+    await RenderCache(disk_dir=str(tmp_path)).put("old", b"oooooo")
+
+    cache = RenderCache(disk_dir=str(tmp_path), disk_max_bytes=10)
+    await cache.put("new", b"nnnnnn")
+
+    assert os.listdir(tmp_path) == ["new.bin"]
+
+
+def test_render_key_changes_with_the_render_config(monkeypatch, recipe):
+    key = make_render_key(recipe, "image-hash", "compact")
+    assert make_render_key(recipe, "image-hash", "compact") == key
+
+    monkeypatch.setattr(render_cache, "PDF_IMAGE_DPI", 300)
+    assert make_render_key(recipe, "image-hash", "compact") != key
+
+    monkeypatch.undo()
+    monkeypatch.setattr(render_cache, "PDF_IMAGE_JPEG_QUALITY", 95)
+    assert make_render_key(recipe, "image-hash", "compact") != key
+
+    monkeypatch.undo()
+    monkeypatch.setattr(render_cache, "RENDER_FORMAT_VERSION", 2)
+    assert make_render_key(recipe, "image-hash", "compact") != key
+
+
+async def test_evicted_document_is_rendered_again(tool_context, artifact_service, recipe):
+    image = BytesIO()
+    Image.new("RGB", (64, 48), (200, 120, 40)).save(image, format="JPEG")
+    await tool_context.save_artifact(
+        "user_uploaded_img_1.jpg",
+        types.Part.from_bytes(data=image.getvalue(), mime_type="image/jpeg")
+    )
+
+    async def generate():
+        return await generate_recipe_document(
+            **recipe,
+            recipe_image_artifact_id="user_uploaded_img_1.jpg",
+            tool_context=tool_context,
+            template="compact",
+            output_format="pdf",
+        )
+
+    first = await generate()
+    artifact_id = first["generated_file_artifact_id"]
+    assert first["status"] == "success"
+
+    await artifact_service.evict(
+        app_name=tool_context.session.app_name,
+        user_id=tool_context.session.user_id,
+        session_id=tool_context.session.id,
+        filename=artifact_id,
+    )
+
+    second = await generate()
+
+    assert second["status"] == "success"
+    assert await tool_context.load_artifact(artifact_id) is not None
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from google.adk.tools.tool_context import ToolContext
+from google.genai.types import Part
+
+from recipe_agent import render_jobs
+from recipe_agent.artifacts import SessionArtifacts, load_artifact
+from recipe_agent.render_jobs import RENDER_JOBS_STATE_KEY, _SessionJobs
+from recipe_agent.render_jobs import get_render_job, schedule_render_job
+from recipe_agent.session_cache import SessionCache
+
+
+@pytest.fixture(autouse=True)
+def finished_jobs(monkeypatch):
+    # A single session fits, so touching another one evicts the first.
+    cache = SessionCache(_SessionJobs, max_sessions=1)
+    monkeypatch.setattr(render_jobs, "_finished_jobs", cache)
+    return cache
+
+
+def _other_session(tool_context: ToolContext) -> ToolContext:
+    invocation_context = tool_context._invocation_context
+    session = invocation_context.session.model_copy(update={"id": "other-session"})
+
+    return ToolContext(invocation_context.model_copy(update={"session": session}))
+
+
+def _schedule(tool_context: ToolContext, job) -> dict:
+    artifacts = SessionArtifacts(tool_context)
+    return schedule_render_job(tool_context, "doc.pdf", artifacts, job(artifacts))
+
+
+def _render(release: asyncio.Event):
+    async def job(artifacts: SessionArtifacts):
+        await release.wait()
+        await artifacts.save(
+            "doc.pdf",
+            Part.from_bytes(data=b"%PDF", mime_type="application/pdf")
+        )
+        return {"status": "success", "generated_file_artifact_id": "doc.pdf"}
+
+    return job
+
+
+async def test_pending_job_is_reported_until_it_finishes(tool_context):
+    release = asyncio.Event()
+    pending = _schedule(tool_context, _render(release))
+
+    assert pending["status"] == "pending"
+    assert (await get_render_job(tool_context, "doc.pdf"))["status"] == "pending"
+    assert "job_id" not in await get_render_job(tool_context, "doc.pdf", timeout=0.01)
+
+    release.set()
+    result = await get_render_job(tool_context, "doc.pdf", timeout=None)
+
+    assert result["status"] == "success"
+    assert tool_context.actions.artifact_delta["doc.pdf"] == 0
+    assert tool_context.state[RENDER_JOBS_STATE_KEY]["doc.pdf"] == result
+    assert not render_jobs._running_jobs
+
+
+async def test_running_job_outlives_the_session_cache(tool_context):
+    release = asyncio.Event()
+    _schedule(tool_context, _render(release))
+
+    render_jobs._finished_jobs.get(_other_session(tool_context))
+    assert len(render_jobs._running_jobs) == 1
+
+    release.set()
+
+    # `load_artifact` still waits for the render instead of reading nothing.
+    document = await load_artifact(tool_context, "doc.pdf")
+
+    assert document.inline_data.data == b"%PDF"
+    assert tool_context.state[RENDER_JOBS_STATE_KEY]["doc.pdf"]["status"] == "success"
+
+
+async def test_finished_job_is_read_back_after_its_record_is_evicted(tool_context):
+    release = asyncio.Event()
+    _schedule(tool_context, _render(release))
+
+    release.set()
+    await asyncio.wait(list(render_jobs._running_jobs.values()))
+    render_jobs._finished_jobs.get(_other_session(tool_context))
+
+    result = await get_render_job(tool_context, "doc.pdf")
+
+    assert result["status"] == "success"
+    assert tool_context.actions.artifact_delta == {"doc.pdf": 0}
+
+
+async def test_failed_job_reports_the_error(tool_context):
+    async def job(artifacts):
+        raise ValueError("layout failed")
+
+    _schedule(tool_context, job)
+
+    result = await get_render_job(tool_context, "doc.pdf", timeout=None)
+
+    assert result["status"] == "error"
+    assert "layout failed" in result["message"]
+
+
+async def test_rescheduling_cancels_the_running_job(tool_context):
+    first_release = asyncio.Event()
+    _schedule(tool_context, _render(first_release))
+    first = next(iter(render_jobs._running_jobs.values()))
+    await asyncio.sleep(0)
+
+    second_release = asyncio.Event()
+    _schedule(tool_context, _render(second_release))
+    second_release.set()
+
+    result = await get_render_job(tool_context, "doc.pdf", timeout=None)
+
+    assert first.cancelled()
+    assert result["status"] == "success"
+    assert not render_jobs._running_jobs
+
+
+async def test_job_lost_with_its_process_is_reported(tool_context):
+    tool_context.state[RENDER_JOBS_STATE_KEY] = {
+        "doc.pdf": {"status": "pending", "job_id": "from-another-process"},
+    }
+
+    result = await get_render_job(tool_context, "doc.pdf", timeout=None)
+
+    assert result["status"] == "error"
+    assert "restarted" in result["message"]
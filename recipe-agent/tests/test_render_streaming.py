@@ -0,0 +1,125 @@
+import asyncio
+import os
+import time
+from io import BytesIO
+
+import pytest
+from google.genai import types
+from PIL import Image
+
+from recipe_agent import tools
+from recipe_agent.artifact_store import LocalArtifactService
+from recipe_agent.artifacts import SessionArtifacts
+from recipe_agent.render_cache import RenderCache
+from recipe_agent.rendering import RenderExecutor, RenderTimeoutError
+from recipe_agent.tools import _render_document, generate_recipe_document
+
+
+@pytest.fixture
+def artifact_service(tmp_path):
+    service = LocalArtifactService(str(tmp_path / "artifacts"))
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def render_cache(monkeypatch):
+    cache = RenderCache()
+    monkeypatch.setattr(tools, "get_render_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def stream_to_file(monkeypatch):
+    monkeypatch.setattr(tools, "RENDER_STREAM_TO_FILE", True)
+
+
+def _spool_files(artifact_service) -> list[str]:
+    return os.listdir(os.path.join(artifact_service.root_dir, "spool"))
+
+
+async def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+async def test_streamed_document_is_saved_without_the_render_cache(
+    tool_context, artifact_service, render_cache, recipe
+):
+    image = BytesIO()
+    Image.new("RGB", (64, 48), (200, 120, 40)).save(image, format="JPEG")
+    await tool_context.save_artifact(
+        "user_uploaded_img_1.jpg",
+        types.Part.from_bytes(data=image.getvalue(), mime_type="image/jpeg")
+    )
+
+    result = await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+        template="compact",
+        output_format="pdf",
+    )
+
+    document = await tool_context.load_artifact(result["generated_file_artifact_id"])
+
+    assert result["status"] == "success"
+    assert document.inline_data.data.startswith(b"%PDF")
+    assert render_cache.stats()["entries"] == 0
+    assert _spool_files(artifact_service) == []
+
+
+def _failing_render(spool_path: str) -> None:
+    with open(spool_path, "wb") as f:
+        f.write(b"%PDF-partial")
+    raise ValueError("layout failed")
+
+
+async def test_failed_render_leaves_no_spool_file(tool_context, artifact_service, monkeypatch):
+    executor = RenderExecutor(kind="thread", max_workers=1, timeout=5.0)
+    monkeypatch.setattr(tools, "get_render_executor", lambda: executor)
+
+    try:
+        with pytest.raises(ValueError):
+            await _render_document(
+                SessionArtifacts(tool_context), "doc.pdf", "key", None, None,
+                _failing_render,
+            )
+
+    finally:
+        executor.shutdown()
+
+    assert _spool_files(artifact_service) == []
+
+
+def _slow_render(spool_path: str) -> None:
+    time.sleep(0.3)
+    with open(spool_path, "wb") as f:
+        f.write(b"%PDF")
+
+
+async def test_timed_out_render_keeps_its_spool_file_until_it_stops(
+    tool_context, artifact_service, monkeypatch
+):
+    executor = RenderExecutor(kind="thread", max_workers=1, timeout=0.05)
+    monkeypatch.setattr(tools, "get_render_executor", lambda: executor)
+
+    try:
+        with pytest.raises(RenderTimeoutError) as excinfo:
+            await _render_document(
+                SessionArtifacts(tool_context), "doc.pdf", "key", None, None,
+                _slow_render,
+            )
+
+        # The worker is still writing to it.
+        assert len(_spool_files(artifact_service)) == 1
+
+        await _wait_until(excinfo.value.job.done)
+        await _wait_until(lambda: _spool_files(artifact_service) == [])
+
+    finally:
+        executor.shutdown()
+
+    assert await tool_context.load_artifact("doc.pdf") is None
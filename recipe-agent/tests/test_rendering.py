@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+
+from recipe_agent.rendering import RenderExecutor, RenderQueueFullError
+from recipe_agent.rendering import RenderTimeoutError
+
+
+def _thread_executor(**kwargs) -> RenderExecutor:
+    options = {
+        "kind": "thread",
+        "max_workers": 1,
+        "max_pending": 0,
+        "timeout": 5.0,
+        "queue_timeout": 5.0,
+    }
+    options.update(kwargs)
+    return RenderExecutor(**options)
+
+
+async def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+async def test_submissions_beyond_capacity_wait_for_a_slot():
+    executor = _thread_executor()
+    peak = 0
+
+    def job(value):
+        nonlocal peak
+        peak = max(peak, executor.in_flight)
+        time.sleep(0.05)
+        return value
+
+    try:
+        results = await asyncio.gather(*(executor.submit(job, i) for i in range(4)))
+
+    finally:
+        executor.shutdown()
+
+    assert results == [0, 1, 2, 3]
+    assert peak == 1
+    assert executor.in_flight == 0
+    assert executor.queue_depth == 0
+
+
+async def test_submission_is_rejected_after_the_queue_timeout():
+    executor = _thread_executor(queue_timeout=0.05)
+
+    try:
+        running = asyncio.create_task(executor.submit(time.sleep, 0.5))
+        await _wait_until(lambda: executor.in_flight == 1)
+
+        with pytest.raises(RenderQueueFullError):
+            await executor.submit(time.sleep, 0)
+
+        assert executor.queue_depth == 0
+        await running
+
+    finally:
+        executor.shutdown()
+
+    assert executor.in_flight == 0
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    executor = _thread_executor()
+
+    try:
+        running = asyncio.create_task(executor.submit(time.sleep, 0.2))
+        await _wait_until(lambda: executor.in_flight == 1)
+
+        waiting = asyncio.create_task(executor.submit(time.sleep, 0))
+        await _wait_until(lambda: executor.queue_depth == 1)
+        waiting.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert executor.queue_depth == 0
+        await running
+        assert await executor.submit(sum, [1, 2]) == 3
+
+    finally:
+        executor.shutdown()
+
+    assert executor.in_flight == 0
+
+
+async def test_timed_out_thread_job_keeps_its_slot_until_it_stops():
+    executor = _thread_executor(timeout=0.05)
+
+    try:
+        with pytest.raises(RenderTimeoutError) as excinfo:
+            await executor.submit(time.sleep, 0.3)
+
+        # The thread is still rendering, so nothing else may start yet.
+        assert not excinfo.value.job.done()
+        assert executor.in_flight == 1
+
+        await _wait_until(excinfo.value.job.done)
+        assert executor.in_flight == 0
+
+    finally:
+        executor.shutdown()
+
+
+async def test_timed_out_process_job_is_stopped_and_the_pool_replaced():
+    executor = RenderExecutor(
+        kind="process",
+        max_workers=1,
+        max_pending=0,
+        timeout=2.0,
+        queue_timeout=30.0,
+    )
+
+    try:
+        with pytest.raises(RenderTimeoutError) as excinfo:
+            await executor.submit(time.sleep, 60)
+
+        await _wait_until(excinfo.value.job.done)
+        assert executor.in_flight == 0
+
+        assert await executor.submit(sum, [1, 2]) == 3
+
+    finally:
+        executor.shutdown()
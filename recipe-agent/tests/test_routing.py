@@ -0,0 +1,98 @@
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+from google.genai.types import Content, Part
+
+from recipe_agent.routing import PHASE_CLARIFICATION, PHASE_IMAGE_ANALYSIS
+from recipe_agent.routing import PHASE_SYNTHESIS, ROUTING_STATE_KEY, RoutingPolicy
+from recipe_agent.routing import classify_phase, route_request
+
+
+POLICY = RoutingPolicy(max_clarification_turns=2, max_clarification_chars=40)
+
+
+def _user(text: str = "", image: bool = False) -> Content:
+    parts = [Part(text=text)]
+    if image:
+        parts.append(Part.from_bytes(data=b"\xff\xd8", mime_type="image/jpeg"))
+    return Content(role="user", parts=parts)
+
+
+def _model(text: str = "What would you like?") -> Content:
+    return Content(role="model", parts=[Part(text=text)])
+
+
+def _tool_call() -> list[Content]:
+    return [
+        Content(role="model", parts=[Part.from_function_call(name="search", args={})]),
+        Content(role="user", parts=[Part.from_function_response(name="search", response={})]),
+    ]
+
+
+@pytest.mark.parametrize("contents, phase", [
+    ([], PHASE_SYNTHESIS),
+    ([_user("Here is my dinner", image=True)], PHASE_IMAGE_ANALYSIS),
+    ([_user(image=True), _model(), _user("Vegetarian please")], PHASE_CLARIFICATION),
+    # A long answer is treated as the request itself.
+    ([_user(image=True), _model(), _user("x" * 41)], PHASE_SYNTHESIS),
+    # Tool calls in the current turn, whose responses are not user turns.
+    ([_user(image=True), _model(), _user("Yes"), *_tool_call()], PHASE_SYNTHESIS),
+    (
+        [_user(image=True), _model(), _user("a"), _model(), _user("b"), _model(), _user("c")],
+        PHASE_SYNTHESIS,
+    ),
+    ([_user(image=True), _model(), _user("a"), _model(), _user("b")], PHASE_CLARIFICATION),
+])
+def test_classify_phase(contents, phase):
+    assert classify_phase(contents, POLICY) == phase
+
+
+def _request(*contents: Content) -> LlmRequest:
+    return LlmRequest(
+        model="gemini-2.5-pro",
+        contents=list(contents),
+        config=types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(include_thoughts=True, thinking_budget=1024),
+        ),
+    )
+
+
+async def test_clarification_turn_goes_to_the_fast_model(tool_context):
+    policy = RoutingPolicy(fast_model="gemini-2.5-flash-lite", fast_thinking_budget=0)
+    llm_request = _request(_user("Hi"))
+
+    assert route_request(llm_request, tool_context, policy) == PHASE_CLARIFICATION
+
+    assert llm_request.model == "gemini-2.5-flash-lite"
+    assert llm_request.config.thinking_config.include_thoughts is False
+    assert llm_request.config.thinking_config.thinking_budget == 0
+    assert tool_context.state[ROUTING_STATE_KEY]["thinking_overridden"]
+
+
+async def test_thinking_is_kept_when_no_fast_configuration_is_set(tool_context):
+    llm_request = _request(_user("Hi"))
+
+    route_request(llm_request, tool_context, RoutingPolicy())
+
+    assert llm_request.model == "gemini-2.5-pro"
+    assert llm_request.config.thinking_config.thinking_budget == 1024
+    assert not tool_context.state[ROUTING_STATE_KEY]["thinking_overridden"]
+
+
+async def test_other_phases_keep_the_agent_model(tool_context):
+    policy = RoutingPolicy(fast_model="gemini-2.5-flash-lite")
+    llm_request = _request(_user("Dinner", image=True))
+
+    assert route_request(llm_request, tool_context, policy) == PHASE_IMAGE_ANALYSIS
+    assert llm_request.model == "gemini-2.5-pro"
+
+
+async def test_disabled_router_only_records_the_phase(tool_context):
+    policy = RoutingPolicy(enabled=False, fast_model="gemini-2.5-flash-lite")
+
+    route_request(_request(_user("Hi")), tool_context, policy)
+    route_request(_request(_user("Hi")), tool_context, policy)
+
+    routing = tool_context.state[ROUTING_STATE_KEY]
+    assert routing["model"] == "gemini-2.5-pro"
+    assert routing["phases"] == {PHASE_CLARIFICATION: 2}
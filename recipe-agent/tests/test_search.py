@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.base_tool import BaseTool
+from google.genai.types import Part
+
+from benchmarks.fake_llm import ScriptedLlm
+from recipe_agent import search
+from recipe_agent.accounting import USAGE_STATE_KEY, after_model_callback
+from recipe_agent.accounting import before_model_callback as accounting_callback
+from recipe_agent.search import BatchWebSearchTool, CachedAgentTool, SearchCache
+from recipe_agent.search import _branch_tool_context, normalize_query
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite3"), ttl_seconds=60, max_entries=2)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Substitute for buttermilk?", "substitute  for Buttermilk"),
+    ("Crème brûlée", "creme brulee"),
+])
+def test_near_repeats_share_a_key(first, second):
+    assert normalize_query(first) == normalize_query(second)
+
+
+@pytest.mark.parametrize("first, second", [
+    ("chicken with rice", "chicken or rice"),
+    ("pasta with cream", "pasta without cream"),
+    ("salmon recipe", "salmon"),
+    ("rice then beans", "beans then rice"),
+])
+def test_different_queries_have_different_keys(first, second):
+    assert normalize_query(first) != normalize_query(second)
+
+
+async def test_cached_results_expire(cache, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(search.time, "time", lambda: now)
+
+    await cache.put("key", "query", {"answer": 1})
+    assert await cache.get("key") == {"answer": 1}
+
+    now += 61
+    assert await cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+async def test_least_recently_used_results_are_evicted(cache, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(search.time, "time", lambda: now)
+
+    await cache.put("a", "a", "A")
+    now += 1
+    await cache.put("b", "b", "B")
+    now += 1
+    assert await cache.get("a") == "A"
+    now += 1
+    await cache.put("c", "c", "C")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "A"
+    assert await cache.get("c") == "C"
+
+
+async def test_repeated_search_is_served_from_the_cache(cache, tool_context, monkeypatch):
+    searches = []
+
+    async def run_async(self, *, args, tool_context):
+        searches.append(args["request"])
+        return f"Results for {args['request']}"
+
+    monkeypatch.setattr(AgentTool, "run_async", run_async)
+    tool = CachedAgentTool(agent=LlmAgent(name="web_search_agent"), cache=cache)
+
+    first = await tool.run_async(args={"request": "Chicken with rice"}, tool_context=tool_context)
+    again = await tool.run_async(args={"request": "chicken with rice?"}, tool_context=tool_context)
+    other = await tool.run_async(args={"request": "chicken or rice"}, tool_context=tool_context)
+
+    assert first == again == "Results for Chicken with rice"
+    assert other == "Results for chicken or rice"
+    assert searches == ["Chicken with rice", "chicken or rice"]
+
+
+def _search_agent(latency: float = 0.05) -> LlmAgent:
+    return LlmAgent(
+        name="web_search_agent",
+        model=ScriptedLlm(model="scripted-search", latency=latency),
+        before_model_callback=accounting_callback,
+        after_model_callback=after_model_callback,
+    )
+
+
+async def test_branch_tool_context_keeps_its_own_deltas(tool_context):
+    # Fails when ADK stops supporting the way BatchWebSearchTool builds the
+    # tool context of each query.
+    tool_context.session.state["size"] = "large"
+    branch = _branch_tool_context(tool_context)
+
+    branch.state["color"] = "red"
+    version = await branch.save_artifact("notes.txt", Part(text="Salt"))
+
+    assert branch.state["size"] == "large"
+    assert branch.session.id == tool_context.session.id
+    assert branch.function_call_id == tool_context.function_call_id
+    assert branch.actions.state_delta == {"color": "red"}
+    assert branch.actions.artifact_delta == {"notes.txt": version}
+    assert await tool_context.load_artifact("notes.txt") == Part(text="Salt")
+
+    assert "color" not in tool_context.state
+    assert tool_context.actions.state_delta == {}
+    assert tool_context.actions.artifact_delta == {}
+
+
+async def test_batch_search_adds_up_the_usage_of_every_query(tool_context):
+    # Recorded by earlier model calls, so not part of this call's delta.
+    tool_context.session.state[USAGE_STATE_KEY] = {"total": {"requests": 2}}
+    tool = BatchWebSearchTool(AgentTool(agent=_search_agent()), max_concurrency=3)
+
+    result = await tool.run_async(
+        args={"queries": ["authentic carbonara", "guanciale substitute", "pecorino or parmesan"]},
+        tool_context=tool_context,
+    )
+
+    assert result["status"] == "success"
+    usage = tool_context.actions.state_delta[USAGE_STATE_KEY]
+    assert usage["total"]["requests"] == 5
+    assert usage["agents"]["web_search_agent"]["requests"] == 3
+    assert tool_context.state[USAGE_STATE_KEY] == usage
+
+
+async def test_batch_search_reports_failed_queries(tool_context):
+    class FlakySearch(BaseTool):
+        async def run_async(self, *, args, tool_context):
+            if "slow" in args["request"]:
+                await asyncio.sleep(1)
+            if "broken" in args["request"]:
+                raise RuntimeError("search backend down")
+            return f"Results for {args['request']}"
+
+    tool = BatchWebSearchTool(
+        FlakySearch(name="web_search", description="Searches the web."),
+        timeout=0.1,
+    )
+
+    result = await tool.run_async(
+        args={"queries": ["good", "Good?", "slow", "broken"]},
+        tool_context=tool_context,
+    )
+
+    assert result["status"] == "partial"
+    assert [(r["query"], r["status"]) for r in result["results"]] == [
+        ("good", "success"),
+        ("slow", "error"),
+        ("broken", "error"),
+    ]
+    assert result["summary"] == "### good\n\nResults for good"
@@ -0,0 +1,70 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from recipe_agent.digest import count_pdf_pages
+from recipe_agent.documents import build_cookbook_pdf, build_recipe_pdf, compile_template
+from recipe_agent.templates import DOCUMENT_TEMPLATES, get_template
+from recipe_agent.tools import generate_recipe_document
+
+
+def _photo() -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (800, 600), (200, 120, 40)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("name", list(DOCUMENT_TEMPLATES))
+def test_every_template_renders(name, recipe):
+    pdf_bytes = build_recipe_pdf(recipe, _photo(), name)
+
+    assert pdf_bytes.startswith(b"%PDF")
+    assert count_pdf_pages(pdf_bytes) >= 1
+    assert (b"/Subtype /Image" in pdf_bytes) is get_template(name).has_images
+
+
+def test_templates_are_compiled_once():
+    compile_template.cache_clear()
+
+    first = compile_template("compact")
+    assert compile_template("compact") is first
+    assert compile_template.cache_info().misses == 1
+
+
+def test_headings_are_copied_from_the_compiled_template():
+    compiled = compile_template("compact")
+
+    heading = compiled.heading("Ingredients")
+
+    assert heading is not compiled.section_headings["Ingredients"]
+    assert heading.text == compiled.section_headings["Ingredients"].text
+
+
+def test_unknown_template_is_not_compiled():
+    with pytest.raises(KeyError):
+        compile_template("poster")
+
+
+def test_cookbook_renders_with_a_text_only_template(recipe):
+    recipes = [
+        {**recipe, "image_key": "photo"},
+        {**recipe, "recipe_name": "Second", "image_key": "photo"},
+    ]
+
+    pdf_bytes = build_cookbook_pdf("Family Favourites", recipes, {}, "print_friendly")
+
+    assert pdf_bytes.startswith(b"%PDF")
+    assert b"/Subtype /Image" not in pdf_bytes
+
+
+async def test_tool_rejects_an_unknown_template(tool_context, recipe):
+    result = await generate_recipe_document(
+        **recipe,
+        recipe_image_artifact_id="user_uploaded_img_1.jpg",
+        tool_context=tool_context,
+        template="poster",
+    )
+
+    assert result["status"] == "error"
+    assert "compact" in result["message"]
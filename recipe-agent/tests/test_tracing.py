@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from google.genai.types import Content, Part
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from recipe_agent import tracing
+from recipe_agent.artifacts import load_artifact, save_artifact
+from recipe_agent.trace_export import JsonFileSpanExporter
+from recipe_agent.tracing import measure_contents, record_error, span
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    monkeypatch.setattr(tracing, "_tracer", provider.get_tracer(tracing.TRACER_NAME))
+    return exporter
+
+
+def test_span_records_only_supported_attributes(exporter):
+    with span("work", size=3, label="x", skipped=None, items=[1]) as current_span:
+        tracing.set_attributes(current_span, done=True)
+
+    (finished,) = exporter.get_finished_spans()
+
+    assert finished.name == "work"
+    assert dict(finished.attributes) == {"size": 3, "label": "x", "done": True}
+
+
+def test_recorded_error_marks_the_span_failed(exporter):
+    with span("work") as current_span:
+        record_error(current_span, ValueError("bad input"))
+
+    (finished,) = exporter.get_finished_spans()
+
+    assert finished.status.status_code == StatusCode.ERROR
+    assert finished.events[0].name == "exception"
+
+
+def test_span_is_a_no_op_without_opentelemetry(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.setattr(tracing, "trace", None)
+
+    with span("work", size=3) as current_span:
+        tracing.set_attributes(current_span, done=True)
+        record_error(current_span, ValueError("bad input"))
+
+    assert current_span is None
+
+
+async def test_artifact_calls_are_traced(exporter, tool_context):
+    photo = Part.from_bytes(data=b"\xff" * 4, mime_type="image/jpeg")
+    version = await save_artifact(tool_context, "photo.jpg", photo)
+    await load_artifact(tool_context, "photo.jpg")
+    await load_artifact(tool_context, "missing.txt")
+
+    saved, loaded, missing = exporter.get_finished_spans()
+
+    assert saved.name == "artifact.save"
+    assert saved.attributes["filename"] == "photo.jpg"
+    assert saved.attributes["bytes"] == 4
+    assert saved.attributes["version"] == version
+
+    assert loaded.name == "artifact.load"
+    assert loaded.attributes["found"] is True
+    assert loaded.attributes["bytes"] == 4
+    assert missing.attributes["found"] is False
+
+
+def test_json_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    exporter = JsonFileSpanExporter(str(path))
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer(tracing.TRACER_NAME)
+
+    for name in ("first", "second"):
+        with tracer.start_as_current_span(name):
+            pass
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+
+    assert [json.loads(line)["name"] for line in lines] == ["first", "second"]
+
+
+def test_measure_contents_counts_inline_and_text_bytes():
+    contents = [
+        Content(role="user", parts=[
+            Part(text="hello"),
+            Part.from_bytes(data=b"\xff" * 10, mime_type="image/jpeg"),
+        ]),
+        Content(role="model", parts=[Part(text="hi")]),
+        Content(role="model", parts=None),
+    ]
+
+    assert measure_contents(contents) == (10, 7)